@@ -0,0 +1,142 @@
+import asyncio
+import os
+import re
+import sys
+import time
+import unicodedata
+from array import array
+from collections import OrderedDict
+from ratelimit import SlidingWindowLimiter
+
+# --- ANTI-FLOOD ---
+# Erkennt gleiche oder fast gleiche Nachrichten von vielen Accounts und Kanälen.
+# Pro Nachricht: normalisieren + hashen (Fingerprint), danach nur O(1)-Operationen:
+#   1) Türsteher-Tabelle pro Server (feste Größe): ein einmaliger Fingerprint kostet keinen Speicher
+#   2) ab dem zweiten Auftritt zählt ein Ringpuffer (SlidingWindowLimiter) die Treffer im Zeitfenster
+#   3) die letzten Autoren pro Fingerprint (begrenzt) sind die Täter, sobald das Limit erreicht ist
+
+DOORKEEPER_SLOTS = int(os.getenv("GLOBEX_FLOOD_SLOTS", "1024"))
+MAX_TRACKED = int(os.getenv("GLOBEX_FLOOD_MAX_TRACKED", "20000"))
+MAX_BYTES = int(os.getenv("GLOBEX_FLOOD_MAX_BYTES", str(8 * 1024 * 1024)))
+MAX_AUTHORS = 50
+MIN_LENGTH = 8
+IDLE_HORIZON = 600
+DEFAULT_LIMIT = 5
+DEFAULT_WINDOW = 10
+
+_MENTIONS = re.compile(r"<(?:@[!&]?|#)\d+>")
+_NOISE = re.compile(r"[\W\d_]+")
+_STRETCH = re.compile(r"(.)\1+")
+
+
+def fingerprint(content):
+    """Hash des normalisierten Inhalts: Groß-/Kleinschreibung, Unicode-Varianten, Satzzeichen,
+    Zahlen, Mentions und gestreckte Buchstaben ("heyyyy") spielen keine Rolle.
+    None, wenn danach zu wenig übrig bleibt ("ok", "lol")."""
+    text = unicodedata.normalize("NFKC", content).casefold()
+    text = _STRETCH.sub(r"\1", _NOISE.sub("", _MENTIONS.sub("", text)))
+    if len(text) < MIN_LENGTH:
+        return None
+    return hash(text)
+
+
+class _Doorkeeper:
+    """Direkt adressierte Tabelle: Slot = fp % Größe, Kollisionen überschreiben einfach."""
+    __slots__ = ("fps", "stamps", "users", "last_seen")
+
+    def __init__(self, slots):
+        self.fps = array("q", bytes(8 * slots))
+        self.stamps = array("d", bytes(8 * slots))
+        self.users = array("Q", bytes(8 * slots))
+        self.last_seen = 0.0
+
+    def seen(self, fp, user_id, now, window):
+        """Gibt den früheren Autor zurück, wenn fp im Zeitfenster schon einmal kam; sonst wird fp gemerkt."""
+        self.last_seen = now
+        i = fp % len(self.fps)
+        if self.fps[i] == fp and now - self.stamps[i] < window:
+            return self.users[i]
+        self.fps[i], self.stamps[i], self.users[i] = fp, now, user_id
+        return None
+
+    def nbytes(self):
+        return sys.getsizeof(self) + sum(sys.getsizeof(a) for a in (self.fps, self.stamps, self.users))
+
+
+class FloodDetector:
+    def __init__(self, slots=DOORKEEPER_SLOTS, max_tracked=MAX_TRACKED, max_bytes=MAX_BYTES):
+        self.slots = slots
+        self.max_tracked = max_tracked
+        self._doors = {}                 # guild_id -> _Doorkeeper
+        self._authors = OrderedDict()    # (guild_id, fp) -> OrderedDict(user_id -> zuletzt gesehen), LRU
+        self._hot = {}                   # (guild_id, fp) -> Flood aktiv bis
+        self._windows = SlidingWindowLimiter(max_bytes=max_bytes, max_idle=IDLE_HORIZON)
+        self.stats = {"messages": 0, "fingerprinted": 0, "promoted": 0, "trips": 0, "flagged": 0}
+
+    def check(self, guild_id, user_id, content, limit=DEFAULT_LIMIT, window=DEFAULT_WINDOW):
+        """Gibt die zu bestrafenden User-IDs zurück: beim Auslösen alle Autoren des Fingerprints
+        im Zeitfenster, danach (solange der Flood läuft) jeden weiteren Autor sofort."""
+        self.stats["messages"] += 1
+        fp = fingerprint(content) if content else None
+        if fp is None:
+            return ()
+        self.stats["fingerprinted"] += 1
+        now = time.monotonic()
+        key = (guild_id, fp)
+        authors = self._authors.get(key)
+        if authors is None:
+            door = self._doors.get(guild_id)
+            if door is None:
+                door = self._doors[guild_id] = _Doorkeeper(self.slots)
+            first = door.seen(fp, user_id, now, window)
+            if first is None:
+                return ()
+            # Zweiter Auftritt: ab jetzt verfolgen, der erste wird nachgetragen
+            self.stats["promoted"] += 1
+            authors = self._authors[key] = OrderedDict({first: now})
+            self._windows.hit(key, limit, window)
+            while len(self._authors) > self.max_tracked:
+                self._authors.popitem(last=False)
+        else:
+            self._authors.move_to_end(key)
+        authors[user_id] = now
+        authors.move_to_end(user_id)
+        if len(authors) > MAX_AUTHORS:
+            authors.popitem(last=False)
+
+        if self._hot.get(key, 0.0) > now:
+            self._hot[key] = now + window
+            self.stats["flagged"] += 1
+            return (user_id,)
+        if self._windows.hit(key, limit, window):
+            self._hot[key] = now + window
+            self.stats["trips"] += 1
+            offenders = tuple(uid for uid, seen in authors.items() if now - seen < window)
+            self.stats["flagged"] += len(offenders)
+            return offenders
+        return ()
+
+    def sweep(self):
+        now = time.monotonic()
+        for key in [k for k, until in self._hot.items() if until <= now]:
+            del self._hot[key]
+        for key in [k for k, authors in self._authors.items()
+                    if k not in self._hot and now - next(reversed(authors.values())) > IDLE_HORIZON]:
+            del self._authors[key]
+        for guild_id in [g for g, door in self._doors.items() if now - door.last_seen > IDLE_HORIZON]:
+            del self._doors[guild_id]
+        self._windows.sweep()
+
+    async def run_sweeper(self, interval=60):
+        while True:
+            await asyncio.sleep(interval)
+            self.sweep()
+
+    def memory_bytes(self):
+        doors = sum(door.nbytes() for door in self._doors.values())
+        authors = sys.getsizeof(self._authors) + sum(sys.getsizeof(a) for a in self._authors.values())
+        return doors + authors + sys.getsizeof(self._hot) + self._windows.metrics()["bytes"]
+
+    def metrics(self):
+        return {**self.stats, "guilds": len(self._doors), "tracked": len(self._authors),
+                "active_floods": len(self._hot), "bytes": self.memory_bytes()}
@@ -0,0 +1,136 @@
+import asyncio
+import datetime
+import os
+import discord
+from metrics import swallowed
+
+# --- AUDIT LOG RESOLVER ---
+# Statt pro Gateway-Event einen eigenen audit_logs(limit=1)-Request zu schicken,
+# werden gleichzeitige Abfragen pro (Server, Aktion) zu einem Fetch mit größerem Limit
+# zusammengefasst. Die Einträge bleiben kurz im Cache und werden über target.id zugeordnet.
+
+FETCH_LIMIT = int(os.getenv("GLOBEX_AUDIT_FETCH_LIMIT", "50"))
+ENTRY_TTL = int(os.getenv("GLOBEX_AUDIT_TTL", "30"))
+# Audit-Log-Einträge erscheinen manchmal erst kurz nach dem Gateway-Event; wiederholt wird aber
+# nur, solange der Fetch danach aussieht, dass der Eintrag noch kommen kann (siehe _worth_retry)
+RETRY_DELAYS = (0.0, 0.5, 1.5)
+
+
+class _ActionCache:
+    __slots__ = ("entries", "consumed", "inflight")
+
+    def __init__(self):
+        self.entries = {}      # entry.id -> entry
+        self.consumed = set()  # entry.id, die bereits einem Event zugeordnet wurden
+        self.inflight = None   # laufender Fetch (asyncio.Task)
+
+
+class AuditLogResolver:
+    def __init__(self, fetch_limit=FETCH_LIMIT, ttl=ENTRY_TTL):
+        self.fetch_limit = fetch_limit
+        self.ttl = ttl
+        self._caches = {}
+        self.stats = {"lookups": 0, "cache_hits": 0, "fetches": 0, "coalesced": 0, "unresolved": 0}
+
+    def _cache(self, guild_id, action):
+        key = (guild_id, action)
+        cache = self._caches.get(key)
+        if cache is None:
+            cache = self._caches[key] = _ActionCache()
+        return cache
+
+    def _prune(self, cache):
+        cutoff = discord.utils.utcnow() - datetime.timedelta(seconds=self.ttl)
+        for entry_id in [i for i, e in cache.entries.items() if e.created_at < cutoff]:
+            del cache.entries[entry_id]
+            cache.consumed.discard(entry_id)
+
+    @staticmethod
+    def _fits(entry, target_id, predicate):
+        if target_id is not None and getattr(entry.target, "id", None) != target_id:
+            return False
+        return predicate is None or predicate(entry)
+
+    def _match(self, cache, target_id, predicate):
+        newest = None
+        for entry in cache.entries.values():
+            if entry.id in cache.consumed or not self._fits(entry, target_id, predicate):
+                continue
+            if newest is None or entry.id > newest.id:
+                newest = entry
+        return newest
+
+    def _worth_retry(self, cache, target_id, predicate):
+        # Nach einem frischen Fetch ohne Treffer: Ist schon ein passender Eintrag vergeben, ist das
+        # Event ein Folge-Event desselben Ziels (z.B. Webhook-Update/-Löschung nach dem Erstellen).
+        # Ohne offenen Eintrag für die Aktion kommt der gesuchte sehr wahrscheinlich auch nicht mehr.
+        pending = False
+        for entry in cache.entries.values():
+            if entry.id not in cache.consumed: pending = True
+            elif self._fits(entry, target_id, predicate): return False
+        return pending
+
+    async def _fetch(self, guild, action, cache):
+        self.stats["fetches"] += 1
+        async for entry in guild.audit_logs(action=action, limit=self.fetch_limit):
+            cache.entries[entry.id] = entry
+        self._prune(cache)
+
+    async def resolve(self, guild, action, target_id=None, predicate=None, consume=False):
+        """Gibt den Audit-Log-Eintrag zu einem Gateway-Event zurück (oder None).
+
+        target_id ordnet über entry.target.id zu, predicate erlaubt eigene Kriterien
+        (z.B. Webhooks pro Kanal). Mit consume wird ein Eintrag nur einmal vergeben."""
+        self.stats["lookups"] += 1
+        cache = self._cache(guild.id, action)
+        for attempt, delay in enumerate(RETRY_DELAYS):
+            entry = self._match(cache, target_id, predicate)
+            if entry is not None:
+                if attempt == 0:
+                    self.stats["cache_hits"] += 1
+                if consume:
+                    cache.consumed.add(entry.id)
+                return entry
+            if cache.inflight is not None:
+                # Es läuft bereits ein Fetch für diese Aktion -> mitbenutzen
+                self.stats["coalesced"] += 1
+            else:
+                if delay:
+                    await asyncio.sleep(delay)
+                cache.inflight = asyncio.create_task(self._fetch(guild, action, cache))
+            task = cache.inflight
+            try:
+                await asyncio.shield(task)
+            except discord.HTTPException as e:
+                swallowed("audit_log.fetch", e)
+                return None
+            finally:
+                if cache.inflight is task and task.done():
+                    cache.inflight = None
+            if self._match(cache, target_id, predicate) is None and not self._worth_retry(cache, target_id, predicate):
+                break
+        entry = self._match(cache, target_id, predicate)
+        if entry is None:
+            self.stats["unresolved"] += 1
+        elif consume:
+            cache.consumed.add(entry.id)
+        return entry
+
+    def forget_guild(self, guild_id):
+        for key in [k for k in self._caches if k[0] == guild_id]:
+            del self._caches[key]
+
+    def sweep(self):
+        # Abgelaufene Einträge fallen sonst erst beim nächsten Fetch derselben Aktion weg;
+        # leere Caches ohne laufenden Fetch werden ganz entfernt
+        for key, cache in list(self._caches.items()):
+            if cache.inflight is not None:
+                continue
+            self._prune(cache)
+            if not cache.entries:
+                del self._caches[key]
+
+    async def run_sweeper(self, interval=60):
+        while True:
+            await asyncio.sleep(interval)
+            self.sweep()
@@ -0,0 +1,428 @@
+"""Replay-Benchmark für die Event-Handler aus main.py.
+
+Treibt die echten Handler mit synthetischen Gateway-Events (Fake Message/Guild/Member)
+und ersetzt das Speicher-Backend aus database.py durch das In-Memory-Backend mit
+einstellbarer Latenz. Ausgabe: Durchsatz, p50/p99 Handler-Latenz, DB-Calls pro Event,
+REST-Calls und Spitzen-Speicher.
+
+    python bench.py                         # alle Szenarien
+    python bench.py invite_spam --events 5000 --db-latency-ms 20
+    python bench.py --checks                # Regression-Checks, Exit-Code 1 bei Fehler
+"""
+import argparse
+import asyncio
+import itertools
+import os
+import time
+import tracemalloc
+import types
+
+os.environ["DISCORD_TOKEN"] = ""  # main.py darf den Bot beim Import nicht starten
+os.environ["GLOBEX_STORAGE"] = "memory"
+
+import discord
+import database
+import main
+import storage
+
+_snowflakes = itertools.count(1_100_000_000_000_000_000)
+
+
+def snowflake():
+    return next(_snowflakes)
+
+
+# --- IN-MEMORY DATABASE ---
+class FakeBackend(storage.MemoryBackend):
+    """In-Memory-Backend aus storage.py, zusätzlich mit Latenz und Call-Zähler."""
+    TIMED = ("get", "get_many", "get_profile_docs", "find", "set_fields", "toggle", "add_to_set", "pull",
+             "replace", "bulk", "list_page", "list_index", "insert_events", "query_events")
+
+    def __init__(self, latency=0.0):
+        super().__init__()
+        self.latency = latency
+        self.calls = 0
+        for name in self.TIMED:
+            setattr(self, name, self._timed(getattr(self, name)))
+
+    def _timed(self, method):
+        async def call(*args, **kwargs):
+            self.calls += 1
+            if self.latency:
+                await asyncio.sleep(self.latency)
+            return await method(*args, **kwargs)
+        return call
+
+    def seed(self, category, guild_id, doc):
+        self._col(category)[str(guild_id)] = {"_id": str(guild_id), **doc}
+
+
+# --- FAKE DISCORD OBJECTS ---
+class FakeResponse:
+    def __init__(self, status):
+        self.status = status
+        self.reason = "fake"
+
+
+class FakeRest:
+    def __init__(self, latency=0.0):
+        self.latency = latency
+        self.calls = 0
+
+    async def call(self):
+        self.calls += 1
+        if self.latency:
+            await asyncio.sleep(self.latency)
+
+
+class FakeMember(discord.Member):
+    id = property(lambda self: self._fake_id)
+    bot = property(lambda self: self._fake_bot)
+    mention = property(lambda self: f"<@{self._fake_id}>")
+    display_name = property(lambda self: f"user-{self._fake_id}")
+    name = property(lambda self: self._fake_name or f"user-{self._fake_id}")
+    avatar = property(lambda self: None)
+    created_at = property(lambda self: discord.utils.snowflake_time(self._fake_id))
+
+    def __init__(self, guild, rest, bot=False, member_id=None, name=None):
+        self._fake_id = member_id or snowflake()
+        self._fake_bot = bot
+        self._fake_name = name
+        self.guild = guild
+        self._rest = rest
+
+    async def kick(self, reason=None):
+        await self._rest.call()
+        self.guild._members.pop(self.id, None)
+
+    async def ban(self, reason=None, **kwargs):
+        await self._rest.call()
+        self.guild._members.pop(self.id, None)
+
+    async def timeout(self, until, reason=None):
+        await self._rest.call()
+
+
+class FakeEntry:
+    def __init__(self, user, target, after=None):
+        self.id = snowflake()
+        self.user = user
+        self.target = target
+        self.after = after
+        self.created_at = discord.utils.utcnow()
+
+
+class FakeGuild:
+    def __init__(self, rest):
+        self.id = snowflake()
+        self.name = f"guild-{self.id}"
+        self.owner_id = snowflake()
+        self._rest = rest
+        self._members = {}
+        self._audit = []
+        self.text_channels = []
+
+    def add_member(self, member):
+        self._members[member.id] = member
+        return member
+
+    def get_member(self, member_id):
+        return self._members.get(member_id)
+
+    async def fetch_member(self, member_id):
+        await self._rest.call()
+        member = self._members.get(member_id)
+        if member is None:
+            raise discord.NotFound(FakeResponse(404), "Unknown Member")
+        return member
+
+    def get_role(self, role_id):
+        return None
+
+    async def bulk_ban(self, users, reason=None, **kwargs):
+        await self._rest.call()
+        for user in users:
+            self._members.pop(user.id, None)
+        return discord.guild.BulkBanResult(banned=[discord.Object(u.id) for u in users], failed=[])
+
+    def log(self, action, user, target, after=None):
+        self._audit.insert(0, (action, FakeEntry(user, target, after)))
+
+    async def audit_logs(self, action=None, limit=100, **kwargs):
+        await self._rest.call()
+        found = 0
+        for entry_action, entry in self._audit:
+            if found >= limit:
+                break
+            if action is None or entry_action == action:
+                found += 1
+                yield entry
+
+
+class FakeChannel:
+    def __init__(self, guild, rest):
+        self.id = snowflake()
+        self.guild = guild
+        self._rest = rest
+        self.sent = 0
+
+    async def delete(self):
+        await self._rest.call()
+
+    async def send(self, embeds=None, **kwargs):
+        self.sent += 1
+        await self._rest.call()
+
+
+class FakeMessage:
+    def __init__(self, guild, author, content, rest):
+        self.id = snowflake()
+        self.guild = guild
+        self.author = author
+        self.content = content
+        self.webhook_id = None
+        self.mention_everyone = "@everyone" in content
+        self._rest = rest
+
+    async def delete(self):
+        await self._rest.call()
+
+
+# --- SCENARIOS ---
+def _guild(fake_db, rest, settings, limits=None):
+    guild = FakeGuild(rest)
+    fake_db.seed("settings", guild.id, settings)
+    fake_db.seed("limits", guild.id, limits or {})
+    return guild
+
+
+async def invite_spam(fake_db, rest, events):
+    guild = _guild(fake_db, rest, {"anti_invite_status": 1, "anti_invite_punish": "ban"},
+                   {"invite_limit": 3, "invite_time": 10})
+    raiders = [guild.add_member(FakeMember(guild, rest)) for _ in range(max(1, events // 20))]
+    for i in range(events):
+        author = raiders[i % len(raiders)]
+        yield main.on_message(FakeMessage(guild, author, f"free nitro discord.gg/raid{i}", rest))
+
+
+async def channel_delete_nuke(fake_db, rest, events):
+    guild = _guild(fake_db, rest, {"channel_delete_status": 1, "channel_delete_punish": "ban"})
+    actor = guild.add_member(FakeMember(guild, rest))
+    for _ in range(events):
+        channel = FakeChannel(guild, rest)
+        guild.log(discord.AuditLogAction.channel_delete, actor, channel)
+        yield main.on_guild_channel_delete(channel)
+
+
+async def raid_nuke(fake_db, rest, events):
+    # Nur Raid-Modus aktiv: gemischte Aktionen eines Akteurs müssen zusammen erkannt werden
+    guild = _guild(fake_db, rest, {"raid_mode_status": 1}, {"raid_score": 10, "raid_window": 30})
+    actor = guild.add_member(FakeMember(guild, rest))
+    for i in range(events):
+        target = FakeChannel(guild, rest)
+        if i % 2:
+            guild.log(discord.AuditLogAction.channel_delete, actor, target)
+            yield main.on_guild_channel_delete(target)
+        else:
+            guild.log(discord.AuditLogAction.role_delete, actor, target)
+            yield main.on_guild_role_delete(target)
+
+
+async def bot_join_flood(fake_db, rest, events):
+    guild = _guild(fake_db, rest, {"anti_bot_status": 1}, {"bot_limit": 2})
+    inviter = guild.add_member(FakeMember(guild, rest))
+    for _ in range(events):
+        member = FakeMember(guild, rest, bot=True)
+        guild.log(discord.AuditLogAction.bot_add, inviter, member)
+        yield main.on_member_join(member)
+
+
+async def text_flood(fake_db, rest, events):
+    # Viele Accounts posten fast denselben Text, dazwischen normaler Chat
+    guild = _guild(fake_db, rest, {"anti_flood_status": 1, "anti_flood_punish": "ban"},
+                   {"flood_limit": 5, "flood_time": 10})
+    raiders = [guild.add_member(FakeMember(guild, rest)) for _ in range(max(1, events // 10))]
+    chatters = [guild.add_member(FakeMember(guild, rest)) for _ in range(20)]
+    for i in range(events):
+        if i % 4 == 0:
+            words = ("raid", "server", "event", "tonight", "anyone", "playing", "later", "cool", "new", "map")
+            text = " ".join(words[(i * k) % len(words)] for k in (1, 3, 7, 9)) + f" {chr(97 + i % 26)}{chr(97 + i // 26 % 26)}"
+            yield main.on_message(FakeMessage(guild, chatters[i % 20], text, rest))
+        else:
+            yield main.on_message(FakeMessage(guild, raiders[i % len(raiders)], f"JOIN NOW!!! free nitro {i} for everyone", rest))
+
+
+async def join_raid(fake_db, rest, events):
+    # Welle frischer Accounts mit gleichem Namensmuster
+    guild = _guild(fake_db, rest, {"join_raid_status": 1, "join_raid_punish": "ban"},
+                   {"join_limit": 10, "join_time": 10})
+    for i in range(events):
+        yield main.on_member_join(guild.add_member(FakeMember(guild, rest, name=f"raider{1000 + i}")))
+
+
+async def adm_timer(fake_db, rest, events):
+    # events = Anzahl Server, davon 5% mit aktivem ADM-Timer
+    guilds = [FakeGuild(rest) for _ in range(events)]
+    for i, guild in enumerate(guilds):
+        if i % 20 == 0:
+            fake_db.seed("adm_timer", guild.id, {"adm_status": 1, "role_id_1": str(snowflake()),
+                                                 "give_time_1": "08:00", "remove_time_1": "20:00"})
+    by_id = {str(g.id): g for g in guilds}
+    scheduler = main.AdmScheduler(lambda gid, data, i: asyncio.sleep(0), lambda gid: gid in by_id)
+    yield scheduler.load()
+
+
+SCENARIOS = {
+    "invite_spam": invite_spam,
+    "channel_delete_nuke": channel_delete_nuke,
+    "raid_nuke": raid_nuke,
+    "bot_join_flood": bot_join_flood,
+    "text_flood": text_flood,
+    "join_raid": join_raid,
+    "adm_timer": adm_timer,
+}
+
+
+def _reset_state():
+    database._cache.clear()
+    for key in database.cache_stats:
+        database.cache_stats[key] = 0
+    main.violation_tracker = main.create_limiter()
+    main.audit_resolver = main.AuditLogResolver()
+    main.log_dispatcher = main.LogDispatcher()
+    main.punishment_engine = main.PunishmentEngine(main.execute_punishment, severity=main.punishment_severity)
+    main.content_scanner = main.ContentScanner()
+    main.member_resolver = main.MemberResolver()
+    main.raid_guard = main.RaidGuard()
+    main.snapshots = main.SnapshotStore()
+    main.event_buffer = main.EventBuffer()
+    main.flood_detector = main.FloodDetector()
+    main.join_guard = main.JoinGuard(report=main.join_guard.report)
+
+
+def _pct(samples, p):
+    return samples[min(len(samples) - 1, int(len(samples) * p))] * 1000 if samples else 0.0
+
+
+async def run_scenario(name, events, db_latency, rest_latency, interval):
+    _reset_state()
+    fake_db = FakeBackend(db_latency)
+    rest = FakeRest(rest_latency)
+    database.backend = fake_db
+    main.bot._connection.user = FakeMember(None, rest, bot=True)
+
+    tracemalloc.start()
+    latencies = []
+
+    async def timed(coro):
+        start = time.perf_counter()
+        await coro
+        latencies.append(time.perf_counter() - start)
+
+    start = time.perf_counter()
+    pending = []
+    async for coro in SCENARIOS[name](fake_db, rest, events):
+        if interval is None:
+            await timed(coro)
+        else:
+            # Gateway-Events kommen als Burst mit kleinem Abstand, nicht alle im selben Tick
+            pending.append(asyncio.ensure_future(timed(coro)))
+            await asyncio.sleep(interval)
+    await asyncio.gather(*pending)
+    await main.punishment_engine.join()
+    # Join-Raid-Aktionen laufen gesammelt nach BATCH_DELAY, nicht über die PunishmentEngine
+    await main.join_guard.join()
+    elapsed = time.perf_counter() - start
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    latencies.sort()
+    handled = len(latencies) if name != "adm_timer" else events
+    return {
+        "scenario": name,
+        "events": handled,
+        "throughput": handled / elapsed if elapsed else 0.0,
+        "p50_ms": _pct(latencies, 0.50),
+        "p99_ms": _pct(latencies, 0.99),
+        "db_calls_per_event": fake_db.calls / handled if handled else 0.0,
+        "rest_calls": rest.calls,
+        "punishments": main.punishment_engine.stats["executed"] + main.join_guard.stats["actioned"],
+        "peak_mem_kb": peak / 1024,
+    }
+
+
+def report(result):
+    print(f"{result['scenario']:<22} {result['events']:>7} ev  {result['throughput']:>10,.0f} ev/s  "
+          f"p50 {result['p50_ms']:>7.2f} ms  p99 {result['p99_ms']:>7.2f} ms  "
+          f"db/ev {result['db_calls_per_event']:>5.2f}  rest {result['rest_calls']:>6}  "
+          f"punish {result['punishments']:>5}  peak {result['peak_mem_kb']:>8.0f} KiB")
+
+
+# --- REGRESSION CHECKS ---
+async def check_punish_fairness(rest_latency):
+    # Raid in einem Server darf die Bestrafungen anderer Server nicht ausbremsen
+    done = {}
+
+    async def execute(member, module_prefix, guild_id, profile):
+        await asyncio.sleep(rest_latency)
+        done[member.id] = time.perf_counter()
+
+    engine = main.PunishmentEngine(execute)
+    raid_guild, other_guild = FakeGuild(FakeRest()), FakeGuild(FakeRest())
+    for _ in range(60):
+        engine.submit(FakeMember(raid_guild, None), "bench", raid_guild.id)
+    victim = FakeMember(other_guild, None)
+    start = time.perf_counter()
+    engine.submit(victim, "bench", other_guild.id)
+    await engine.join()
+    elapsed = done[victim.id] - start
+    limit = rest_latency * 3
+    print(f"{'punish_fairness':<22} other guild done after {elapsed * 1000:.0f} ms (limit {limit * 1000:.0f} ms)")
+    return elapsed <= limit
+
+
+async def check_punish_escalation(rest_latency):
+    # raid_mode-Ban darf nicht als Duplikat eines noch laufenden Modul-Kicks verworfen werden
+    executed = []
+
+    async def execute(member, module_prefix, guild_id, profile):
+        await asyncio.sleep(rest_latency)
+        executed.append(module_prefix)
+
+    engine = main.PunishmentEngine(execute, severity=main.punishment_severity)
+    guild = FakeGuild(FakeRest())
+    raider = FakeMember(guild, None)
+    profile = types.SimpleNamespace(settings={"anti_channel_delete_punish": "kick"})
+    engine.submit(raider, "anti_channel_delete", guild.id, profile)
+    await asyncio.sleep(0)
+    for _ in range(9):
+        engine.submit(raider, "raid_mode", guild.id, profile)
+    await engine.join()
+    print(f"{'punish_escalation':<22} executed {' -> '.join(executed)}")
+    return executed[-1:] == ["raid_mode"] and executed.count("raid_mode") == 1
+
+
+CHECKS = {"punish_fairness": check_punish_fairness, "punish_escalation": check_punish_escalation}
+
+
+async def _main(args):
+    if args.checks:
+        results = [await check(args.rest_latency_ms / 1000) for check in CHECKS.values()]
+        raise SystemExit(0 if all(results) else 1)
+    names = [args.scenario] if args.scenario else list(SCENARIOS)
+    for name in names:
+        report(await run_scenario(name, args.events, args.db_latency_ms / 1000,
+                                  args.rest_latency_ms / 1000,
+                                  None if args.sequential else args.interval_ms / 1000))
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Globex Security handler benchmark")
+    parser.add_argument("scenario", nargs="?", choices=list(SCENARIOS))
+    parser.add_argument("--events", type=int, default=1000)
+    parser.add_argument("--db-latency-ms", type=float, default=5.0)
+    parser.add_argument("--rest-latency-ms", type=float, default=50.0)
+    parser.add_argument("--interval-ms", type=float, default=1.0, help="Abstand zwischen zwei Events im Burst")
+    parser.add_argument("--sequential", action="store_true", help="Events nacheinander statt gleichzeitig")
+    parser.add_argument("--checks", action="store_true", help="Regression-Checks statt Benchmark")
+    asyncio.run(_main(parser.parse_args()))
@@ -0,0 +1,60 @@
+import asyncio
+import os
+import time
+import discord
+
+# --- BLACKLIST SWEEP ---
+# Gleicht die vorhandenen Member eines Servers mit der Blacklist ab und bannt Treffer über den
+# Bulk-Ban-Endpoint (bis zu 200 IDs pro Request) statt einzeln per member.ban.
+# Die Member kommen aus dem Cache (voll gechunkte Server) oder seitenweise per REST
+# (1000 pro Request, z.B. im Lean-Modus). 429er behandelt der HTTP-Client von discord.py;
+# zusätzlich liegt zwischen zwei Bulk-Bans eine feste Pause.
+
+BULK_BAN_SIZE = 200
+BULK_BAN_PACING = float(os.getenv("GLOBEX_BULK_BAN_PACING", "1.0"))
+PROGRESS_INTERVAL = 5.0
+REASON = "Globex Security: Blacklisted"
+
+
+async def _member_ids(guild):
+    if guild.chunked:
+        for member in list(guild.members):
+            yield member.id
+    else:
+        async for member in guild.fetch_members(limit=None):
+            yield member.id
+
+
+async def sweep(guild, blacklist, progress=None):
+    """Bannt alle Member, deren ID in `blacklist` (Set von ints) steht.
+    progress(stats) wird höchstens alle PROGRESS_INTERVAL Sekunden aufgerufen."""
+    stats = {"scanned": 0, "matched": 0, "banned": 0, "failed": 0}
+    skip = {guild.owner_id, guild.me.id}
+    pending = []
+    last_report = time.monotonic()
+
+    async def ban(chunk):
+        try:
+            result = await guild.bulk_ban([discord.Object(uid) for uid in chunk], reason=REASON, delete_message_seconds=0)
+            stats["banned"] += len(result.banned)
+            stats["failed"] += len(result.failed)
+        except discord.HTTPException as e:
+            stats["failed"] += len(chunk)
+            print(f"Bulk ban failed in {guild.name}: {e}")
+        await asyncio.sleep(BULK_BAN_PACING)
+
+    if blacklist:
+        async for uid in _member_ids(guild):
+            stats["scanned"] += 1
+            if uid in blacklist and uid not in skip:
+                stats["matched"] += 1
+                pending.append(uid)
+                if len(pending) == BULK_BAN_SIZE:
+                    await ban(pending)
+                    pending = []
+            if progress and time.monotonic() - last_report >= PROGRESS_INTERVAL:
+                last_report = time.monotonic()
+                await progress(stats)
+    if pending:
+        await ban(pending)
+    return stats
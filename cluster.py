@@ -0,0 +1,53 @@
+import os
+import subprocess
+import sys
+import time
+
+# --- SHARDING / CLUSTER MODE ---
+# GLOBEX_SHARD_COUNT  = Gesamtzahl der Discord-Shards
+# GLOBEX_CLUSTERS     = Anzahl Bot-Prozesse; jeder Prozess übernimmt shard_id % clusters == cluster_id
+# GLOBEX_CLUSTER_ID   = wird vom Supervisor pro Kindprozess gesetzt
+RESTART_DELAY = 5
+
+
+def shard_config():
+    """Gibt (shard_count, shard_ids, cluster_id) für diesen Prozess zurück.
+    Ohne Konfiguration: (None, None, 0) -> discord.py bestimmt die Shards selbst."""
+    shard_count = os.getenv("GLOBEX_SHARD_COUNT")
+    clusters = int(os.getenv("GLOBEX_CLUSTERS", "1"))
+    cluster_id = int(os.getenv("GLOBEX_CLUSTER_ID", "0"))
+    if not shard_count:
+        return None, None, cluster_id
+    shard_count = int(shard_count)
+    shard_ids = [i for i in range(shard_count) if i % clusters == cluster_id]
+    return shard_count, shard_ids, cluster_id
+
+
+def is_supervisor():
+    return int(os.getenv("GLOBEX_CLUSTERS", "1")) > 1 and "GLOBEX_CLUSTER_ID" not in os.environ
+
+
+def run_clusters(script):
+    """Startet pro Cluster einen Kindprozess von `script` und startet abgestürzte neu."""
+    clusters = int(os.getenv("GLOBEX_CLUSTERS", "1"))
+    if not os.getenv("GLOBEX_SHARD_COUNT"):
+        os.environ["GLOBEX_SHARD_COUNT"] = str(clusters)
+    procs = {}
+
+    def spawn(cluster_id):
+        env = {**os.environ, "GLOBEX_CLUSTER_ID": str(cluster_id)}
+        procs[cluster_id] = subprocess.Popen([sys.executable, script], env=env)
+        print(f"🧩 Cluster {cluster_id}/{clusters} gestartet (PID {procs[cluster_id].pid})")
+
+    for cluster_id in range(clusters):
+        spawn(cluster_id)
+    try:
+        while True:
+            time.sleep(RESTART_DELAY)
+            for cluster_id, proc in list(procs.items()):
+                if proc.poll() is not None:
+                    print(f"⚠️ Cluster {cluster_id} beendet (Code {proc.returncode}), Neustart...")
+                    spawn(cluster_id)
+    except KeyboardInterrupt:
+        for proc in procs.values():
+            proc.terminate()
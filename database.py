@@ -1,51 +1,544 @@
-import motor.motor_asyncio
 import os
 import asyncio
+import time
+import json
+import itertools
+from collections import OrderedDict
+from metrics import instrument, swallowed
+from storage import create_backend, apply_op, CACHED_CATEGORIES
 
-# Wir laden die URL aus den Railway-Variablen
-MONGO_URL = os.getenv("MONGO_URL")
+# So lange warten Security-Handler höchstens auf Konfig-Lesezugriffe, danach greift der Cache
+CONFIG_DEADLINE = float(os.getenv("GLOBEX_DB_DEADLINE", "1.5"))
+HEALTH_ATTEMPTS = int(os.getenv("GLOBEX_MONGO_HEALTH_ATTEMPTS", "5"))
 
-# Verbindung zum Cluster herstellen
-cluster = motor.motor_asyncio.AsyncIOMotorClient(MONGO_URL)
-# Wir definieren die Datenbank "GlobexData"
-db = cluster["GlobexData"]
+# Speicher-Backend (Mongo, SQLite oder In-Memory, siehe storage.py) über GLOBEX_STORAGE
+backend = create_backend()
 
+async def health_check(attempts=HEALTH_ATTEMPTS):
+    """Ping mit Backoff beim Start; öffnet dabei auch die ersten Verbindungen."""
+    delay = 1
+    for attempt in range(1, attempts + 1):
+        t = time.monotonic()
+        try:
+            await backend.ping()
+            latency = time.monotonic() - t
+            print(f"🍃 Storage ({backend.name}) reachable ({latency * 1000:.0f} ms, attempt {attempt})")
+            return latency
+        except backend.errors as e:
+            print(f"⚠️ Storage health check failed ({attempt}/{attempts}): {e}")
+            if attempt == attempts: raise
+            await asyncio.sleep(delay)
+            delay = min(delay * 2, 30)
+
+# --- GUILD CONFIG CACHE ---
+# Pro Server werden die Konfig-Dokumente im Speicher gehalten:
+# {guild_id: {category: [geladen_um, dokument, id_index]}}; die Reihenfolge des OrderedDict ist die LRU-Reihenfolge.
+# id_index ist bei Listen (whitelist/trusted/blacklist) ein lazily gebautes Set der User-IDs als int.
+LIST_CATEGORIES = ("whitelist", "trusted", "blacklist")
+CACHE_TTL = int(os.getenv("GLOBEX_CACHE_TTL", "600"))
+CACHE_MAX_GUILDS = int(os.getenv("GLOBEX_CACHE_MAX_GUILDS", "5000"))
+
+_cache = OrderedDict()
+cache_stats = {"hits": 0, "misses": 0, "invalidations": 0, "evictions": 0, "fallbacks": 0, "fallback_empty": 0}
+
+def _cache_get(category, guild_id):
+    entry = _cache.get(guild_id)
+    if entry is None or category not in entry:
+        return None
+    loaded_at, doc, _ = entry[category]
+    if time.monotonic() - loaded_at > CACHE_TTL:
+        # Abgelaufen, bleibt aber als Notfall-Kopie für _fallback liegen, bis neu geladen wird
+        return None
+    _cache.move_to_end(guild_id)
+    return doc
+
+def _cache_put(category, guild_id, doc):
+    entry = _cache.get(guild_id)
+    if entry is None:
+        entry = _cache[guild_id] = {}
+        while len(_cache) > CACHE_MAX_GUILDS:
+            _cache.popitem(last=False)
+            cache_stats["evictions"] += 1
+    entry[category] = [time.monotonic(), doc, None]
+    _cache.move_to_end(guild_id)
+
+def _expire_all():
+    for entry in _cache.values():
+        for slot in entry.values():
+            slot[0] = 0.0
+
+def _fallback(category, guild_id, error):
+    """Datenbank zu langsam oder nicht erreichbar: letzte bekannte Konfig statt zu blockieren."""
+    cache_stats["fallbacks"] += 1
+    swallowed(f"db.{category}", error)
+    slot = _cache.get(guild_id, {}).get(category)
+    if slot is None:
+        cache_stats["fallback_empty"] += 1
+        return {}
+    return slot[1]
+
+def _build_index(doc):
+    return {int(uid) for uid in doc.get("users", []) if str(uid).isdigit()}
+
+def _index_for(list_type, guild_id, doc):
+    """Gibt das ID-Set einer Liste zurück und baut es beim ersten Zugriff aus dem Dokument."""
+    slot = _cache.get(guild_id, {}).get(list_type)
+    if slot is None:
+        return _build_index(doc)
+    if slot[2] is None:
+        slot[2] = _build_index(doc)
+    return slot[2]
+
+def _patch_list(list_type, guild_id, user_id, add):
+    # Cache-Dokument und Index nach einem eigenen Schreibzugriff inkrementell nachziehen
+    slot = _cache.get(str(guild_id), {}).get(list_type)
+    if slot is None:
+        return
+    users = slot[1].setdefault("users", [])
+    uid = str(user_id)
+    if add and uid not in users:
+        users.append(uid)
+    elif not add and uid in users:
+        users.remove(uid)
+    if slot[2] is not None:
+        if add: slot[2].add(int(user_id))
+        else: slot[2].discard(int(user_id))
+
+_listeners = {}
+
+def subscribe(category, callback):
+    """Registriert callback(category, guild_id) für Änderungen an einer Collection
+    (eigene Schreibzugriffe und Change Stream)."""
+    _listeners.setdefault(category, []).append(callback)
+
+def invalidate(category, guild_id):
+    """Entfernt ein Dokument aus dem Cache, damit der nächste Zugriff frisch lädt."""
+    entry = _cache.get(str(guild_id))
+    if entry and entry.pop(category, None) is not None:
+        cache_stats["invalidations"] += 1
+    for callback in _listeners.get(category, ()):
+        callback(category, str(guild_id))
+
+def get_cache_stats():
+    """Liefert Trefferquote und Größe des Konfig-Caches."""
+    total = cache_stats["hits"] + cache_stats["misses"]
+    return {
+        **cache_stats,
+        "guilds": len(_cache),
+        "hit_rate": round(cache_stats["hits"] / total, 4) if total else 0.0,
+    }
+
+async def watch_changes():
+    """Hört auf Änderungen an den Konfig-Collections (Mongo Change Stream) und invalidiert den
+    Cache, damit mehrere Bot-Prozesse konsistent bleiben. Ohne Change Stream greift nur die TTL."""
+    # Nach einer Unterbrechung kann eine Änderung verpasst worden sein; die Einträge
+    # bleiben aber als Fallback erhalten, falls die Datenbank gerade ganz weg ist
+    await backend.watch(CACHED_CATEGORIES, invalidate, _expire_all)
+
+@instrument("db")
 async def get_data(category, guild_id):
     """Holt Daten für einen Server aus einer bestimmten Collection."""
-    collection = db[category]
-    data = await collection.find_one({"_id": str(guild_id)})
+    gid = str(guild_id)
+    if category in CACHED_CATEGORIES:
+        doc = _cache_get(category, gid)
+        if doc is not None:
+            cache_stats["hits"] += 1
+            return doc
+        cache_stats["misses"] += 1
+        try:
+            data = await asyncio.wait_for(backend.get(category, gid), CONFIG_DEADLINE)
+        except (asyncio.TimeoutError, *backend.errors) as e:
+            return _fallback(category, gid, e)
+        data = data if data else {}
+        _cache_put(category, gid, data)
+        return data
+    data = await backend.get(category, gid, primary=True)
     return data if data else {}
 
+@instrument("db")
+async def get_active_adm_timers():
+    """Alle ADM-Timer mit adm_status == 1 in einer Abfrage."""
+    return await backend.find("adm_timer", "adm_status", 1)
+
+def _write_through(category, guild_id, doc):
+    # Das von find_one_and_update gelieferte Dokument ersetzt den Cache-Eintrag direkt
+    if category in CACHED_CATEGORIES:
+        _cache_put(category, guild_id, doc)
+    for callback in _listeners.get(category, ()):
+        callback(category, guild_id)
+    return doc
+
 async def update_data(category, guild_id, key, value):
-    """Aktualisiert oder erstellt einen Wert in der Datenbank."""
-    collection = db[category]
-    await collection.update_one(
-        {"_id": str(guild_id)},
-        {"$set": {key: value}},
-        upsert=True
-    )
+    """Aktualisiert oder erstellt einen Wert in der Datenbank und gibt das neue Dokument zurück."""
+    return await update_many_fields(category, guild_id, {key: value})
+
+@instrument("db")
+async def update_many_fields(category, guild_id, fields):
+    """Setzt mehrere Felder in einem Schreibzugriff und gibt das neue Dokument zurück."""
+    gid = str(guild_id)
+    async def direct():
+        return _write_through(category, gid, await backend.set_fields(category, gid, fields))
+    return await _write(category, gid, "set", fields, direct)
 
+@instrument("db")
+async def toggle_field(category, guild_id, key, off=0, on=1):
+    """Schaltet ein Feld atomar zwischen zwei Werten um (fehlt es, gilt `off`)
+    und gibt das neue Dokument zurück -- ein Roundtrip pro Button-Klick."""
+    gid = str(guild_id)
+    async def direct():
+        return _write_through(category, gid, await backend.toggle(category, gid, key, off, on))
+    # Im Journal als fester Wert: ein erneutes Abspielen darf nicht noch einmal umschalten
+    return await _write(category, gid, "set", lambda base: {key: _toggled(base, key, off, on)}, direct)
+
+# Nicht instrumentiert: die Zeit steckt schon in get_data, sonst zählt jede Prüfung doppelt
 async def is_on_list(guild_id, user_id, list_type):
     """Prüft, ob eine User-ID in einer Liste (z.B. Whitelist) steht."""
-    collection = db[list_type]
-    data = await collection.find_one({"_id": str(guild_id)})
-    if data and str(user_id) in data.get("users", []):
-        return True
-    return False
+    data = await get_data(list_type, guild_id)
+    return int(user_id) in _index_for(list_type, str(guild_id), data)
+
+async def are_on_list(guild_id, user_ids, list_type):
+    """Prüft mehrere User-IDs auf einmal und gibt die gelisteten IDs als Set zurück."""
+    data = await get_data(list_type, guild_id)
+    index = _index_for(list_type, str(guild_id), data)
+    return {int(uid) for uid in user_ids if int(uid) in index}
 
+@instrument("db")
 async def add_to_list(guild_id, user_id, list_type):
     """Fügt einen User zu einer Liste hinzu (ohne Dubletten)."""
-    collection = db[list_type]
-    await collection.update_one(
-        {"_id": str(guild_id)},
-        {"$addToSet": {"users": str(user_id)}},
-        upsert=True
-    )
+    gid = str(guild_id)
+    async def direct():
+        await backend.add_to_set(list_type, gid, str(user_id))
+        _patch_list(list_type, gid, user_id, add=True)
+    await _write(list_type, gid, "add", str(user_id), direct)
 
+@instrument("db")
 async def remove_from_list(guild_id, user_id, list_type):
     """Entfernt einen User aus einer Liste."""
-    collection = db[list_type]
-    await collection.update_one(
-        {"_id": str(guild_id)},
-        {"$pull": {"users": str(user_id)}}
-    )
+    gid = str(guild_id)
+    async def direct():
+        await backend.pull(list_type, gid, str(user_id))
+        _patch_list(list_type, gid, user_id, add=False)
+    await _write(list_type, gid, "pull", str(user_id), direct)
+
+# --- LIST PAGES ---
+# Für die Listen-Ansicht im Menü: nur die sichtbare Seite wird übertragen (Mongo: $slice/$size,
+# SQLite: json_each), egal wie groß die Liste ist. Liegt die Liste frisch im Cache (oder hat der
+# Server noch offene Writes), wird direkt aus dem Cache geschnitten.
+def _local_list(list_type, gid):
+    if gid in _pending_guilds:
+        slot = _cache.get(gid, {}).get(list_type)
+        return slot[1] if slot else None
+    return _cache_get(list_type, gid)
+
+@instrument("db")
+async def get_list_page(guild_id, list_type, page=0, page_size=20):
+    """Gibt (IDs der Seite, Gesamtzahl) zurück."""
+    gid = str(guild_id)
+    doc = _local_list(list_type, gid)
+    if doc is None:
+        try:
+            return await asyncio.wait_for(backend.list_page(list_type, gid, page * page_size, page_size), CONFIG_DEADLINE)
+        except (asyncio.TimeoutError, *backend.errors) as e:
+            doc = _fallback(list_type, gid, e)
+    users = doc.get("users", [])
+    return users[page * page_size:(page + 1) * page_size], len(users)
+
+@instrument("db")
+async def find_in_list(guild_id, list_type, user_id):
+    """Position einer ID in der Liste (für die Suche), None wenn sie nicht drinsteht."""
+    gid, uid = str(guild_id), str(user_id)
+    doc = _local_list(list_type, gid)
+    if doc is None:
+        try:
+            return await asyncio.wait_for(backend.list_index(list_type, gid, uid), CONFIG_DEADLINE)
+        except (asyncio.TimeoutError, *backend.errors) as e:
+            doc = _fallback(list_type, gid, e)
+    users = doc.get("users", [])
+    return users.index(uid) if uid in users else None
+
+# --- WRITE-BEHIND ---
+# Schreibzugriffe gehen normalerweise direkt an das Backend. Schlägt das wegen der Verbindung fehl
+# (oder hat der Server schon offene Writes, damit die Reihenfolge pro Server erhalten bleibt),
+# wird die Änderung sofort im Cache angewendet, an ein lokales Append-only-Journal gehängt und
+# später per bulk_write nachgeholt. Journal-Operationen sind idempotent ($set mit festem Wert,
+# $addToSet, $pull), ein erneutes Abspielen nach einem Absturz ist also harmlos.
+# Ein Journal pro Cluster-Prozess (cluster.py): Sequenznummern, Replay und Leeren gelten nur für
+# die eigenen Writes, sonst spielt ein Prozess fremde Writes ab oder löscht sie
+_CLUSTER_ID = os.getenv("GLOBEX_CLUSTER_ID")
+WRITE_JOURNAL = os.getenv("GLOBEX_WRITE_JOURNAL",
+                          f".write_journal.{_CLUSTER_ID}.jsonl" if _CLUSTER_ID else ".write_journal.jsonl")
+# Direkter Write und ggf. Laden der Basis bleiben zusammen unter Discords 3-s-Interaction-Fenster
+WRITE_DEADLINE = float(os.getenv("GLOBEX_WRITE_DEADLINE", "1"))
+
+_pending_writes = []   # [(seq, category, guild_id, op, arg)] in Eingangsreihenfolge
+_pending_guilds = {}   # guild_id -> Anzahl offener Writes
+_write_seq = itertools.count(1)
+_write_wakeup = asyncio.Event()
+write_stats = {"direct": 0, "queued": 0, "flushed": 0, "dropped": 0, "last_error": None}
+
+async def _write(category, gid, op, arg, direct):
+    """`arg` darf eine Funktion der Basis sein (toggle_field), dann wird er erst hier berechnet."""
+    if gid not in _pending_guilds:
+        try:
+            result = await asyncio.wait_for(direct(), WRITE_DEADLINE)
+            write_stats["direct"] += 1
+            return result
+        except (asyncio.TimeoutError, *backend.transient) as e:
+            _write_failed(e)
+    base = await _load_base(category, gid)
+    return _queue_write(category, gid, op, arg(base) if callable(arg) else arg, base)
+
+def _write_failed(error):
+    write_stats["last_error"] = f"{type(error).__name__}: {error}"[:200]
+    swallowed("db.write", error)
+
+def _toggled(base, key, off, on):
+    current = base.get(key, off) if base is not None else off
+    return on if current == off else off
+
+async def _load_base(category, gid):
+    """Volles Dokument, auf das ein vorgemerkter Write angewendet wird (Cache, auch abgelaufen,
+    sonst ein kurzer Leseversuch). None, wenn es gerade nicht zu bekommen ist."""
+    slot = _cache.get(gid, {}).get(category)
+    if slot is not None: return slot[1]
+    try:
+        doc = await asyncio.wait_for(backend.get(category, gid, primary=True), WRITE_DEADLINE)
+    except (asyncio.TimeoutError, *backend.errors) as e:
+        swallowed("db.write_base", e)
+        return None
+    doc = doc if doc else {"_id": gid}
+    if category in CACHED_CATEGORIES: _cache_put(category, gid, doc)
+    return doc
+
+def _apply_local(category, gid, op, arg, base):
+    doc = dict(base) if base is not None else {"_id": gid}
+    if op != "set": doc["users"] = list(doc.get("users", []))
+    apply_op(doc, op, arg)
+    # Nur mit bekannter Basis cachen, sonst würde ein Teil-Dokument die echte Konfig verdecken
+    if base is not None and category in CACHED_CATEGORIES:
+        _cache_put(category, gid, doc)
+        # Bis zum Flush nicht von der Datenbank überschreiben lassen
+        _cache[gid][category][0] = float("inf")
+    return doc
+
+def _journal_append(record):
+    with open(WRITE_JOURNAL, "a") as f:
+        f.write(json.dumps(record) + "\n")
+        f.flush()
+        os.fsync(f.fileno())
+
+def _queue_write(category, gid, op, arg, base):
+    seq = next(_write_seq)
+    _journal_append({"seq": seq, "category": category, "guild_id": gid, "op": op, "arg": arg})
+    _pending_writes.append((seq, category, gid, op, arg))
+    _pending_guilds[gid] = _pending_guilds.get(gid, 0) + 1
+    write_stats["queued"] += 1
+    _write_wakeup.set()
+    doc = _apply_local(category, gid, op, arg, base)
+    for callback in _listeners.get(category, ()):
+        callback(category, gid)
+    return doc
+
+def _load_journal():
+    """Übernimmt beim Start alle noch nicht bestätigten Writes aus dem Journal."""
+    global _write_seq
+    entries, acked = {}, set()
+    try:
+        with open(WRITE_JOURNAL) as f:
+            for line in f:
+                try: record = json.loads(line)
+                except ValueError: continue  # abgebrochene letzte Zeile
+                if "ack" in record: acked.update(record["ack"])
+                else: entries[record["seq"]] = record
+    except OSError:
+        return 0
+    acked.update(entry[0] for entry in _pending_writes)
+    for seq in sorted(entries):
+        if seq in acked: continue
+        r = entries[seq]
+        _pending_writes.append((seq, r["category"], r["guild_id"], r["op"], r["arg"]))
+        _pending_guilds[r["guild_id"]] = _pending_guilds.get(r["guild_id"], 0) + 1
+    _write_seq = itertools.count(max(entries, default=0) + 1)
+    if _pending_writes:
+        print(f"📒 {len(_pending_writes)} pending config writes recovered from journal")
+        _write_wakeup.set()
+    return len(_pending_writes)
+
+def _ack(entries):
+    seqs = {entry[0] for entry in entries}
+    _pending_writes[:] = [entry for entry in _pending_writes if entry[0] not in seqs]
+    touched = set()
+    for _, category, gid, _, _ in entries:
+        _pending_guilds[gid] -= 1
+        if not _pending_guilds[gid]: del _pending_guilds[gid]
+        touched.add((category, gid))
+    if _pending_writes:
+        _journal_append({"ack": sorted(seqs)})
+    else:
+        open(WRITE_JOURNAL, "w").close()  # alles bestätigt -> Journal leeren
+    for category, gid in touched:
+        if gid not in _pending_guilds:
+            # Nur als abgelaufen markieren: der nächste Lesezugriff lädt die Version vom Server,
+            # bis dahin bleibt das Dokument Basis für weitere vorgemerkte Writes
+            slot = _cache.get(gid, {}).get(category)
+            if slot is not None: slot[0] = float("-inf")
+            for callback in _listeners.get(category, ()):
+                callback(category, gid)
+
+async def flush_writes():
+    """Schreibt offene Writes per backend.bulk, eine geordnete Batch pro Collection
+    (die Reihenfolge pro Server bleibt damit erhalten)."""
+    by_category = {}
+    for entry in list(_pending_writes):
+        by_category.setdefault(entry[1], []).append(entry)
+    for category, entries in by_category.items():
+        try:
+            await backend.bulk(category, [(gid, op, arg) for _, _, gid, op, arg in entries])
+            write_stats["flushed"] += len(entries)
+        except backend.transient:
+            raise
+        except backend.errors as e:
+            # Kein Verbindungsproblem: erneutes Senden hilft nicht, Batch verwerfen statt festzuhängen
+            write_stats["dropped"] += len(entries)
+            print(f"❌ Dropping {len(entries)} queued writes for {category}: {e}")
+        _ack(entries)
+
+async def run_write_behind():
+    _load_journal()
+    delay = 1
+    while True:
+        await _write_wakeup.wait()
+        _write_wakeup.clear()
+        while _pending_writes:
+            try:
+                await flush_writes()
+                delay = 1
+            except backend.transient as e:
+                _write_failed(e)
+                await asyncio.sleep(delay)
+                delay = min(delay * 2, 60)
+
+def write_status():
+    """Für die Status-Anzeige im Menü und die Metriken."""
+    return {**write_stats, "pending": len(_pending_writes), "pending_guilds": len(_pending_guilds)}
+
+# --- GUILD SNAPSHOTS ---
+@instrument("db")
+async def load_snapshot(guild_id):
+    """Lädt den gespeicherten Rollen-/Kanal-Snapshot eines Servers."""
+    data = await backend.get("snapshots", str(guild_id), primary=True)
+    return data if data else {}
+
+@instrument("db")
+async def save_snapshot(guild_id, snapshot):
+    """Ersetzt den gespeicherten Snapshot eines Servers."""
+    await backend.replace("snapshots", str(guild_id), snapshot)
+
+# --- SECURITY EVENT STORE ---
+# Append-only Collection: {guild_id, ts, kind, actor_id, target_id, detail}. Geschrieben wird nur
+# gebündelt über eventlog.EventBuffer, nie direkt aus den Handlern.
+# GLOBEX_EVENT_STORE: "standard" (TTL-Index), "timeseries" (Ablauf über expireAfterSeconds)
+# oder "capped" (feste Größe, ältestes fällt raus, keine TTL). Gilt für Mongo; SQLite und
+# In-Memory löschen einfach alles, was älter als die Aufbewahrungszeit ist.
+EVENT_STORE_MODE = os.getenv("GLOBEX_EVENT_STORE", "standard")
+EVENT_RETENTION_DAYS = int(os.getenv("GLOBEX_EVENT_RETENTION_DAYS", "30"))
+EVENT_CAPPED_MB = int(os.getenv("GLOBEX_EVENT_CAPPED_MB", "256"))
+
+async def ensure_event_store():
+    """Legt die Event-Collection und ihre Indizes an (idempotent)."""
+    await backend.ensure_event_store(EVENT_STORE_MODE, EVENT_RETENTION_DAYS * 86400, EVENT_CAPPED_MB)
+
+@instrument("db")
+async def insert_events(events):
+    """Schreibt einen Batch Events mit einem Aufruf."""
+    if events:
+        await backend.insert_events(events)
+
+@instrument("db")
+async def query_events(guild_id, actor_id=None, before=None, limit=10):
+    """Neueste Events zuerst. Pagination über before=(ts, _id) des letzten Eintrags der
+    vorherigen Seite (Keyset statt skip, nutzt den (guild_id, [actor_id,] ts)-Index)."""
+    return await backend.query_events(str(guild_id), str(actor_id) if actor_id else None, before, limit)
+
+# --- CACHE WARM-UP ---
+WARM_BATCH = int(os.getenv("GLOBEX_WARM_BATCH", "200"))
+WARM_CONCURRENCY = int(os.getenv("GLOBEX_WARM_CONCURRENCY", "4"))
+
+@instrument("db")
+async def warm_cache(guild_ids, batch_size=WARM_BATCH, concurrency=WARM_CONCURRENCY):
+    """Lädt die Konfig aller Server beim Start in den Cache: pro Collection und Batch
+    eine Abfrage, höchstens `concurrency` Abfragen gleichzeitig."""
+    gids = [str(g) for g in guild_ids]
+    slots = asyncio.Semaphore(concurrency)
+
+    async def load(category, batch):
+        async with slots:
+            found = await backend.get_many(category, batch)
+        for gid in batch:
+            _cache_put(category, gid, found.get(gid, {}))
+
+    await asyncio.gather(*(
+        load(category, gids[i:i + batch_size])
+        for category in CACHED_CATEGORIES
+        for i in range(0, len(gids), batch_size)
+    ))
+    return len(gids)
+
+# --- GUILD SECURITY PROFILE ---
+class GuildSecurityProfile:
+    """Alle Konfig-Dokumente eines Servers, einmal pro Event geladen und durch
+    Event -> Bestrafung -> Log gereicht."""
+    __slots__ = ("guild_id", "_members") + CACHED_CATEGORIES
+
+    def __init__(self, guild_id, docs):
+        self.guild_id = guild_id
+        for category in CACHED_CATEGORIES:
+            setattr(self, category, docs.get(category) or {})
+        self._members = {
+            list_type: _index_for(list_type, guild_id, getattr(self, list_type))
+            for list_type in LIST_CATEGORIES
+        }
+
+    def is_on_list(self, user_id, list_type):
+        return int(user_id) in self._members[list_type]
+
+    def list_ids(self, list_type):
+        """Das ID-Set einer Liste (nur lesen, es ist der Cache-Index)."""
+        return self._members[list_type]
+
+# Laufende Profil-Ladevorgänge pro Server: gleichzeitige Events teilen sich einen Ladevorgang
+_profile_loads = {}
+
+async def _load_profile_docs(gid, missing):
+    loaded = await backend.get_profile_docs(gid, missing)
+    for category in missing:
+        _cache_put(category, gid, loaded[category])
+    return loaded
+
+def _profile_loaded(gid, future):
+    _profile_loads.pop(gid, None)
+    # Fehler abholen, auch wenn alle Wartenden schon per Deadline ausgestiegen sind
+    if not future.cancelled(): future.exception()
+
+@instrument("db")
+async def get_profile(guild_id):
+    """Lädt das Sicherheitsprofil eines Servers: Cache-Treffer kosten nichts,
+    fehlende Collections werden mit einem Backend-Aufruf nachgeladen (Mongo: eine Aggregation)."""
+    gid = str(guild_id)
+    docs = {category: _cache_get(category, gid) for category in CACHED_CATEGORIES}
+    missing = [category for category, doc in docs.items() if doc is None]
+    cache_stats["hits"] += len(CACHED_CATEGORIES) - len(missing)
+    if missing:
+        cache_stats["misses"] += len(missing)
+        load = _profile_loads.get(gid)
+        if load is None:
+            load = _profile_loads[gid] = asyncio.ensure_future(_load_profile_docs(gid, missing))
+            load.add_done_callback(lambda f: _profile_loaded(gid, f))
+        try:
+            # shield: läuft nach einem Timeout weiter und füllt den Cache für spätere Events
+            loaded = await asyncio.wait_for(asyncio.shield(load), CONFIG_DEADLINE)
+        except (asyncio.TimeoutError, *backend.errors) as e:
+            loaded = {category: _fallback(category, gid, e) for category in missing}
+        for category in missing:
+            docs[category] = loaded[category] if category in loaded else await get_data(category, gid)
+    return GuildSecurityProfile(gid, docs)
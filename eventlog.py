@@ -0,0 +1,82 @@
+import asyncio
+import datetime
+import os
+from collections import deque
+import database as db
+
+# --- SECURITY EVENT BUFFER ---
+# record() hängt nur an eine begrenzte Queue an und kehrt sofort zurück; ein Hintergrund-Task
+# schreibt gebündelt per insert_many. Enforcement wartet so nie auf die Datenbank.
+
+BATCH_SIZE = int(os.getenv("GLOBEX_EVENT_BATCH", "200"))
+FLUSH_INTERVAL = float(os.getenv("GLOBEX_EVENT_FLUSH_INTERVAL", "2"))
+MAX_PENDING = int(os.getenv("GLOBEX_EVENT_MAX_PENDING", "20000"))
+DETAIL_MAX = 500
+
+
+class EventBuffer:
+    def __init__(self, batch_size=BATCH_SIZE, flush_interval=FLUSH_INTERVAL, max_pending=MAX_PENDING):
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.max_pending = max_pending
+        self._pending = deque()
+        self._wakeup = asyncio.Event()
+        self.stats = {"recorded": 0, "written": 0, "dropped": 0, "batches": 0, "errors": 0}
+
+    def record(self, guild_id, kind, actor_id=None, target_id=None, detail=None):
+        if len(self._pending) >= self.max_pending:
+            # Ältestes verwerfen: die letzten Events sind bei einem Vorfall die wichtigsten
+            self._pending.popleft()
+            self.stats["dropped"] += 1
+        self._pending.append({
+            "guild_id": str(guild_id),
+            "ts": datetime.datetime.now(datetime.timezone.utc),
+            "kind": kind,
+            "actor_id": str(actor_id) if actor_id else None,
+            "target_id": str(target_id) if target_id else None,
+            "detail": detail[:DETAIL_MAX] if detail else None,
+        })
+        self.stats["recorded"] += 1
+        if len(self._pending) >= self.batch_size:
+            self._wakeup.set()
+
+    async def flush(self):
+        while self._pending:
+            batch = [self._pending.popleft() for _ in range(min(self.batch_size, len(self._pending)))]
+            try:
+                await db.insert_events(batch)
+            except db.backend.transient as e:
+                # Verbindungsproblem: Batch zurücklegen und beim nächsten Intervall erneut versuchen.
+                # Schon geschriebene Events behalten ihre _id, das Backend erkennt sie beim Retry als Duplikat.
+                self.stats["errors"] += 1
+                print(f"Event store write failed ({len(batch)} events), retrying: {e}")
+                self._pending.extendleft(reversed(batch))
+                while len(self._pending) > self.max_pending:
+                    self._pending.popleft()
+                    self.stats["dropped"] += 1
+                return
+            except Exception as e:
+                # Erneutes Senden hilft nicht, Batch verwerfen statt die Queue zu blockieren
+                self.stats["errors"] += 1
+                self.stats["dropped"] += len(batch)
+                print(f"❌ Dropping {len(batch)} events: {e}")
+                continue
+            self.stats["written"] += len(batch)
+            self.stats["batches"] += 1
+
+    async def run(self):
+        # Indizes/Collection-Typ zuerst, sonst legt das erste insert_many eine Standard-Collection an
+        try:
+            await db.ensure_event_store()
+        except Exception as e:
+            print(f"⚠️ Event store setup failed: {e}")
+        while True:
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), self.flush_interval)
+            except asyncio.TimeoutError:
+                pass
+            self._wakeup.clear()
+            await self.flush()
+
+    def metrics(self):
+        return {**self.stats, "pending": len(self._pending)}
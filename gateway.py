@@ -0,0 +1,88 @@
+import os
+import resource
+import time
+from collections import OrderedDict
+import discord
+
+# --- LEAN GATEWAY MODE ---
+# GLOBEX_LEAN=1: nur die Intents, die der Bot wirklich nutzt, kein Presence-/Message-Cache,
+# keine Member-Chunks beim Start. Fehlende Member werden bei Bedarf per fetch_member geholt.
+
+LEAN_MODE = os.getenv("GLOBEX_LEAN", "0") == "1"
+MEMBER_LRU_SIZE = int(os.getenv("GLOBEX_MEMBER_LRU", "512"))
+# Nicht gefundene Member (z.B. bereits gebannt) kurz merken, damit ein Raid keine Fetch-Flut auslöst
+NOT_FOUND_TTL = 30
+
+
+def lean_intents():
+    intents = discord.Intents.none()
+    intents.guilds = True           # Channel-/Rollen-Events, get_role, owner_id
+    intents.members = True          # on_member_join
+    intents.webhooks = True         # on_webhooks_update
+    intents.guild_messages = True   # on_message
+    intents.message_content = True  # Invite-/Inhalts-Scan
+    return intents
+
+
+def client_options():
+    """Intents und Cache-Einstellungen für GlobexBot.__init__."""
+    if not LEAN_MODE:
+        return {"intents": discord.Intents.all()}
+    return {
+        "intents": lean_intents(),
+        "max_messages": None,
+        "member_cache_flags": discord.MemberCacheFlags.none(),
+        "chunk_guilds_at_startup": False,
+    }
+
+
+def rss_mb():
+    # ru_maxrss ist unter Linux in KiB
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+class MemberResolver:
+    """get_member mit Fallback auf fetch_member und einem kleinen LRU für geholte Member."""
+
+    def __init__(self, size=MEMBER_LRU_SIZE):
+        self.size = size
+        self._lru = OrderedDict()
+        self._missing = OrderedDict()  # (guild_id, user_id) -> gültig bis
+        self.stats = {"cache_hits": 0, "lru_hits": 0, "fetches": 0, "not_found": 0}
+
+    async def get(self, guild, user_id):
+        member = guild.get_member(user_id)
+        if member is not None:
+            self.stats["cache_hits"] += 1
+            return member
+        key = (guild.id, user_id)
+        member = self._lru.get(key)
+        if member is not None:
+            self._lru.move_to_end(key)
+            self.stats["lru_hits"] += 1
+            return member
+        if self._missing.get(key, 0) > time.monotonic():
+            return None
+        self.stats["fetches"] += 1
+        try:
+            member = await guild.fetch_member(user_id)
+        except (discord.NotFound, discord.Forbidden):
+            self.stats["not_found"] += 1
+            self._missing[key] = time.monotonic() + NOT_FOUND_TTL
+            if len(self._missing) > self.size:
+                self._missing.popitem(last=False)
+            return None
+        self._lru[key] = member
+        if len(self._lru) > self.size:
+            self._lru.popitem(last=False)
+        return member
+
+    def forget(self, guild_id, user_id):
+        self._lru.pop((guild_id, user_id), None)
+        self._missing.pop((guild_id, user_id), None)
+
+
+def startup_report(started_at, guilds):
+    mode = "lean" if LEAN_MODE else "full"
+    return (f"📊 Gateway mode: {mode} | Startup: {time.monotonic() - started_at:.1f}s | "
+            f"Guilds: {guilds} | Peak RSS: {rss_mb():.0f} MB")
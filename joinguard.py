@@ -0,0 +1,195 @@
+import asyncio
+import datetime
+import os
+import re
+import time
+from array import array
+from collections import Counter, deque
+import discord
+
+# --- JOIN RAID DETECTION ---
+# Pro Server ein Histogramm der Joins in 1-Sekunden-Buckets (Ringpuffer, 60 Buckets).
+# Überschreitet die Join-Rate das Limit, geht der Server in den Lockdown: verdächtige
+# Accounts (jung, Standard-Avatar, Namensmuster) der letzten Sekunden und alle weiteren
+# verdächtigen Joiner werden gesammelt und in Batches bestraft -- Bann per Bulk-Ban,
+# Kick/Timeout parallel mit begrenzter Nebenläufigkeit.
+
+BUCKETS = 60
+DEFAULT_LIMIT = 10
+DEFAULT_WINDOW = 10
+LOCKDOWN_DURATION = int(os.getenv("GLOBEX_LOCKDOWN_DURATION", "600"))
+MIN_SCORE = int(os.getenv("GLOBEX_JOIN_MIN_SCORE", "2"))
+RECENT_MAX = 500
+BATCH_DELAY = 1.0
+BULK_BAN_SIZE = 200
+ACTION_CONCURRENCY = int(os.getenv("GLOBEX_JOIN_ACTION_CONCURRENCY", "5"))
+TIMEOUT_DURATION = datetime.timedelta(hours=int(os.getenv("GLOBEX_JOIN_TIMEOUT_HOURS", "12")))
+IDLE_HORIZON = 3600
+REASON = "Globex Security: Join Raid Protection"
+
+_DIGIT_SUFFIX = re.compile(r"\d{3,}$")
+_STEM_NOISE = re.compile(r"[\W\d_]+")
+
+
+def _stem(name):
+    return _STEM_NOISE.sub("", name.casefold())[:12]
+
+
+class _GuildJoins:
+    __slots__ = ("buckets", "head", "recent", "stems", "lockdown_until", "batch", "punishment", "flusher", "last_join")
+
+    def __init__(self):
+        self.buckets = array("H", bytes(2 * BUCKETS))
+        self.head = 0            # Sekunde (int) des neuesten Buckets
+        self.recent = deque()    # (zeit, member, score, stamm) der letzten Joiner
+        self.stems = Counter()   # Namens-Stämme in recent
+        self.lockdown_until = 0.0
+        self.batch = []
+        self.punishment = None
+        self.flusher = None
+        self.last_join = 0.0
+
+    def add(self, now, window):
+        """Zählt einen Join und gibt die Joins der letzten `window` Sekunden zurück."""
+        second = int(now)
+        for s in range(self.head + 1, min(second, self.head + BUCKETS) + 1):
+            self.buckets[s % BUCKETS] = 0
+        self.head = max(self.head, second)
+        i = second % BUCKETS
+        if self.buckets[i] < 0xFFFF:
+            self.buckets[i] += 1
+        return sum(self.buckets[(second - k) % BUCKETS] for k in range(window))
+
+    def remember(self, now, member, score, stem):
+        if len(self.recent) >= RECENT_MAX:
+            _, _, _, old = self.recent.popleft()
+            self.stems[old] -= 1
+            if not self.stems[old]: del self.stems[old]
+        self.recent.append((now, member, score, stem))
+        self.stems[stem] += 1
+
+
+def account_score(member, stems=None):
+    """Verdachtspunkte: Account-Alter, Standard-Avatar, Zahlen-Suffix, gleicher Namensstamm
+    wie andere aktuelle Joiner."""
+    score = 0
+    age = discord.utils.utcnow() - member.created_at
+    if age < datetime.timedelta(days=1): score += 3
+    elif age < datetime.timedelta(days=7): score += 2
+    elif age < datetime.timedelta(days=30): score += 1
+    if member.avatar is None: score += 1
+    if _DIGIT_SUFFIX.search(member.name): score += 1
+    if stems is not None:
+        stem = _stem(member.name)
+        if len(stem) >= 3 and stems.get(stem, 0) >= 2: score += 2
+    return score
+
+
+class JoinGuard:
+    def __init__(self, report=None):
+        # report(guild_id, title, text): Log-Ausgabe, z.B. send_globex_log
+        self.report = report
+        self._guilds = {}
+        self.stats = {"joins": 0, "lockdowns": 0, "queued": 0, "actioned": 0, "failed": 0, "batches": 0}
+
+    def record(self, member, settings, limits):
+        """Verbucht einen Join. Gibt True zurück, wenn der Server gerade in den Lockdown gewechselt ist."""
+        self.stats["joins"] += 1
+        now = time.monotonic()
+        state = self._guilds.get(member.guild.id)
+        if state is None:
+            state = self._guilds[member.guild.id] = _GuildJoins()
+        state.last_join = now
+        window = min(limits.get("join_time") or DEFAULT_WINDOW, BUCKETS)
+        limit = limits.get("join_limit") or DEFAULT_LIMIT
+        rate = state.add(now, window)
+        score = account_score(member, state.stems)
+        state.remember(now, member, score, _stem(member.name))
+        state.punishment = settings.get("join_raid_punish") or "kick"
+
+        if state.lockdown_until > now:
+            if rate >= limit:
+                state.lockdown_until = now + LOCKDOWN_DURATION
+            if score >= MIN_SCORE:
+                self._queue(member.guild, state, member)
+            return False
+        if rate < limit:
+            return False
+        state.lockdown_until = now + LOCKDOWN_DURATION
+        self.stats["lockdowns"] += 1
+        # Die Joiner, die den Spike ausgelöst haben, nachträglich einsammeln
+        for joined, m, s, _ in state.recent:
+            if now - joined <= window and s >= MIN_SCORE:
+                self._queue(member.guild, state, m)
+        return True
+
+    def in_lockdown(self, guild_id):
+        state = self._guilds.get(guild_id)
+        return state is not None and state.lockdown_until > time.monotonic()
+
+    def end_lockdown(self, guild_id):
+        state = self._guilds.get(guild_id)
+        if state is not None:
+            state.lockdown_until = 0.0
+
+    def _queue(self, guild, state, member):
+        state.batch.append(member)
+        self.stats["queued"] += 1
+        if state.flusher is None or state.flusher.done():
+            state.flusher = asyncio.get_running_loop().create_task(self._flush(guild, state))
+
+    async def _flush(self, guild, state):
+        # Kurz warten, damit die Joins der nächsten Sekunde im selben Batch landen
+        await asyncio.sleep(BATCH_DELAY)
+        while state.batch:
+            batch, state.batch = state.batch[:BULK_BAN_SIZE], state.batch[BULK_BAN_SIZE:]
+            done = await self._apply(guild, batch, state.punishment)
+            self.stats["batches"] += 1
+            self.stats["actioned"] += done
+            self.stats["failed"] += len(batch) - done
+            if self.report:
+                await self.report(guild.id, "Join Raid Action",
+                                  f"**Action:** {state.punishment.capitalize()}\n**Accounts:** {done}/{len(batch)}")
+
+    async def _apply(self, guild, batch, punishment):
+        if punishment == "ban":
+            try:
+                result = await guild.bulk_ban(batch, reason=REASON, delete_message_seconds=3600)
+                return len(result.banned)
+            except discord.HTTPException as e:
+                print(f"Join raid bulk ban failed in {guild.name}: {e}")
+                return 0
+        slots = asyncio.Semaphore(ACTION_CONCURRENCY)
+
+        async def one(member):
+            async with slots:
+                if punishment == "timeout":
+                    await member.timeout(TIMEOUT_DURATION, reason=REASON)
+                else:
+                    await member.kick(reason=REASON)
+        results = await asyncio.gather(*(one(m) for m in batch), return_exceptions=True)
+        return sum(1 for r in results if not isinstance(r, Exception))
+
+    async def join(self):
+        """Wartet, bis alle gesammelten Batches abgearbeitet sind."""
+        while True:
+            flushers = [s.flusher for s in self._guilds.values() if s.flusher is not None and not s.flusher.done()]
+            if not flushers:
+                return
+            await asyncio.gather(*flushers, return_exceptions=True)
+
+    def sweep(self):
+        now = time.monotonic()
+        for guild_id in [g for g, s in self._guilds.items()
+                         if s.lockdown_until <= now and not s.batch and now - s.last_join > IDLE_HORIZON]:
+            del self._guilds[guild_id]
+
+    async def run_sweeper(self, interval=300):
+        while True:
+            await asyncio.sleep(interval)
+            self.sweep()
+
+    def metrics(self):
+        now = time.monotonic()
+        return {**self.stats, "tracked_guilds": len(self._guilds),
+                "guilds_in_lockdown": sum(1 for s in self._guilds.values() if s.lockdown_until > now)}
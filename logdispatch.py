@@ -0,0 +1,147 @@
+import asyncio
+import datetime
+import os
+import time
+from collections import deque
+from zoneinfo import ZoneInfo
+import discord
+from metrics import swallowed
+
+# --- LOG DISPATCHER ---
+# Pro Server eine begrenzte Queue mit Hintergrund-Flusher: bis zu 10 Embeds pro Nachricht,
+# identische Events werden zu einem Eintrag mit Zähler zusammengefasst ("×37").
+
+MAX_QUEUE = int(os.getenv("GLOBEX_LOG_MAX_QUEUE", "500"))
+FLUSH_INTERVAL = float(os.getenv("GLOBEX_LOG_FLUSH_INTERVAL", "1.5"))
+# "oldest": älteste Events verwerfen, "newest": neue Events verwerfen, wenn die Queue voll ist
+DROP_POLICY = os.getenv("GLOBEX_LOG_DROP_POLICY", "oldest")
+EMBEDS_PER_MESSAGE = 10
+TZ_BERLIN = ZoneInfo("Europe/Berlin")
+
+
+class _LogEvent:
+    __slots__ = ("channel", "title", "description", "color", "first", "last", "count", "queued_at")
+
+    def __init__(self, channel, title, description, color):
+        self.channel = channel
+        self.title = title
+        self.description = description
+        self.color = color
+        self.first = self.last = datetime.datetime.now(TZ_BERLIN)
+        self.count = 1
+        self.queued_at = time.monotonic()
+
+    def to_embed(self):
+        title = self.title if self.count == 1 else f"{self.title} ×{self.count}"
+        embed = discord.Embed(title="**__🗃 Globex Security Log__**", description=self.description, color=self.color)
+        embed.add_field(name="Event:", value=title, inline=False)
+        time_str = self.first.strftime("%d.%m.%Y at %H:%M:%S")
+        if self.count > 1:
+            time_str += f" - {self.last.strftime('%H:%M:%S')}"
+        embed.set_footer(text=time_str)
+        return embed
+
+
+class _GuildQueue:
+    __slots__ = ("events", "merged", "dropped", "wakeup", "task")
+
+    def __init__(self):
+        self.events = deque()
+        self.merged = {}  # (channel_id, title, description) -> _LogEvent in der Queue
+        self.dropped = 0
+        self.wakeup = asyncio.Event()
+        self.task = None
+
+
+class LogDispatcher:
+    def __init__(self, max_queue=MAX_QUEUE, flush_interval=FLUSH_INTERVAL, drop_policy=DROP_POLICY):
+        self.max_queue = max_queue
+        self.flush_interval = flush_interval
+        self.drop_policy = drop_policy
+        self._queues = {}
+        self._latencies = deque(maxlen=1024)
+        self.stats = {"submitted": 0, "merged": 0, "dropped": 0, "messages": 0, "send_errors": 0}
+
+    def submit(self, guild_id, channel, title, description, color):
+        """Reiht ein Log-Event ein, ohne zu warten. Gibt False zurück, wenn es verworfen wurde."""
+        queue = self._queues.get(guild_id)
+        if queue is None:
+            queue = self._queues[guild_id] = _GuildQueue()
+        self.stats["submitted"] += 1
+
+        key = (channel.id, title, description)
+        pending = queue.merged.get(key)
+        if pending is not None:
+            pending.count += 1
+            pending.last = datetime.datetime.now(TZ_BERLIN)
+            self.stats["merged"] += 1
+            return True
+
+        if len(queue.events) >= self.max_queue:
+            queue.dropped += 1
+            self.stats["dropped"] += 1
+            if self.drop_policy == "newest":
+                return False
+            old = queue.events.popleft()
+            queue.merged.pop((old.channel.id, old.title, old.description), None)
+
+        event = _LogEvent(channel, title, description, color)
+        queue.events.append(event)
+        queue.merged[key] = event
+        if queue.task is None or queue.task.done():
+            queue.task = asyncio.get_running_loop().create_task(self._flusher(guild_id, queue))
+        if len(queue.events) >= EMBEDS_PER_MESSAGE:
+            queue.wakeup.set()
+        return True
+
+    async def _flusher(self, guild_id, queue):
+        while queue.events:
+            try:
+                await asyncio.wait_for(queue.wakeup.wait(), timeout=self.flush_interval)
+            except asyncio.TimeoutError:
+                pass
+            queue.wakeup.clear()
+            await self._flush(queue)
+        # Leere Queues nicht dauerhaft behalten
+        if not queue.events and self._queues.get(guild_id) is queue:
+            del self._queues[guild_id]
+
+    async def _flush(self, queue):
+        batch = []
+        # Platz für den Overflow-Hinweis in derselben Nachricht lassen
+        size = EMBEDS_PER_MESSAGE - (1 if queue.dropped else 0)
+        while queue.events and len(batch) < size:
+            event = queue.events.popleft()
+            queue.merged.pop((event.channel.id, event.title, event.description), None)
+            batch.append(event)
+        if queue.dropped:
+            dropped, queue.dropped = queue.dropped, 0
+            batch.append(_LogEvent(batch[0].channel, "⚠️ LOG OVERFLOW",
+                                   f"{dropped} log events were dropped during a burst.", discord.Color.red()))
+
+        by_channel = {}
+        for event in batch:
+            by_channel.setdefault(event.channel.id, (event.channel, []))[1].append(event)
+        for channel, events in by_channel.values():
+            for i in range(0, len(events), EMBEDS_PER_MESSAGE):
+                chunk = events[i:i + EMBEDS_PER_MESSAGE]
+                try:
+                    await channel.send(embeds=[e.to_embed() for e in chunk])
+                    self.stats["messages"] += 1
+                except discord.HTTPException as e:
+                    self.stats["send_errors"] += 1
+                    swallowed("log_dispatch.send", e)
+                now = time.monotonic()
+                self._latencies.extend(now - e.queued_at for e in chunk)
+
+    def metrics(self):
+        samples = sorted(self._latencies)
+        def pct(p):
+            return round(samples[min(len(samples) - 1, int(len(samples) * p))], 3) if samples else 0.0
+        return {
+            **self.stats,
+            "queue_depth": sum(len(q.events) for q in self._queues.values()),
+            "active_guilds": len(self._queues),
+            "flush_latency_p50": pct(0.50),
+            "flush_latency_p99": pct(0.99),
+        }
@@ -1,135 +1,236 @@
 import discord
-from discord.ext import commands, tasks
+from discord.ext import commands
 import datetime
+import asyncio
+import time
+import json
+import hashlib
 import database as db
-import re
 import os
 from dotenv import load_dotenv
 from menu import MainMenuView, AdmTimerView, LogSettingsView # LogSettingsView hinzugefügt
+import menu
 from zoneinfo import ZoneInfo
+from ratelimit import create_limiter
+from auditlog import AuditLogResolver
+from scheduler import AdmScheduler
+from logdispatch import LogDispatcher
+from punishment import PunishmentEngine
+from scanner import ContentScanner
+from cluster import shard_config, is_supervisor, run_clusters
+from gateway import client_options, MemberResolver, startup_report
+from raidguard import RaidGuard
+from snapshot import SnapshotStore, is_protected
+from eventlog import EventBuffer
+import blacklist
+from joinguard import JoinGuard
+from antiflood import FloodDetector, DEFAULT_LIMIT as FLOOD_LIMIT, DEFAULT_WINDOW as FLOOD_WINDOW
+from metrics import registry as metrics, instrument, swallowed, METRICS_PORT
 
 load_dotenv()
 
-# Tracker for violations: {guild_id: {user_id: {module: [timestamps, ...]}}}
-violation_tracker = {}
+# Tracker for violations: lokal (Ringpuffer) oder geteilt (Redis) über GLOBEX_STATE_BACKEND
+violation_tracker = create_limiter()
+# Gebündelte Audit-Log-Abfragen für die Anti-Nuke-Handler
+audit_resolver = AuditLogResolver()
+# Gebündelte Log-Nachrichten (bis zu 10 Embeds pro Nachricht)
+log_dispatcher = LogDispatcher()
+# Vorkompilierte Inhaltsregeln pro Server
+content_scanner = ContentScanner()
+# Member-Lookup mit fetch_member-Fallback (im Lean-Modus ist der Member-Cache leer)
+member_resolver = MemberResolver()
+# Serverweite Raid-Erkennung über alle Module hinweg
+raid_guard = RaidGuard()
+# Menü-Ansichten während eines Raids ebenfalls drosseln (Lookup zur Laufzeit, bench.py ersetzt raid_guard)
+menu.shed_check = lambda guild_id: raid_guard.should_shed(guild_id)
+# Rollen-/Kanal-Snapshots geschützter Server für den Restore nach einem Nuke
+snapshots = SnapshotStore()
+# Abfragbarer Verlauf aller Security-Events (gebündelt, außerhalb des Hot Paths)
+event_buffer = EventBuffer()
+# Gleiche/fast gleiche Nachrichten von vielen Accounts (Fingerprints mit fester Speichergrenze)
+flood_detector = FloodDetector()
+# Join-Raids (viele frische Accounts): Lockdown und gesammelte Bestrafung in Batches
+join_guard = JoinGuard(report=lambda gid, title, text: send_globex_log(gid, title, text, color=discord.Color.red()))
 
-class GlobexBot(commands.Bot):
+# Lokaler Cache des zuletzt synchronisierten Command-Trees
+COMMAND_HASH_FILE = os.getenv("GLOBEX_COMMAND_HASH_FILE", ".command_tree.hash")
+
+class GlobexBot(commands.AutoShardedBot):
     def __init__(self):
-        intents = discord.Intents.all()
-        super().__init__(command_prefix=None, intents=intents, help_command=None)
+        self.started_at = time.monotonic()
+        # Im Cluster-Modus übernimmt jeder Prozess nur seine Shards (und damit seine Server)
+        shard_count, shard_ids, self.cluster_id = shard_config()
+        # GLOBEX_LEAN=1 -> reduzierte Intents und Caches (siehe gateway.py)
+        super().__init__(command_prefix=None, help_command=None,
+                         shard_count=shard_count, shard_ids=shard_ids, **client_options())
 
     async def setup_hook(self):
+        t = time.monotonic()
         # Registrierung der Views für Persistenz (Ohne Argumente, da asynchron)
         self.add_view(MainMenuView())
         self.add_view(AdmTimerView()) 
         self.add_view(LogSettingsView())
         
-        self.check_adm_times.start() 
-        await self.tree.sync()
+        # Event-gesteuerter ADM-Timer: schläft bis zum nächsten Übergang
+        self.adm_scheduler = AdmScheduler(self.enforce_adm_timer, lambda gid: self.get_guild(int(gid)) is not None)
+        db.subscribe("adm_timer", self.adm_scheduler.notify)
+        self.adm_scheduler_task = asyncio.create_task(self.adm_scheduler.run())
+        # Change Stream hält den Konfig-Cache zwischen mehreren Prozessen konsistent
+        self.cache_watcher = asyncio.create_task(db.watch_changes())
+        # Menü-Writes, die während eines Mongo-Ausfalls im Journal gelandet sind, nachholen
+        self.write_behind = asyncio.create_task(db.run_write_behind())
+        self.limiter_sweeper = asyncio.create_task(violation_tracker.run_sweeper())
+        self.raid_sweeper = asyncio.create_task(raid_guard.run_sweeper())
+        self.audit_sweeper = asyncio.create_task(audit_resolver.run_sweeper())
+        self.flood_sweeper = asyncio.create_task(flood_detector.run_sweeper())
+        self.join_sweeper = asyncio.create_task(join_guard.run_sweeper())
+        self.snapshot_flusher = asyncio.create_task(snapshots.run_flusher())
+        self.event_writer = asyncio.create_task(event_buffer.run())
+        # Jede REST-Aktion (kick, ban, delete, audit logs, ...) pro Route messen
+        metrics.instrument_http(self.http)
+        # Im Cluster-Modus bekommt jeder Prozess seinen eigenen Port (Basis + Cluster-ID)
+        if METRICS_PORT: self.metrics_server = asyncio.create_task(metrics.serve(port=METRICS_PORT + self.cluster_id))
+        # Schutz im Menü aktiviert/deaktiviert -> Snapshot anlegen bzw. verwerfen
+        db.subscribe("settings", lambda category, gid: asyncio.create_task(self.ensure_snapshot(gid)))
+        # Kein tree.sync() mehr vor dem Gateway-Login: das passiert nach on_ready im Hintergrund
+        self.startup_phases = {"setup_hook": time.monotonic() - t}
+        self.startup_task = None
 
     async def on_ready(self):
         print(f"✅ {self.user} is online and secured!")
-        
-        # --- AUTOMATISCHER RUNDRUF AN ALLE SERVER ---
+        # Die Handler schützen ab jetzt; alles Weitere läuft im Hintergrund (auch bei Reconnects nur einmal)
+        if self.startup_task is None:
+            self.startup_phases["gateway_ready"] = time.monotonic() - self.started_at
+            self.startup_task = asyncio.create_task(self.background_startup())
+        else:
+            await self.adm_scheduler.load()
+
+    async def background_startup(self):
+        async def timed(name, coro):
+            t = time.monotonic()
+            try:
+                await coro
+            except Exception as e:
+                print(f"❌ Startup phase {name} failed: {e}")
+            self.startup_phases[name] = time.monotonic() - t
+
+        # Erst prüfen, ob Mongo erreichbar ist (Pool aufwärmen), dann parallel Caches füllen
+        await timed("storage_health", db.health_check())
+        phases = [timed("cache_warm", db.warm_cache([g.id for g in self.guilds])),
+                  timed("adm_scheduler", self.adm_scheduler.load()),
+                  timed("snapshots", self.load_snapshots())]
+        # Globale Commands nur einmal synchronisieren, nicht aus jedem Cluster
+        if self.cluster_id == 0:
+            phases.append(timed("command_sync", self.sync_commands()))
+        await asyncio.gather(*phases)
+
+        print(startup_report(self.started_at, len(self.guilds)))
+        print("⏱️ Startup phases: " + " | ".join(f"{k} {v:.2f}s" for k, v in self.startup_phases.items()))
+
+    async def ensure_snapshot(self, guild_id):
+        guild = self.get_guild(int(guild_id))
+        if not guild: return
+        profile = await db.get_profile(guild.id)
+        if not is_protected(profile.settings): snapshots.drop(guild.id)
+        elif not snapshots.has(guild.id): await snapshots.load(guild)
+
+    async def load_snapshots(self):
+        # Nach warm_cache liegen die Profile meist schon im Cache
         for guild in self.guilds:
-            channels = guild.text_channels
-            if not channels:
-                continue
-                
-            # Wir nehmen einen der ersten Kanäle für die Nachricht
-            target_channel = channels[0]
-            owner = guild.owner
-            owner_mention = owner.mention if owner else "@Server-Eigentümer"
-            
-            broadcast_msg = (
-                f"**__Globex Security__**\n\n"
-                f"{owner_mention},\n"
-                f"Please edit your menu again (Cloud Migration Update).\n"
-                f"*Bitte stelle dein Menü erneut ein (Umstellung auf Cloud-Datenbank).* "
-            )
-
-            if target_channel.permissions_for(guild.me).send_messages:
-                try:
-                    # Optional: Deaktiviert, um Spam bei jedem Neustart zu vermeiden
-                    # await target_channel.send(broadcast_msg)
-                    print(f"📢 Bot bereit für: {guild.name}")
-                except Exception as e:
-                    print(f"❌ Fehler bei {guild.name}: {e}")
+            await self.ensure_snapshot(guild.id)
+
+    async def sync_commands(self):
+        # Nur synchronisieren, wenn sich der Command-Tree seit dem letzten Sync geändert hat
+        payload = json.dumps([c.to_dict(self.tree) for c in self.tree.get_commands()], sort_keys=True)
+        digest = hashlib.sha256(payload.encode()).hexdigest()
+        try:
+            with open(COMMAND_HASH_FILE) as f:
+                if f.read().strip() == digest:
+                    print("🌲 Command tree unchanged, skipping sync")
+                    return False
+        except OSError:
+            pass
+        await self.tree.sync()
+        with open(COMMAND_HASH_FILE, "w") as f:
+            f.write(digest)
+        return True
 
-    # --- AUTOMATISCHER ZEIT-CHECK (BERLINER ZEIT) ---
-    @tasks.loop(minutes=1)
-    async def check_adm_times(self):
+    # --- ADM TIMER (BERLINER ZEIT) ---
+    # Wird vom AdmScheduler zu jedem Übergang (und bei Konfig-Änderungen) aufgerufen
+    async def enforce_adm_timer(self, guild_id, data, i):
+        guild = self.get_guild(int(guild_id))
+        if not guild: return
         tz_berlin = ZoneInfo("Europe/Berlin")
         now = datetime.datetime.now(tz_berlin).strftime("%H:%M")
-        
-        for guild in self.guilds:
-            data = await db.get_data("adm_timer", guild.id)
-            if not data or data.get("adm_status", 0) == 0:
-                continue
-
-            for i in [1, 2]:
-                r_id = data.get(f"role_id_{i}")
-                g_time = data.get(f"give_time_{i}")
-                rem_time = data.get(f"remove_time_{i}")
-                
-                if r_id and str(r_id).isdigit() and g_time and rem_time:
-                    if ":" in str(g_time) and ":" in str(rem_time):
-                        role = guild.get_role(int(r_id))
-                        if role:
-                            if g_time < rem_time:
-                                should_have_adm = g_time <= now < rem_time
-                            else:
-                                should_have_adm = now >= g_time or now < rem_time
-                            
-                            if role.permissions.administrator != should_have_adm:
-                                perms = role.permissions
-                                perms.administrator = should_have_adm
-                                try:
-                                    await role.edit(permissions=perms, reason=f"ADM-Timer Auto-Update ({now})")
-                                    await send_globex_log(guild.id, "ADM Auto-Update", 
-                                        f"Role {role.mention} Admin flag set to **{should_have_adm}** (Time: {now})")
-                                except Exception as e:
-                                    print(f"Update Error in {guild.name}: {e}")
+
+        r_id = data.get(f"role_id_{i}")
+        g_time = data.get(f"give_time_{i}")
+        rem_time = data.get(f"remove_time_{i}")
+        role = guild.get_role(int(r_id))
+        if role:
+            if g_time < rem_time:
+                should_have_adm = g_time <= now < rem_time
+            else:
+                should_have_adm = now >= g_time or now < rem_time
+            
+            if role.permissions.administrator != should_have_adm:
+                perms = role.permissions
+                perms.administrator = should_have_adm
+                try:
+                    await role.edit(permissions=perms, reason=f"ADM-Timer Auto-Update ({now})")
+                    await send_globex_log(guild.id, "ADM Auto-Update", 
+                        f"Role {role.mention} Admin flag set to **{should_have_adm}** (Time: {now})")
+                except Exception as e:
+                    swallowed("adm_timer.role_edit", e)
+                    print(f"Update Error in {guild.name}: {e}")
 
 bot = GlobexBot()
 
 # --- HELPER FOR LIMITS ---
-def is_limit_exceeded(guild_id, user_id, module, limit, timeframe):
-    if not limit: return False
-    if guild_id not in violation_tracker: violation_tracker[guild_id] = {}
-    if user_id not in violation_tracker[guild_id]: violation_tracker[guild_id][user_id] = {}
-    if module not in violation_tracker[guild_id][user_id]: violation_tracker[guild_id][user_id][module] = []
-    
-    now = datetime.datetime.now().timestamp()
-    violation_tracker[guild_id][user_id][module] = [t for t in violation_tracker[guild_id][user_id][module] if now - t < (timeframe or 10)]
-    violation_tracker[guild_id][user_id][module].append(now)
-    return len(violation_tracker[guild_id][user_id][module]) >= limit
+async def is_limit_exceeded(guild_id, user_id, module, limit, timeframe):
+    return await violation_tracker.check((guild_id, user_id, module), limit, timeframe or 10)
 
 # --- LOGGING SYSTEM ---
-async def send_globex_log(guild_id, title, description, color=discord.Color.blue()):
-    settings = await db.get_data("settings", guild_id)
+# Diese Logs werden auch während eines Raids geschickt, alles andere wird verworfen
+CRITICAL_LOGS = ("Punishment Executed", "⚠️ MISSING PERMISSIONS")
+
+async def send_globex_log(guild_id, title, description, color=discord.Color.blue(), profile=None, actor_id=None):
+    # Jedes Event landet im Event-Store, auch wenn der Log-Kanal aus ist oder gerade gedrosselt wird
+    event_buffer.record(guild_id, title, actor_id, detail=description)
+    if title not in CRITICAL_LOGS and raid_guard.should_shed(guild_id): return
+    settings = profile.settings if profile else await db.get_data("settings", guild_id)
     if settings.get("log_status") == 1:
         log_cid = settings.get("log_channel")
         if log_cid and str(log_cid).isdigit():
             log_chan = bot.get_channel(int(log_cid))
             if log_chan:
-                tz_berlin = ZoneInfo("Europe/Berlin")
-                now = datetime.datetime.now(tz_berlin)
-                time_str = now.strftime("%d.%m.%Y at %H:%M:%S")
-                
-                embed = discord.Embed(title="**__🗃 Globex Security Log__**", description=description, color=color)
-                embed.add_field(name="Event:", value=title, inline=False)
-                embed.set_footer(text=f"{time_str}")
-                try:
-                    await log_chan.send(embed=embed)
-                except: pass
+                # Nicht blockierend: der Dispatcher bündelt und sendet im Hintergrund
+                log_dispatcher.submit(guild_id, log_chan, title, description, color)
 
 # --- CENTRAL PUNISHMENT SYSTEM ---
-async def apply_punishment(member, module_prefix, guild_id):
+async def apply_punishment(member, module_prefix, guild_id, profile=None, received_at=None):
+    # Nicht blockierend: die Engine dedupliziert pro (guild, member), eskaliert auf schwerere
+    # Strafen und führt parallel aus
     if not member or not isinstance(member, discord.Member): return 
+    punishment_engine.submit(member, module_prefix, guild_id, profile, received_at)
 
-    settings = await db.get_data("settings", guild_id)
-    punishment = settings.get(f"{module_prefix}_punish") or "kick"
+# Rangfolge für die Engine: eine schwerere Strafe ersetzt eine noch offene leichtere
+PUNISH_SEVERITY = {"timeout": 1, "kick": 2, "ban": 3}
+
+def punishment_for(module_prefix, settings):
+    # Im Raid-Modus ist Bannen die Voreinstellung
+    return settings.get(f"{module_prefix}_punish") or ("ban" if module_prefix == "raid_mode" else "kick")
+
+def punishment_severity(module_prefix, profile):
+    # raid_mode schlägt immer jede Modul-Strafe
+    if module_prefix == "raid_mode": return len(PUNISH_SEVERITY) + 1
+    punishment = punishment_for(module_prefix, profile.settings) if profile else "kick"
+    return PUNISH_SEVERITY.get(punishment, 0)
+
+async def execute_punishment(member, module_prefix, guild_id, profile=None):
+    profile = profile or await db.get_profile(guild_id)
+    settings = profile.settings
+    punishment = punishment_for(module_prefix, settings)
     reason_clean = module_prefix.replace('_', ' ').title()
     reason = f"Globex Security: {reason_clean} Protection"
 
@@ -139,21 +240,45 @@ async def apply_punishment(member, module_prefix, guild_id):
         elif punishment == "timeout":
             until = discord.utils.utcnow() + datetime.timedelta(hours=1)
             await member.timeout(until, reason=reason)
+        if punishment in ("kick", "ban"): member_resolver.forget(guild_id, member.id)
         
         await send_globex_log(guild_id, "Punishment Executed", 
-            f"**User:** {member.mention} ({member.id})\n**Reason:** {reason_clean}\n**Action:** {punishment.capitalize()}")
+            f"**User:** {member.mention} ({member.id})\n**Reason:** {reason_clean}\n**Action:** {punishment.capitalize()}",
+            profile=profile, actor_id=member.id)
             
     except discord.Forbidden:
         await send_globex_log(guild_id, "⚠️ MISSING PERMISSIONS", 
             f"I don't have enough permissions to punish {member.mention} ({punishment}).", 
-            color=discord.Color.red())
+            color=discord.Color.red(), profile=profile, actor_id=member.id)
+
+# Parallele, deduplizierte Bestrafungen mit Latenz-Histogramm
+punishment_engine = PunishmentEngine(execute_punishment, severity=punishment_severity)
+
+# --- METRICS ---
+# Lambdas statt gebundener Methoden: die Instanzen können ersetzt werden (bench.py)
+metrics.register("config_cache", lambda: db.get_cache_stats())
+metrics.register("write_behind", lambda: db.write_status())
+metrics.register("limiter", lambda: violation_tracker.metrics())
+metrics.register("audit_log", lambda: audit_resolver.stats)
+metrics.register("log_dispatch", lambda: log_dispatcher.metrics())
+metrics.register("punishment", lambda: punishment_engine.metrics())
+metrics.register("scanner", lambda: content_scanner.stats)
+metrics.register("members", lambda: member_resolver.stats)
+metrics.register("raid_guard", lambda: raid_guard.metrics())
+metrics.register("anti_flood", lambda: flood_detector.metrics())
+metrics.register("join_guard", lambda: join_guard.metrics())
+metrics.register("snapshots", lambda: snapshots.stats)
+metrics.register("event_store", lambda: event_buffer.metrics())
 
 # --- ADM TIMER ENFORCEMENT ---
 @bot.event
+@instrument("event")
 async def on_guild_role_update(before, after):
+    snapshots.track_role(after)
     if before.permissions.administrator == after.permissions.administrator: return
     
-    data = await db.get_data("adm_timer", after.guild.id)
+    profile = await db.get_profile(after.guild.id)
+    data = profile.adm_timer
     if not data or data.get("adm_status", 0) == 0:
         return
 
@@ -180,127 +305,319 @@ async def on_guild_role_update(before, after):
                     await after.edit(permissions=new_perms, reason="ADM-Timer Enforcement")
                     await send_globex_log(after.guild.id, "ADM Role Corrected", 
                                          f"Role {after.mention} Admin flag set to {is_allowed} (Time: {now})", 
-                                         color=discord.Color.orange())
-                except: pass
+                                         color=discord.Color.orange(), profile=profile)
+                except Exception as e: swallowed("adm_enforce.role_edit", e)
 
 # --- SECURITY EVENTS ---
 @bot.event
+@instrument("event")
 async def on_message(message):
+    received = time.monotonic()
     if message.author.id == bot.user.id or message.webhook_id: return
     if not message.guild or message.author.bot: return
     
-    if message.author.id == message.guild.owner_id or await db.is_on_list(message.guild.id, message.author.id, "whitelist"): return
+    if message.author.id == message.guild.owner_id: return
 
-    settings = await db.get_data("settings", message.guild.id)
-    limits = await db.get_data("limits", message.guild.id)
+    # Ein einziger Abruf für Whitelist, Settings und Limits
+    profile = await db.get_profile(message.guild.id)
+    if profile.is_on_list(message.author.id, "whitelist"): return
+    settings, limits = profile.settings, profile.limits
+    # Alle aktiven Inhaltsregeln in einem Durchlauf
+    hits = content_scanner.scan(message.guild.id, message.content, settings, limits)
 
-    # ANTI-INVITE
+    # ANTI-INVITE (inkl. eigener Bad-Link-Liste aus settings.bad_links)
     if settings.get("anti_invite_status") == 1:
-        invites = re.findall(r"(discord\.gg/|discord\.com/invite/)\S+", message.content)
+        invites = hits.get("invite", []) + hits.get("bad_link", [])
         if invites:
             try: await message.delete()
-            except: pass
+            except Exception as e: swallowed("on_message.delete_invite", e)
+            if raid_guard.record(profile, message.author.id, "invite"):
+                return await apply_punishment(message.author, "raid_mode", message.guild.id, profile, received)
             l, t = limits.get("invite_limit") or 1, limits.get("invite_time") or 10
-            if len(invites) >= l or is_limit_exceeded(message.guild.id, message.author.id, "invite", l, t):
-                await apply_punishment(message.author, "anti_invite", message.guild.id)
+            if len(invites) >= l or await is_limit_exceeded(message.guild.id, message.author.id, "invite", l, t):
+                await apply_punishment(message.author, "anti_invite", message.guild.id, profile, received)
 
     # ANTI-PING
     if settings.get("anti_ping_status") == 1:
-        if message.mention_everyone:
+        # Massen-Erwähnungen zählen wie @everyone, sobald limits.mention_limit gesetzt ist
+        mass_mention = len(hits.get("mention", [])) >= (limits.get("mention_limit") or float("inf"))
+        if message.mention_everyone or mass_mention:
+            if raid_guard.record(profile, message.author.id, "ping"):
+                try: await message.delete()
+                except Exception as e: swallowed("on_message.delete_raid", e)
+                return await apply_punishment(message.author, "raid_mode", message.guild.id, profile, received)
             mode = settings.get("anti_ping_direct", "Direct")
             l, t = limits.get("ping_limit") or 1, limits.get("ping_time") or 10
-            violation = is_limit_exceeded(message.guild.id, message.author.id, "ping", l, t)
+            violation = await is_limit_exceeded(message.guild.id, message.author.id, "ping", l, t)
             if mode == "Direct" or (mode == "Not Direct" and violation):
                 try: await message.delete()
-                except: pass
+                except Exception as e: swallowed("on_message.delete_ping", e)
             if violation:
-                await apply_punishment(message.author, "anti_ping", message.guild.id)
+                await apply_punishment(message.author, "anti_ping", message.guild.id, profile, received)
+
+    # ANTI-FLOOD (gleicher Text über mehrere Accounts/Kanäle)
+    if settings.get("anti_flood_status") == 1:
+        offenders = flood_detector.check(message.guild.id, message.author.id, message.content,
+                                         limits.get("flood_limit") or FLOOD_LIMIT, limits.get("flood_time") or FLOOD_WINDOW)
+        if offenders:
+            try: await message.delete()
+            except Exception as e: swallowed("on_message.delete_flood", e)
+        for uid in offenders:
+            member = message.author if uid == message.author.id else await member_resolver.get(message.guild, uid)
+            module = "raid_mode" if raid_guard.record(profile, uid, "flood") else "anti_flood"
+            if member: await apply_punishment(member, module, message.guild.id, profile, received)
+
+# --- RAID MODE ---
+async def punish_raider(guild, actor_id, profile, received):
+    # Raid-Modus: sofort bestrafen, ohne die einzelnen Modul-Einstellungen abzuwarten
+    member = await member_resolver.get(guild, actor_id)
+    if member: await apply_punishment(member, "raid_mode", guild.id, profile, received)
 
 # --- ANTI-NUKE EVENTS ---
 @bot.event
+@instrument("event")
 async def on_guild_channel_create(channel):
-    async for entry in channel.guild.audit_logs(action=discord.AuditLogAction.channel_create, limit=1):
-        if entry.user.id in [bot.user.id, channel.guild.owner_id] or await db.is_on_list(channel.guild.id, entry.user.id, "whitelist"): return
-        settings = await db.get_data("settings", channel.guild.id)
-        if settings.get("channel_create_status") == 1:
-            if settings.get("channel_create_action", "delete") == "delete":
-                try: await channel.delete()
-                except: pass
-            member = channel.guild.get_member(entry.user.id)
-            if member: await apply_punishment(member, "anti_channel_create", channel.guild.id)
+    received = time.monotonic()
+    snapshots.track_channel(channel)
+    entry = await audit_resolver.resolve(channel.guild, discord.AuditLogAction.channel_create, channel.id)
+    if not entry or entry.user.id in [bot.user.id, channel.guild.owner_id]: return
+    profile = await db.get_profile(channel.guild.id)
+    if profile.is_on_list(entry.user.id, "whitelist"): return
+    settings = profile.settings
+    if raid_guard.record(profile, entry.user.id, "channel_create"):
+        await punish_raider(channel.guild, entry.user.id, profile, received)
+        try: await channel.delete()
+        except Exception as e: swallowed("channel_create.delete_raid", e)
+        return
+    if settings.get("channel_create_status") == 1:
+        if settings.get("channel_create_action", "delete") == "delete":
+            try: await channel.delete()
+            except Exception as e: swallowed("channel_create.delete", e)
+        member = await member_resolver.get(channel.guild, entry.user.id)
+        if member: await apply_punishment(member, "anti_channel_create", channel.guild.id, profile, received)
 
 @bot.event
+@instrument("event")
 async def on_guild_channel_delete(channel):
-    async for entry in channel.guild.audit_logs(action=discord.AuditLogAction.channel_delete, limit=1):
-        if entry.user.id in [bot.user.id, channel.guild.owner_id] or await db.is_on_list(channel.guild.id, entry.user.id, "whitelist"): return
-        settings = await db.get_data("settings", channel.guild.id)
-        if settings.get("channel_delete_status") == 1:
-            member = channel.guild.get_member(entry.user.id)
-            if member: await apply_punishment(member, "anti_channel_delete", channel.guild.id)
+    received = time.monotonic()
+    entry = await audit_resolver.resolve(channel.guild, discord.AuditLogAction.channel_delete, channel.id)
+    # Bis zum Beweis des Gegenteils als Nuke-Löschung merken (Restore über /globex-restore)
+    snapshots.mark_deleted(channel.guild.id, "channels", channel.id, entry.user.id if entry else None)
+    if not entry: return
+    if entry.user.id in [bot.user.id, channel.guild.owner_id]:
+        return snapshots.forget(channel.guild.id, "channels", channel.id)
+    profile = await db.get_profile(channel.guild.id)
+    if profile.is_on_list(entry.user.id, "whitelist"):
+        return snapshots.forget(channel.guild.id, "channels", channel.id)
+    settings = profile.settings
+    if raid_guard.record(profile, entry.user.id, "channel_delete"):
+        return await punish_raider(channel.guild, entry.user.id, profile, received)
+    if settings.get("channel_delete_status") == 1:
+        member = await member_resolver.get(channel.guild, entry.user.id)
+        if member: await apply_punishment(member, "anti_channel_delete", channel.guild.id, profile, received)
 
 @bot.event
+@instrument("event")
+async def on_guild_channel_update(before, after):
+    snapshots.track_channel(after)
+
+@bot.event
+@instrument("event")
 async def on_guild_role_create(role):
-    async for entry in role.guild.audit_logs(action=discord.AuditLogAction.role_create, limit=1):
-        if entry.user.id in [bot.user.id, role.guild.owner_id] or await db.is_on_list(role.guild.id, entry.user.id, "whitelist"): return
-        settings = await db.get_data("settings", role.guild.id)
-        if settings.get("role_create_status") == 1:
-            try: await role.delete()
-            except: pass
-            member = role.guild.get_member(entry.user.id)
-            if member: await apply_punishment(member, "anti_role_create", role.guild.id)
+    received = time.monotonic()
+    snapshots.track_role(role)
+    entry = await audit_resolver.resolve(role.guild, discord.AuditLogAction.role_create, role.id)
+    if not entry or entry.user.id in [bot.user.id, role.guild.owner_id]: return
+    profile = await db.get_profile(role.guild.id)
+    if profile.is_on_list(entry.user.id, "whitelist"): return
+    settings = profile.settings
+    raider = raid_guard.record(profile, entry.user.id, "role_create")
+    if raider: await punish_raider(role.guild, entry.user.id, profile, received)
+    if raider or settings.get("role_create_status") == 1:
+        try: await role.delete()
+        except Exception as e: swallowed("role_create.delete", e)
+    if not raider and settings.get("role_create_status") == 1:
+        member = await member_resolver.get(role.guild, entry.user.id)
+        if member: await apply_punishment(member, "anti_role_create", role.guild.id, profile, received)
 
 @bot.event
+@instrument("event")
 async def on_guild_role_delete(role):
-    async for entry in role.guild.audit_logs(action=discord.AuditLogAction.role_delete, limit=1):
-        if entry.user.id in [bot.user.id, role.guild.owner_id] or await db.is_on_list(role.guild.id, entry.user.id, "whitelist"): return
-        settings = await db.get_data("settings", role.guild.id)
-        if settings.get("role_delete_status") == 1:
-            member = role.guild.get_member(entry.user.id)
-            if member: await apply_punishment(member, "anti_role_delete", role.guild.id)
+    received = time.monotonic()
+    entry = await audit_resolver.resolve(role.guild, discord.AuditLogAction.role_delete, role.id)
+    snapshots.mark_deleted(role.guild.id, "roles", role.id, entry.user.id if entry else None)
+    if not entry: return
+    if entry.user.id in [bot.user.id, role.guild.owner_id]:
+        return snapshots.forget(role.guild.id, "roles", role.id)
+    profile = await db.get_profile(role.guild.id)
+    if profile.is_on_list(entry.user.id, "whitelist"):
+        return snapshots.forget(role.guild.id, "roles", role.id)
+    settings = profile.settings
+    if raid_guard.record(profile, entry.user.id, "role_delete"):
+        return await punish_raider(role.guild, entry.user.id, profile, received)
+    if settings.get("role_delete_status") == 1:
+        member = await member_resolver.get(role.guild, entry.user.id)
+        if member: await apply_punishment(member, "anti_role_delete", role.guild.id, profile, received)
+
+def _webhook_in_channel(channel):
+    # webhook_create-Einträge tragen den Kanal in den Änderungen (entry.after.channel)
+    return lambda entry: getattr(getattr(entry.after, "channel", None), "id", None) == channel.id
 
 @bot.event
+@instrument("event")
 async def on_webhooks_update(channel):
-    async for entry in channel.guild.audit_logs(action=discord.AuditLogAction.webhook_create, limit=1):
-        if entry.user.id in [bot.user.id, channel.guild.owner_id] or await db.is_on_list(channel.guild.id, entry.user.id, "whitelist"): return
-        settings = await db.get_data("settings", channel.guild.id)
-        if settings.get("anti_webhook_status") == 1:
-            webhooks = await channel.webhooks()
-            for wh in webhooks:
-                if wh.id == entry.target.id: 
-                    try: await wh.delete()
-                    except: pass
-            member = channel.guild.get_member(entry.user.id)
-            if member: await apply_punishment(member, "anti_webhook", channel.guild.id)
+    received = time.monotonic()
+    entry = await audit_resolver.resolve(channel.guild, discord.AuditLogAction.webhook_create,
+                                         predicate=_webhook_in_channel(channel), consume=True)
+    if not entry or entry.user.id in [bot.user.id, channel.guild.owner_id]: return
+    profile = await db.get_profile(channel.guild.id)
+    if profile.is_on_list(entry.user.id, "whitelist"): return
+    settings = profile.settings
+    raider = raid_guard.record(profile, entry.user.id, "webhook")
+    if raider: await punish_raider(channel.guild, entry.user.id, profile, received)
+    if raider or settings.get("anti_webhook_status") == 1:
+        webhooks = await channel.webhooks()
+        for wh in webhooks:
+            if wh.id == entry.target.id: 
+                try: await wh.delete()
+                except Exception as e: swallowed("webhook.delete", e)
+    if not raider and settings.get("anti_webhook_status") == 1:
+        member = await member_resolver.get(channel.guild, entry.user.id)
+        if member: await apply_punishment(member, "anti_webhook", channel.guild.id, profile, received)
 
 @bot.event
+@instrument("event")
 async def on_member_join(member):
-    if not member.bot: return
+    received = time.monotonic()
     gid = member.guild.id
-    settings = await db.get_data("settings", gid)
-    if settings.get("anti_bot_status") == 1:
-        async for entry in member.guild.audit_logs(action=discord.AuditLogAction.bot_add, limit=1):
-            if entry.user.id in [gid, member.guild.owner_id] or await db.is_on_list(gid, entry.user.id, "whitelist"): return
+    profile = await db.get_profile(gid)
+    # BLACKLIST: Abgleich gegen den ID-Index im Cache, kein Datenbank-Roundtrip
+    if profile.is_on_list(member.id, "blacklist"):
+        try:
+            await member.ban(reason=blacklist.REASON, delete_message_seconds=0)
+            member_resolver.forget(gid, member.id)
+            await send_globex_log(gid, "Blacklisted User Banned", f"**User:** {member.mention} ({member.id})",
+                                  color=discord.Color.red(), profile=profile, actor_id=member.id)
+        except Exception as e: swallowed("blacklist.ban", e)
+        return
+    if not member.bot:
+        # ANTI-JOIN-RAID
+        if profile.settings.get("join_raid_status") == 1 and not profile.is_on_list(member.id, "whitelist"):
+            if join_guard.record(member, profile.settings, profile.limits):
+                await send_globex_log(gid, "🚨 Join Raid Lockdown",
+                    f"Join rate exceeded **{profile.limits.get('join_limit') or 10}** joins. "
+                    f"Suspicious new accounts are now handled automatically.", color=discord.Color.red(), profile=profile)
+        return
+    raid_mode_on = profile.settings.get("raid_mode_status") == 1
+    if profile.settings.get("anti_bot_status") == 1 or raid_mode_on:
+        entry = await audit_resolver.resolve(member.guild, discord.AuditLogAction.bot_add, member.id)
+        if not entry: return
+        if entry.user.id in [gid, member.guild.owner_id] or profile.is_on_list(entry.user.id, "whitelist"): return
+        raider = raid_guard.record(profile, entry.user.id, "bot_add")
+        if raider: await punish_raider(member.guild, entry.user.id, profile, received)
+        if raider or profile.settings.get("anti_bot_status") == 1:
             try: await member.kick(reason="Anti-Bot Join Protection")
-            except: pass
-            limits = await db.get_data("limits", gid)
-            l = limits.get("bot_limit") or 1
-            if is_limit_exceeded(gid, entry.user.id, "bot_join", l, 315360000):
-                inviter = member.guild.get_member(entry.user.id)
-                if inviter: await apply_punishment(inviter, "anti_bot_join", gid)
+            except Exception as e: swallowed("bot_join.kick", e)
+        if raider or profile.settings.get("anti_bot_status") != 1: return
+        l = profile.limits.get("bot_limit") or 1
+        if await is_limit_exceeded(gid, entry.user.id, "bot_join", l, 315360000):
+            inviter = await member_resolver.get(member.guild, entry.user.id)
+            if inviter: await apply_punishment(inviter, "anti_bot_join", gid, profile, received)
 
 @bot.tree.command(name="config-setup-globex", description="Opens the Globex Security Headquarters")
 async def setup(interaction: discord.Interaction):
     view = MainMenuView()
     await interaction.response.send_message(embed=view.base_embed(), view=view)
 
+@bot.tree.command(name="globex-restore", description="Restores channels and roles deleted during a nuke")
+async def restore(interaction: discord.Interaction):
+    if interaction.user.id != interaction.guild.owner_id:
+        return await interaction.response.send_message("❌ Only the server owner can run a restore.", ephemeral=True)
+    pending = snapshots.pending(interaction.guild.id)
+    if not snapshots.has(interaction.guild.id) or not any(pending.values()):
+        return await interaction.response.send_message("ℹ️ Nothing to restore.", ephemeral=True)
+    await interaction.response.defer(ephemeral=True, thinking=True)
+
+    async def progress(text):
+        try: await interaction.edit_original_response(content=f"♻️ {text}")
+        except Exception as e: swallowed("restore.progress", e)
+
+    result = await snapshots.restore(interaction.guild, progress=progress)
+    await snapshots.flush()
+    await interaction.edit_original_response(content=(
+        f"✅ Restore finished: **{result['roles']}/{pending['roles']}** roles, "
+        f"**{result['channels']}/{pending['channels']}** channels, {result['errors']} errors."))
+    await send_globex_log(interaction.guild.id, "Restore Executed",
+        f"**By:** {interaction.user.mention}\n**Roles:** {result['roles']}\n**Channels:** {result['channels']}",
+        color=discord.Color.green(), actor_id=interaction.user.id)
+
+@bot.tree.command(name="globex-blacklist-sweep", description="Bans all current members that are on the blacklist")
+async def blacklist_sweep(interaction: discord.Interaction):
+    if interaction.user.id != interaction.guild.owner_id:
+        return await interaction.response.send_message("❌ Only the server owner can run a sweep.", ephemeral=True)
+    profile = await db.get_profile(interaction.guild.id)
+    ids = profile.list_ids("blacklist")
+    if not ids:
+        return await interaction.response.send_message("ℹ️ The blacklist is empty.", ephemeral=True)
+    await interaction.response.defer(ephemeral=True, thinking=True)
+
+    def summary(stats):
+        return (f"**{stats['scanned']}** members checked against **{len(ids)}** blacklisted IDs | "
+                f"matches: **{stats['matched']}** | banned: **{stats['banned']}** | failed: **{stats['failed']}**")
+
+    async def progress(stats):
+        try: await interaction.edit_original_response(content=f"🔎 Sweeping... {summary(stats)}")
+        except Exception as e: swallowed("blacklist_sweep.progress", e)
+
+    # Kopie: der Index kann sich während des Sweeps durch Menü-Änderungen ändern
+    result = await blacklist.sweep(interaction.guild, set(ids), progress=progress)
+    await interaction.edit_original_response(content=f"✅ Sweep finished: {summary(result)}")
+    await send_globex_log(interaction.guild.id, "Blacklist Sweep", summary(result), color=discord.Color.red(),
+                          profile=profile, actor_id=interaction.user.id)
+
+@bot.tree.command(name="globex-stats", description="Shows internal performance metrics (bot owner only)")
+async def stats(interaction: discord.Interaction):
+    if not await bot.is_owner(interaction.user):
+        return await interaction.response.send_message("❌ Only the bot owner can view metrics.", ephemeral=True)
+    snap = metrics.snapshot()
+    embed = discord.Embed(title="📈 Globex Security Metrics", color=0x2b2d31)
+
+    def top(kind, n=8):
+        rows = sorted(((k.split(":", 1)[1], v) for k, v in snap["series"].items() if k.startswith(kind + ":")),
+                      key=lambda kv: kv[1]["count"], reverse=True)[:n]
+        text = "\n".join(f"`{name[:32]}` {v['count']}× err {v['errors']} | avg {v['avg'] * 1000:.1f} ms | p99 ≤{v['p99'] * 1000:.0f} ms"
+                         for name, v in rows)
+        return text[:1024] or "_no calls yet_"
+
+    embed.add_field(name="Events", value=top("event"), inline=False)
+    embed.add_field(name="Database", value=top("db"), inline=False)
+    embed.add_field(name="Discord REST", value=top("rest"), inline=False)
+    swallowed_text = "\n".join(f"`{k}` {n}" for k, n in sorted(snap["swallowed"].items(), key=lambda kv: -kv[1])[:10])
+    embed.add_field(name="Swallowed exceptions", value=swallowed_text[:1024] or "_none_", inline=False)
+    comp = snap["components"]
+    cache, punish = comp.get("config_cache", {}), comp.get("punishment", {})
+    embed.set_footer(text=f"Cache hit rate {cache.get('hit_rate', 0)} | Punishments {punish.get('executed', 0)} "
+                          f"(pending {punish.get('pending', 0)}) | Raid trips {comp.get('raid_guard', {}).get('trips', 0)}")
+    await interaction.response.send_message(embed=embed, ephemeral=True)
+
+@bot.event
+@instrument("event")
+async def on_guild_remove(guild):
+    snapshots.drop(guild.id)
+    audit_resolver.forget_guild(guild.id)
+    content_scanner.forget_guild(guild.id)
+
 # --- STARTUP LOGIC ---
 TOKEN = os.getenv("DISCORD_TOKEN")
 MONGO_URL = os.getenv("MONGO_URL")
 
-if not MONGO_URL:
+if db.backend.name == "mongo" and not MONGO_URL:
     print("❌ ERROR: MONGO_URL variable is missing in Railway Secrets!")
+elif TOKEN and is_supervisor():
+    print("🧩 Starting Globex Security in cluster mode...")
+    run_clusters(os.path.abspath(__file__))
 elif TOKEN:
-    print("🚀 Connecting to MongoDB and starting Globex Security...")
+    print(f"🚀 Connecting to storage ({db.backend.name}) and starting Globex Security...")
     bot.run(TOKEN)
 else:
     print("❌ ERROR: DISCORD_TOKEN is missing!")
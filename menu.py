@@ -1,4 +1,5 @@
 import discord
+import datetime
 from discord import ui
 import database as db
 import re
@@ -15,8 +16,8 @@ class AdmRoleIDModal(ui.Modal):
     async def on_submit(self, interaction: discord.Interaction):
         if not self.role_id.value.isdigit():
             return await interaction.response.send_message("❌ Numbers only allowed!", ephemeral=True)
-        await db.update_data("adm_timer", interaction.guild_id, f"role_id_{self.index}", self.role_id.value)
-        await interaction.response.edit_message(view=await AdmTimerView.create(interaction.guild_id))
+        data = await db.update_data("adm_timer", interaction.guild_id, f"role_id_{self.index}", self.role_id.value)
+        await interaction.response.edit_message(view=await AdmTimerView.create(interaction.guild_id, data))
 
 class AdmTimeModal(ui.Modal):
     def __init__(self, index):
@@ -32,9 +33,11 @@ class AdmTimeModal(ui.Modal):
         if not pattern.match(self.give_input.value) or not pattern.match(self.remove_input.value):
             return await interaction.response.send_message("❌ Invalid format! Use HH:MM (00:00 - 23:59).", ephemeral=True)
         
-        await db.update_data("adm_timer", interaction.guild_id, f"give_time_{self.index}", self.give_input.value)
-        await db.update_data("adm_timer", interaction.guild_id, f"remove_time_{self.index}", self.remove_input.value)
-        await interaction.response.edit_message(view=await AdmTimerView.create(interaction.guild_id))
+        data = await db.update_many_fields("adm_timer", interaction.guild_id, {
+            f"give_time_{self.index}": self.give_input.value,
+            f"remove_time_{self.index}": self.remove_input.value,
+        })
+        await interaction.response.edit_message(view=await AdmTimerView.create(interaction.guild_id, data))
 
 # --- EXISTING MODALS ---
 
@@ -43,8 +46,8 @@ class LogChannelModal(ui.Modal, title="Config-Bot-Log Setup"):
     async def on_submit(self, interaction: discord.Interaction):
         if not self.channel_id.value.isdigit():
             return await interaction.response.send_message("❌ Numbers only allowed!", ephemeral=True)
-        await db.update_data("settings", interaction.guild_id, "log_channel", self.channel_id.value)
-        await interaction.response.edit_message(view=await LogSettingsView.create(interaction.guild_id))
+        settings = await db.update_data("settings", interaction.guild_id, "log_channel", self.channel_id.value)
+        await interaction.response.edit_message(view=await LogSettingsView.create(interaction.guild_id, settings))
 
 class LimitModal(ui.Modal):
     def __init__(self, title, db_col_limit, db_col_time, parent_view):
@@ -60,13 +63,53 @@ class LimitModal(ui.Modal):
         if not self.limit_input.value.isdigit() or (self.db_col_time and not self.time_input.value.isdigit()):
             return await interaction.response.send_message("❌ Only numbers allowed!", ephemeral=True)
         
-        await db.update_data("limits", interaction.guild_id, self.db_col_limit, int(self.limit_input.value))
+        fields = {self.db_col_limit: int(self.limit_input.value)}
         if self.db_col_time:
-            await db.update_data("limits", interaction.guild_id, self.db_col_time, int(self.time_input.value))
+            fields[self.db_col_time] = int(self.time_input.value)
+        # Ein Schreibzugriff; der Cache enthält danach schon das neue Dokument
+        await db.update_many_fields("limits", interaction.guild_id, fields)
             
         new_view = await ModuleSettingsView.create(self.parent_view.module_name, self.parent_view.db_prefix, interaction.guild_id, True, self.db_col_limit, self.db_col_time)
         await interaction.response.edit_message(view=new_view)
 
+BAD_LINKS_MAX = 200
+_DOMAIN = re.compile(r"^(?:[a-z0-9-]+\.)+[a-z]{2,}$")
+
+class BadLinksModal(ui.Modal, title="Bad Links (Anti-Invite)"):
+    def __init__(self, current, parent_view):
+        super().__init__()
+        self.parent_view = parent_view
+        self.domains = ui.TextInput(label="Domains (one per line, empty = none)", style=discord.TextStyle.paragraph,
+                                    default="\n".join(current), required=False, max_length=4000)
+        self.add_item(self.domains)
+
+    async def on_submit(self, interaction: discord.Interaction):
+        domains = []
+        for line in self.domains.value.splitlines():
+            # "https://www.evil.com/path" -> "www.evil.com"
+            domain = re.sub(r"^[a-z]+://", "", line.strip().lower()).split("/")[0]
+            if not domain: continue
+            if not _DOMAIN.match(domain):
+                return await interaction.response.send_message(f"❌ Invalid domain: `{domain[:100]}`", ephemeral=True)
+            if domain not in domains: domains.append(domain)
+        if len(domains) > BAD_LINKS_MAX:
+            return await interaction.response.send_message(f"❌ Max. {BAD_LINKS_MAX} domains!", ephemeral=True)
+        await db.update_data("settings", interaction.guild_id, "bad_links", domains)
+        pv = self.parent_view
+        await interaction.response.edit_message(view=await ModuleSettingsView.create(pv.module_name, pv.db_prefix, interaction.guild_id, True, pv.limit_col, pv.time_col))
+
+class MentionLimitModal(ui.Modal, title="Mass Mention (Anti-Ping)"):
+    limit_input = ui.TextInput(label="Mentions per message (0 = off)", placeholder="Numbers only!", min_length=1, max_length=2)
+    def __init__(self, parent_view):
+        super().__init__()
+        self.parent_view = parent_view
+    async def on_submit(self, interaction: discord.Interaction):
+        if not self.limit_input.value.isdigit():
+            return await interaction.response.send_message("❌ Only numbers allowed!", ephemeral=True)
+        await db.update_data("limits", interaction.guild_id, "mention_limit", int(self.limit_input.value) or None)
+        pv = self.parent_view
+        await interaction.response.edit_message(view=await ModuleSettingsView.create(pv.module_name, pv.db_prefix, interaction.guild_id, True, pv.limit_col, pv.time_col))
+
 class ListManageModal(ui.Modal):
     def __init__(self, list_type, action, parent_view):
         super().__init__(title=f"{list_type.capitalize()}: {action}")
@@ -82,6 +125,51 @@ class ListManageModal(ui.Modal):
         else: await db.remove_from_list(interaction.guild_id, uid, self.list_type)
         await interaction.response.edit_message(content=await self.parent_view.get_content(interaction), view=self.parent_view)
 
+class ListSearchModal(ui.Modal, title="Search ID"):
+    user_id = ui.TextInput(label="User ID", placeholder="18-digit ID...", min_length=17, max_length=20)
+    def __init__(self, parent_view):
+        super().__init__()
+        self.parent_view = parent_view
+    async def on_submit(self, interaction: discord.Interaction):
+        uid = self.user_id.value.strip()
+        if not uid.isdigit(): return await interaction.response.send_message("❌ Numbers only!", ephemeral=True)
+        pos = await db.find_in_list(interaction.guild_id, self.parent_view.list_type, uid)
+        if pos is None: return await interaction.response.send_message(f"❌ `{uid}` is not on this list.", ephemeral=True)
+        self.parent_view.page, self.parent_view.highlight = pos // self.parent_view.PAGE_SIZE, uid
+        await interaction.response.edit_message(content=await self.parent_view.get_content(interaction), view=self.parent_view)
+
+class EventFilterModal(ui.Modal, title="Filter Security Events"):
+    user_id = ui.TextInput(label="User ID (leer = alle)", required=False, max_length=20)
+    def __init__(self, parent_view):
+        super().__init__()
+        self.parent_view = parent_view
+    async def on_submit(self, interaction: discord.Interaction):
+        uid = self.user_id.value.strip()
+        if uid and not uid.isdigit(): return await interaction.response.send_message("❌ Only numbers allowed!", ephemeral=True)
+        self.parent_view.actor_id = uid or None
+        self.parent_view.cursors = [None]
+        await interaction.response.edit_message(content=await self.parent_view.get_content(interaction), view=self.parent_view)
+
+# --- SYNC STATUS ---
+def sync_status():
+    status = db.write_status()
+    if not status["pending"]: return "🟢 Database synced"
+    return f"🟠 Offline mode: {status['pending']} change(s) saved locally, waiting for database sync"
+
+def main_menu_content():
+    return f"🛡️ HQ Main Menu\n-# {sync_status()}"
+
+# --- LOAD SHEDDING ---
+# main.py setzt hier raid_guard.should_shed ein. Während eines Raids werden reine Lese-Ansichten
+# (Event-Log, Blättern/Suchen in Listen) nicht neu geladen, damit Datenbank und Event-Loop für
+# die Abwehr frei bleiben; Einstellungen und Listen-Änderungen funktionieren weiter.
+shed_check = lambda guild_id: False
+
+async def shed_refresh(interaction):
+    if not shed_check(interaction.guild_id): return False
+    await interaction.response.send_message("⏳ Raid in progress – this view is paused until it is over.", ephemeral=True)
+    return True
+
 # --- PERMS ---
 async def check_perms(interaction, owner_only=False):
     if interaction.user.id == interaction.guild.owner_id: return True
@@ -96,9 +184,9 @@ class AdmTimerView(ui.View):
         super().__init__(timeout=None)
 
     @classmethod
-    async def create(cls, guild_id):
+    async def create(cls, guild_id, data=None):
         self = cls()
-        data = await db.get_data("adm_timer", guild_id)
+        if data is None: data = await db.get_data("adm_timer", guild_id)
         status = data.get("adm_status", 0)
         self.toggle_adm.label = f"Status: {'ON' if status == 1 else 'OFF'}"
         self.toggle_adm.style = discord.ButtonStyle.green if status == 1 else discord.ButtonStyle.red
@@ -117,10 +205,8 @@ class AdmTimerView(ui.View):
     @ui.button(label="Status", row=0, custom_id="adm_status_toggle")
     async def toggle_adm(self, interaction: discord.Interaction, button: ui.Button):
         if not await check_perms(interaction): return
-        data = await db.get_data("adm_timer", interaction.guild_id)
-        new_val = 1 if data.get("adm_status", 0) == 0 else 0
-        await db.update_data("adm_timer", interaction.guild_id, "adm_status", new_val)
-        await interaction.response.edit_message(view=await AdmTimerView.create(interaction.guild_id))
+        data = await db.toggle_field("adm_timer", interaction.guild_id, "adm_status", 0, 1)
+        await interaction.response.edit_message(view=await AdmTimerView.create(interaction.guild_id, data))
 
     @ui.button(style=discord.ButtonStyle.gray, row=1, custom_id="adm_r1")
     async def role1_btn(self, interaction: discord.Interaction, button: ui.Button):
@@ -144,16 +230,16 @@ class AdmTimerView(ui.View):
 
     @ui.button(label="Back", style=discord.ButtonStyle.red, row=3, custom_id="adm_back")
     async def back(self, interaction: discord.Interaction, button: ui.Button):
-        await interaction.response.edit_message(content="🛡️ HQ Main Menu", view=MainMenuView())
+        await interaction.response.edit_message(content=main_menu_content(), view=MainMenuView())
 
 class LogSettingsView(ui.View):
     def __init__(self):
         super().__init__(timeout=None)
 
     @classmethod
-    async def create(cls, guild_id):
+    async def create(cls, guild_id, settings=None):
         self = cls()
-        settings = await db.get_data("settings", guild_id)
+        if settings is None: settings = await db.get_data("settings", guild_id)
         status = settings.get("log_status", 0)
         self.toggle_btn.label = f"Status: {'ON' if status == 1 else 'OFF'}"
         self.toggle_btn.style = discord.ButtonStyle.green if status == 1 else discord.ButtonStyle.red
@@ -164,10 +250,8 @@ class LogSettingsView(ui.View):
     @ui.button(label="Status", custom_id="log_status_toggle")
     async def toggle_btn(self, interaction: discord.Interaction, button: ui.Button):
         if not await check_perms(interaction): return
-        data = await db.get_data("settings", interaction.guild_id)
-        new_val = 1 if data.get("log_status", 0) == 0 else 0
-        await db.update_data("settings", interaction.guild_id, "log_status", new_val)
-        await interaction.response.edit_message(view=await LogSettingsView.create(interaction.guild_id))
+        settings = await db.toggle_field("settings", interaction.guild_id, "log_status", 0, 1)
+        await interaction.response.edit_message(view=await LogSettingsView.create(interaction.guild_id, settings))
 
     @ui.button(label="Set Channel ID", style=discord.ButtonStyle.blurple, custom_id="log_channel_id_set")
     async def set_channel(self, interaction: discord.Interaction, button: ui.Button):
@@ -176,27 +260,37 @@ class LogSettingsView(ui.View):
 
     @ui.button(label="Back", style=discord.ButtonStyle.red, row=2, custom_id="log_back_main")
     async def back(self, interaction: discord.Interaction, button: ui.Button):
-        await interaction.response.edit_message(content="🛡️ HQ Main Menu", view=MainMenuView())
+        await interaction.response.edit_message(content=main_menu_content(), view=MainMenuView())
 
 class ListView(ui.View):
+    PAGE_SIZE = 20
+
     def __init__(self, list_type):
         super().__init__(timeout=None)
         self.list_type = list_type
-        
+        self.page = 0
+        self.highlight = None
+
     async def get_content(self, interaction):
-        collection = db.db[self.list_type]
-        data = await collection.find_one({"_id": str(interaction.guild_id)})
-        uids = data.get("users", []) if data else []
-        
+        # Nur die aktuelle Seite laden und auflösen, damit auch große Listen unter 2000 Zeichen bleiben
+        uids, total = await db.get_list_page(interaction.guild_id, self.list_type, self.page, self.PAGE_SIZE)
+        pages = max(1, -(-total // self.PAGE_SIZE))
+        if self.page >= pages:
+            self.page = pages - 1
+            uids, total = await db.get_list_page(interaction.guild_id, self.list_type, self.page, self.PAGE_SIZE)
+        self.prev_page.disabled = self.page == 0
+        self.next_page.disabled = self.page >= pages - 1
+
         entries = []
         for uid in uids:
             member = interaction.guild.get_member(int(uid))
             name = f"**{member.display_name}**" if member else f"`{uid}`"
-            entries.append(f"• {name} [ID: `{uid}`]")
+            mark = "➡️" if uid == self.highlight else "•"
+            entries.append(f"{mark} {name} [ID: `{uid}`]")
         
         display_name = "USER-CONFIG-BOT" if self.list_type == "trusted" else self.list_type.upper()
         user_list = "\n".join(entries) if entries else "_Empty / Leer_"
-        return f"📋 **{display_name} MANAGEMENT**\n\n**Users:**\n{user_list}"
+        return f"📋 **{display_name} MANAGEMENT**\n\n**Users:** {total} (Page {self.page + 1}/{pages})\n{user_list}"
         
     @ui.button(label="Add ID", style=discord.ButtonStyle.green, custom_id="list_add_btn")
     async def add(self, interaction: discord.Interaction, button: ui.Button):
@@ -208,9 +302,81 @@ class ListView(ui.View):
         if not await check_perms(interaction, owner_only=True): return
         await interaction.response.send_modal(ListManageModal(self.list_type, "REMOVE", self))
         
+    @ui.button(label="Search ID", style=discord.ButtonStyle.blurple, custom_id="list_search_btn")
+    async def search(self, interaction: discord.Interaction, button: ui.Button):
+        if not await check_perms(interaction, owner_only=True): return
+        if await shed_refresh(interaction): return
+        await interaction.response.send_modal(ListSearchModal(self))
+
+    @ui.button(label="◀ Prev", style=discord.ButtonStyle.gray, row=1, custom_id="list_prev_btn")
+    async def prev_page(self, interaction: discord.Interaction, button: ui.Button):
+        if not await check_perms(interaction, owner_only=True): return
+        if await shed_refresh(interaction): return
+        self.page, self.highlight = max(0, self.page - 1), None
+        await interaction.response.edit_message(content=await self.get_content(interaction), view=self)
+
+    @ui.button(label="Next ▶", style=discord.ButtonStyle.gray, row=1, custom_id="list_next_btn")
+    async def next_page(self, interaction: discord.Interaction, button: ui.Button):
+        if not await check_perms(interaction, owner_only=True): return
+        if await shed_refresh(interaction): return
+        self.page, self.highlight = self.page + 1, None
+        await interaction.response.edit_message(content=await self.get_content(interaction), view=self)
+        
     @ui.button(label="Back", style=discord.ButtonStyle.gray, row=1, custom_id="list_back_btn")
     async def back(self, interaction: discord.Interaction, button: ui.Button):
-        await interaction.response.edit_message(content="🛡️ HQ Main Menu", view=MainMenuView())
+        await interaction.response.edit_message(content=main_menu_content(), view=MainMenuView())
+
+class EventLogView(ui.View):
+    PAGE_SIZE = 10
+
+    def __init__(self):
+        # Nicht persistent: die Seitenposition lebt nur in dieser Instanz
+        super().__init__(timeout=600)
+        self.actor_id = None
+        self.cursors = [None]  # before-Cursor pro bereits besuchter Seite
+        self._next = None
+
+    async def get_content(self, interaction):
+        events = await db.query_events(interaction.guild_id, self.actor_id, self.cursors[-1], self.PAGE_SIZE + 1)
+        has_more = len(events) > self.PAGE_SIZE
+        events = events[:self.PAGE_SIZE]
+        self.newer.disabled = len(self.cursors) == 1
+        self.older.disabled = not has_more
+        if has_more: self._next = (events[-1]["ts"], events[-1]["_id"])
+
+        entries = []
+        for ev in events:
+            ts = int(ev["ts"].replace(tzinfo=datetime.timezone.utc).timestamp())
+            actor = f" <@{ev['actor_id']}>" if ev.get("actor_id") else ""
+            detail = (ev.get("detail") or "").split("\n")[0][:80]
+            entries.append(f"• <t:{ts}:f> **{ev['kind']}**{actor}\n  {detail}")
+        header = "📜 **SECURITY EVENTS**" + (f" – User `{self.actor_id}`" if self.actor_id else "")
+        body = "\n".join(entries) if entries else "_No events / Keine Events_"
+        return f"{header} (Page {len(self.cursors)})\n\n{body}"
+
+    @ui.button(label="◀ Newer", style=discord.ButtonStyle.gray)
+    async def newer(self, interaction: discord.Interaction, button: ui.Button):
+        if not await check_perms(interaction): return
+        if await shed_refresh(interaction): return
+        if len(self.cursors) > 1: self.cursors.pop()
+        await interaction.response.edit_message(content=await self.get_content(interaction), view=self)
+
+    @ui.button(label="Older ▶", style=discord.ButtonStyle.gray)
+    async def older(self, interaction: discord.Interaction, button: ui.Button):
+        if not await check_perms(interaction): return
+        if await shed_refresh(interaction): return
+        self.cursors.append(self._next)
+        await interaction.response.edit_message(content=await self.get_content(interaction), view=self)
+
+    @ui.button(label="Filter User", style=discord.ButtonStyle.blurple)
+    async def filter_btn(self, interaction: discord.Interaction, button: ui.Button):
+        if not await check_perms(interaction): return
+        if await shed_refresh(interaction): return
+        await interaction.response.send_modal(EventFilterModal(self))
+
+    @ui.button(label="Back", style=discord.ButtonStyle.red, row=1)
+    async def back(self, interaction: discord.Interaction, button: ui.Button):
+        await interaction.response.edit_message(content=main_menu_content(), view=MainMenuView())
 
 class ModuleSettingsView(ui.View):
     def __init__(self, module_name, db_prefix, has_limits, limit_col, time_col):
@@ -220,13 +386,14 @@ class ModuleSettingsView(ui.View):
     @classmethod
     async def create(cls, module_name, db_prefix, guild_id, has_limits=False, limit_col=None, time_col=None):
         self = cls(module_name, db_prefix, has_limits, limit_col, time_col)
-        settings = await db.get_data("settings", guild_id)
-        limits = await db.get_data("limits", guild_id)
+        profile = await db.get_profile(guild_id)
+        settings, limits = profile.settings, profile.limits
         
         status = settings.get(f"{db_prefix}_status", 0)
         self.toggle_btn.label = f"Status: {'ON' if status == 1 else 'OFF'}"
         self.toggle_btn.style = discord.ButtonStyle.green if status == 1 else discord.ButtonStyle.red
-        punish = settings.get(f"{db_prefix}_punish", "kick")
+        # Gleiche Voreinstellung wie execute_punishment: Raid-Modus bannt, alles andere kickt
+        punish = settings.get(f"{db_prefix}_punish") or ("ban" if db_prefix == "raid_mode" else "kick")
         self.select_punish.placeholder = f"Punishment: {punish.upper()}"
         
         if has_limits:
@@ -242,12 +409,19 @@ class ModuleSettingsView(ui.View):
             btn = ui.Button(label=f"Extra Action: {current_action.upper()}", style=discord.ButtonStyle.gray, row=2)
             async def toggle_extra(interaction):
                 if not await check_perms(interaction): return
-                data = await db.get_data("settings", interaction.guild_id)
-                new_val = "keep" if data.get("channel_create_action", "delete") == "delete" else "delete"
-                await db.update_data("settings", interaction.guild_id, "channel_create_action", new_val)
+                await db.toggle_field("settings", interaction.guild_id, "channel_create_action", "delete", "keep")
                 await interaction.response.edit_message(view=await ModuleSettingsView.create(module_name, db_prefix, interaction.guild_id, has_limits, limit_col, time_col))
             btn.callback = toggle_extra
             self.add_item(btn)
+
+        if db_prefix == "anti_invite":
+            bad_links = settings.get("bad_links") or []
+            btn_links = ui.Button(label=f"Bad Links: {len(bad_links)}", style=discord.ButtonStyle.gray, row=2)
+            async def edit_links(interaction):
+                if not await check_perms(interaction): return
+                await interaction.response.send_modal(BadLinksModal(bad_links, self))
+            btn_links.callback = edit_links
+            self.add_item(btn_links)
             
         if db_prefix == "anti_ping":
             current_direct = settings.get("anti_ping_direct", "Direct")
@@ -255,20 +429,23 @@ class ModuleSettingsView(ui.View):
             btn_direct = ui.Button(label=f"Mode: {current_direct}", style=discord.ButtonStyle.gray, row=3)
             async def toggle_ping(interaction):
                 if not await check_perms(interaction): return
-                data = await db.get_data("settings", interaction.guild_id)
-                new_val = "Not Direct" if data.get("anti_ping_direct", "Direct") == "Direct" else "Direct"
-                await db.update_data("settings", interaction.guild_id, "anti_ping_direct", new_val)
+                await db.toggle_field("settings", interaction.guild_id, "anti_ping_direct", "Direct", "Not Direct")
                 await interaction.response.edit_message(view=await ModuleSettingsView.create(module_name, db_prefix, interaction.guild_id, has_limits, limit_col, time_col))
             btn_direct.callback = toggle_ping
             self.add_item(btn_direct)
+            mention_limit = limits.get("mention_limit")
+            btn_mass = ui.Button(label=f"Mass Mention: {f'{mention_limit}x' if mention_limit else 'OFF'}", style=discord.ButtonStyle.gray, row=3)
+            async def edit_mass(interaction):
+                if not await check_perms(interaction): return
+                await interaction.response.send_modal(MentionLimitModal(self))
+            btn_mass.callback = edit_mass
+            self.add_item(btn_mass)
         return self
         
     @ui.button(label="Status", custom_id="mod_status_btn")
     async def toggle_btn(self, interaction: discord.Interaction, button: ui.Button):
         if not await check_perms(interaction): return
-        data = await db.get_data("settings", interaction.guild_id)
-        new_val = 1 if data.get(f"{self.db_prefix}_status", 0) == 0 else 0
-        await db.update_data("settings", interaction.guild_id, f"{self.db_prefix}_status", new_val)
+        await db.toggle_field("settings", interaction.guild_id, f"{self.db_prefix}_status", 0, 1)
         await interaction.response.edit_message(view=await ModuleSettingsView.create(self.module_name, self.db_prefix, interaction.guild_id, not self.edit_limits.disabled, self.limit_col, self.time_col))
         
     @ui.button(label="Edit Limits", custom_id="mod_limits_btn")
@@ -288,7 +465,7 @@ class ModuleSettingsView(ui.View):
         
     @ui.button(label="Back", style=discord.ButtonStyle.red, row=4, custom_id="mod_back_btn")
     async def back(self, interaction: discord.Interaction, button: ui.Button):
-        await interaction.response.edit_message(content="🛡️ HQ Main Menu", view=MainMenuView())
+        await interaction.response.edit_message(content=main_menu_content(), view=MainMenuView())
 
 class SpamSelectView(ui.View):
     def __init__(self, guild_id):
@@ -306,9 +483,13 @@ class SpamSelectView(ui.View):
     async def web(self, interaction: discord.Interaction, button: ui.Button):
         v = await ModuleSettingsView.create("Anti-Webhook", "anti_webhook", self.guild_id, True, "webhook_limit", None)
         await interaction.response.edit_message(content="🛡️ **Anti-Webhook**", view=v)
+    @ui.button(label="Anti-Flood", row=1, custom_id="spam_flood_btn")
+    async def flood(self, interaction: discord.Interaction, button: ui.Button):
+        v = await ModuleSettingsView.create("Anti-Flood", "anti_flood", self.guild_id, True, "flood_limit", "flood_time")
+        await interaction.response.edit_message(content="🛡️ **Anti-Flood**", view=v)
     @ui.button(label="Back", style=discord.ButtonStyle.red, row=2, custom_id="spam_back_btn")
     async def back(self, interaction: discord.Interaction, button: ui.Button):
-        await interaction.response.edit_message(content="🛡️ HQ Main Menu", view=MainMenuView())
+        await interaction.response.edit_message(content=main_menu_content(), view=MainMenuView())
 
 class NukeSelectView(ui.View):
     def __init__(self, guild_id):
@@ -334,15 +515,25 @@ class NukeSelectView(ui.View):
     async def bot_join(self, interaction: discord.Interaction, button: ui.Button):
         v = await ModuleSettingsView.create("Anti-Bot Join", "anti_bot", self.guild_id, True, "bot_limit", None)
         await interaction.response.edit_message(content="☢️ **Anti-Bot Join**", view=v)
+    @ui.button(label="Anti-Join Raid", row=2, custom_id="nuke_join_btn")
+    async def join_raid(self, interaction: discord.Interaction, button: ui.Button):
+        v = await ModuleSettingsView.create("Anti-Join Raid", "join_raid", self.guild_id, True, "join_limit", "join_time")
+        await interaction.response.edit_message(content="☢️ **Anti-Join Raid**", view=v)
+    @ui.button(label="Raid Mode", style=discord.ButtonStyle.danger, row=3, custom_id="nuke_raid_btn")
+    async def raid_mode(self, interaction: discord.Interaction, button: ui.Button):
+        v = await ModuleSettingsView.create("Raid Mode", "raid_mode", self.guild_id, True, "raid_score", "raid_window")
+        await interaction.response.edit_message(content="🚨 **Raid Mode** (Score / Seconds)", view=v)
     @ui.button(label="Back", style=discord.ButtonStyle.red, row=2, custom_id="nuke_back_btn")
     async def back(self, interaction: discord.Interaction, button: ui.Button):
-        await interaction.response.edit_message(content="🛡️ HQ Main Menu", view=MainMenuView())
+        await interaction.response.edit_message(content=main_menu_content(), view=MainMenuView())
 
 class MainMenuView(ui.View):
     def __init__(self):
         super().__init__(timeout=None)
     def base_embed(self):
-        return discord.Embed(title="🛡️ Globex Security HQ", color=0x2b2d31, description="Choose a category / Wähle eine Kategorie:")
+        embed = discord.Embed(title="🛡️ Globex Security HQ", color=0x2b2d31, description="Choose a category / Wähle eine Kategorie:")
+        embed.set_footer(text=sync_status())
+        return embed
     @ui.button(label="Anti-Spam", style=discord.ButtonStyle.blurple, emoji="🛡️", custom_id="main_spam_btn")
     async def spam(self, interaction: discord.Interaction, button: ui.Button):
         if not await check_perms(interaction): return
@@ -378,6 +569,12 @@ class MainMenuView(ui.View):
         if not await check_perms(interaction, owner_only=True): return
         v = ListView("blacklist")
         await interaction.response.edit_message(content=await v.get_content(interaction), view=v)
+    @ui.button(label="Event Log", style=discord.ButtonStyle.gray, emoji="📜", row=3, custom_id="main_events_btn")
+    async def events_btn(self, interaction: discord.Interaction, button: ui.Button):
+        if not await check_perms(interaction): return
+        if await shed_refresh(interaction): return
+        v = EventLogView()
+        await interaction.response.edit_message(content=await v.get_content(interaction), view=v)
     @ui.button(label="Help / Hilfe", style=discord.ButtonStyle.gray, emoji="❔", row=3, custom_id="main_help_btn")
     async def help_btn(self, interaction: discord.Interaction, button: ui.Button):
         embed = discord.Embed(title="❔ User-config-bot Help Center (EN/DE)", color=0x3498db)
@@ -385,15 +582,25 @@ class MainMenuView(ui.View):
             "**🔑 User-config-bot:** Authorized users who can manage security modules.\n"
             "**🔢 Limits/Timeframe:** ONLY numbers allowed.\n"
             "**⚠️ Anti-Invite/Ping:** 'Limit' refers to the **number of links/pings** in one message.\n"
+            "**🔗 Bad Links / Mass Mention:** Own blocked domains (Anti-Invite) and max. user mentions per message (Anti-Ping, counts like @everyone).\n"
             "**🛡️ Anti-Channel Create:** We recommend **'Keep'** action.\n"
-            "**⏱️ Edit-ADM-Roles:** Set roles for timed Admin permissions."
+            "**⏱️ Edit-ADM-Roles:** Set roles for timed Admin permissions.\n"
+            "**🚨 Raid Mode:** Scores every nuke action per user; above the limit the user is punished instantly.\n"
+            "**🌊 Anti-Flood:** 'Limit' is how often the **same text** may be posted (by anyone) within the timeframe.\n"
+            "**🚪 Anti-Join Raid:** Too many joins within the timeframe start a lockdown; new or suspicious accounts are punished in batches.\n"
+            "**📜 Event Log:** Browse past detections and punishments, filterable by user ID."
         )
         de_text = (
             "**🔑 User-config-bot:** Autorisierte Nutzer für Sicherheitsmodule.\n"
             "**🔢 Limits/Zeitrahmen:** NUR Zahlen erlaubt.\n"
             "**⚠️ Anti-Invite/Ping:** 'Limit' ist die **Anzahl der Links/Pings** pro Nachricht.\n"
+            "**🔗 Bad Links / Mass Mention:** Eigene gesperrte Domains (Anti-Invite) und max. User-Erwähnungen pro Nachricht (Anti-Ping, zählt wie @everyone).\n"
             "**🛡️ Anti-Channel Create:** Wir empfehlen die Aktion **'Keep'**.\n"
-            "**⏱️ Edit-ADM-Roles:** Rollen für zeitgesteuerte Admin-Rechte."
+            "**⏱️ Edit-ADM-Roles:** Rollen für zeitgesteuerte Admin-Rechte.\n"
+            "**🚨 Raid Mode:** Bewertet alle Nuke-Aktionen pro Nutzer; über dem Limit wird sofort bestraft.\n"
+            "**🌊 Anti-Flood:** 'Limit' ist, wie oft **derselbe Text** (von allen) im Zeitrahmen gepostet werden darf.\n"
+            "**🚪 Anti-Join Raid:** Zu viele Joins im Zeitrahmen starten einen Lockdown; neue/verdächtige Accounts werden gesammelt bestraft.\n"
+            "**📜 Event Log:** Vergangene Erkennungen und Strafen, filterbar nach User-ID."
         )
         embed.add_field(name="🇬🇧 English", value=en_text, inline=False)
         embed.add_field(name="🇩🇪 Deutsch", value=de_text, inline=False)
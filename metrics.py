@@ -0,0 +1,189 @@
+import asyncio
+import bisect
+import functools
+import os
+import time
+
+# --- METRICS ---
+# Zähler, Fehler und Latenz-Histogramme für Event-Handler, Datenbank-Aufrufe und Discord-REST.
+# Pro Aufruf nur zwei perf_counter()-Aufrufe und ein paar Integer-Inkremente; die Serie wird
+# beim Dekorieren einmal angelegt, nicht bei jedem Aufruf gesucht.
+# GLOBEX_METRICS_PORT gesetzt -> lokaler Prometheus-Text-Endpoint (nur GET /metrics).
+
+LATENCY_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0)
+METRICS_HOST = os.getenv("GLOBEX_METRICS_HOST", "127.0.0.1")
+METRICS_PORT = int(os.getenv("GLOBEX_METRICS_PORT", "0"))
+
+
+class _Series:
+    __slots__ = ("count", "errors", "total", "buckets")
+
+    def __init__(self):
+        self.count = 0
+        self.errors = 0
+        self.total = 0.0
+        self.buckets = [0] * (len(LATENCY_BUCKETS) + 1)
+
+    def observe(self, seconds, error=False):
+        self.count += 1
+        self.total += seconds
+        self.buckets[bisect.bisect_left(LATENCY_BUCKETS, seconds)] += 1
+        if error:
+            self.errors += 1
+
+    def quantile(self, q):
+        """Obergrenze des Buckets, in dem das q-Quantil liegt (Schätzung aus dem Histogramm)."""
+        if not self.count:
+            return 0.0
+        rank, seen = q * self.count, 0
+        for bound, n in zip(LATENCY_BUCKETS, self.buckets):
+            seen += n
+            if seen >= rank:
+                return bound
+        return float("inf")
+
+
+class Metrics:
+    def __init__(self):
+        self._series = {}      # (kind, name) -> _Series
+        self._swallowed = {}   # (where, exception) -> Anzahl
+        self._collectors = {}  # component -> callable, liefert das metrics()-Dict einer Komponente
+
+    def series(self, kind, name):
+        key = (kind, name)
+        series = self._series.get(key)
+        if series is None:
+            series = self._series[key] = _Series()
+        return series
+
+    def instrument(self, kind, name=None):
+        """Decorator für async-Funktionen: zählt Aufrufe, Fehler und Laufzeit."""
+        def decorator(func):
+            series = self.series(kind, name or func.__name__)
+
+            @functools.wraps(func)
+            async def wrapper(*args, **kwargs):
+                start = time.perf_counter()
+                error = False
+                try:
+                    return await func(*args, **kwargs)
+                except BaseException:
+                    error = True
+                    raise
+                finally:
+                    series.observe(time.perf_counter() - start, error)
+            return wrapper
+        return decorator
+
+    def instrument_http(self, http):
+        """Hängt sich in HTTPClient.request ein, damit jede REST-Aktion (pro Route) erfasst wird."""
+        request = http.request
+
+        async def timed_request(route, **kwargs):
+            start = time.perf_counter()
+            error = False
+            try:
+                return await request(route, **kwargs)
+            except BaseException:
+                error = True
+                raise
+            finally:
+                self.series("rest", f"{route.method} {route.path}").observe(time.perf_counter() - start, error)
+        http.request = timed_request
+
+    def swallowed(self, where, exc):
+        """Für `except ...: pass`-Stellen: der Fehler wird weiter ignoriert, aber gezählt."""
+        key = (where, type(exc).__name__)
+        self._swallowed[key] = self._swallowed.get(key, 0) + 1
+
+    def register(self, component, collect):
+        self._collectors[component] = collect
+
+    def components(self):
+        result = {}
+        for component, collect in self._collectors.items():
+            try:
+                result[component] = collect()
+            except Exception as e:
+                self.swallowed(f"collect.{component}", e)
+        return result
+
+    def snapshot(self):
+        return {
+            "series": {f"{kind}:{name}": {"count": s.count, "errors": s.errors, "avg": s.total / s.count if s.count else 0.0,
+                                          "p50": s.quantile(0.5), "p99": s.quantile(0.99)}
+                       for (kind, name), s in self._series.items()},
+            "swallowed": {f"{where}:{exc}": n for (where, exc), n in self._swallowed.items()},
+            "components": self.components(),
+        }
+
+    # --- Prometheus-Textformat ---
+    def prometheus(self):
+        # Zeilen einer Metrik-Familie müssen zusammenhängend stehen
+        series = sorted(self._series.items())
+        labels = {key: f'kind="{key[0]}",name="{_escape(key[1])}"' for key, _ in series}
+        lines = ["# TYPE globex_calls_total counter"]
+        lines += [f"globex_calls_total{{{labels[key]}}} {s.count}" for key, s in series]
+        lines.append("# TYPE globex_errors_total counter")
+        lines += [f"globex_errors_total{{{labels[key]}}} {s.errors}" for key, s in series]
+        lines.append("# TYPE globex_latency_seconds histogram")
+        for key, s in series:
+            cumulative = 0
+            for bound, n in zip(LATENCY_BUCKETS, s.buckets):
+                cumulative += n
+                lines.append(f'globex_latency_seconds_bucket{{{labels[key]},le="{bound}"}} {cumulative}')
+            lines.append(f'globex_latency_seconds_bucket{{{labels[key]},le="+Inf"}} {s.count}')
+            lines.append(f"globex_latency_seconds_sum{{{labels[key]}}} {s.total}")
+            lines.append(f"globex_latency_seconds_count{{{labels[key]}}} {s.count}")
+        lines.append("# TYPE globex_swallowed_exceptions_total counter")
+        for (where, exc), n in sorted(self._swallowed.items()):
+            lines.append(f'globex_swallowed_exceptions_total{{where="{_escape(where)}",exception="{exc}"}} {n}')
+        lines.append("# TYPE globex_component gauge")
+        for component, values in self.components().items():
+            for metric, value in _flatten(values):
+                lines.append(f'globex_component{{component="{component}",metric="{metric}"}} {value}')
+        return "\n".join(lines) + "\n"
+
+    async def serve(self, host=METRICS_HOST, port=METRICS_PORT):
+        """Minimaler HTTP-Endpoint für Prometheus; bewusst nur auf localhost voreingestellt."""
+        async def handle(reader, writer):
+            try:
+                request_line = await reader.readline()
+                while (await reader.readline()) not in (b"\r\n", b"\n", b""):
+                    pass
+                if request_line.split(b" ")[:2] == [b"GET", b"/metrics"]:
+                    status, body = "200 OK", self.prometheus().encode()
+                else:
+                    status, body = "404 Not Found", b"not found\n"
+                writer.write(f"HTTP/1.1 {status}\r\nContent-Type: text/plain; version=0.0.4\r\n"
+                             f"Content-Length: {len(body)}\r\nConnection: close\r\n\r\n".encode() + body)
+                await writer.drain()
+            except Exception as e:
+                self.swallowed("metrics.serve", e)
+            finally:
+                writer.close()
+
+        server = await asyncio.start_server(handle, host, port)
+        print(f"📈 Metrics endpoint on http://{host}:{port}/metrics")
+        async with server:
+            await server.serve_forever()
+
+
+def _escape(value):
+    return str(value).replace("\\", "\\\\").replace('"', '\\"')
+
+
+def _flatten(values, prefix=""):
+    # Verschachtelte metrics()-Dicts (z.B. Histogramme) zu "a_b"-Namen; nur Zahlen
+    for key, value in values.items():
+        name = f"{prefix}{key}"
+        if isinstance(value, dict):
+            yield from _flatten(value, name + "_")
+        elif isinstance(value, (int, float)) and not isinstance(value, bool):
+            yield name, value
+
+
+# Prozessweite Instanz, damit auch database.py ohne Import von main instrumentiert werden kann
+registry = Metrics()
+instrument = registry.instrument
+swallowed = registry.swallowed
@@ -0,0 +1,66 @@
+"""Kopiert alle Daten von einem Speicher-Backend in ein anderes (siehe storage.py).
+
+Pro Collection wird seitenweise exportiert und gebündelt geschrieben (Mongo: bulk_write,
+SQLite: eine Transaktion pro Batch). Vorhandene Dokumente im Ziel werden ersetzt, ein
+erneuter Lauf ist also harmlos -- außer für Events, die werden angehängt (--skip-events).
+
+    python migrate.py --from mongo --to sqlite --target-path globex.db
+    python migrate.py --from sqlite --to mongo --source-path globex.db --target-url mongodb://...
+"""
+import argparse
+import asyncio
+import time
+
+from storage import CACHED_CATEGORIES, EVENT_COLLECTION, create_backend
+
+COLLECTIONS = CACHED_CATEGORIES + ("snapshots", EVENT_COLLECTION)
+
+
+def _options(kind, url, path):
+    if kind == "mongo" and url: return {"url": url}
+    if kind == "sqlite" and path: return {"path": path}
+    return {}
+
+
+async def migrate(source, target, collections=COLLECTIONS, batch_size=500):
+    """Gibt {collection: Anzahl kopierter Dokumente} zurück."""
+    copied = {}
+    for category in collections:
+        start, copied[category] = time.perf_counter(), 0
+        async for batch in source.export(category, batch_size):
+            await target.import_docs(category, batch)
+            copied[category] += len(batch)
+        print(f"  {category:<12} {copied[category]:>9} docs  {time.perf_counter() - start:6.1f} s")
+    return copied
+
+
+async def _main(args):
+    source_options = _options(args.source, args.source_url, args.source_path)
+    target_options = _options(args.target, args.target_url, args.target_path)
+    if args.source == args.target and source_options == target_options:
+        raise SystemExit("❌ Source and target are the same database")
+    source = create_backend(args.source, **source_options)
+    target = create_backend(args.target, **target_options)
+    collections = tuple(c for c in COLLECTIONS if not (args.skip_events and c == EVENT_COLLECTION))
+    try:
+        await source.ping()
+        await target.ping()
+        print(f"📦 Migrating {source.name} -> {target.name}")
+        copied = await migrate(source, target, collections, args.batch)
+        print(f"✅ Done: {sum(copied.values())} documents")
+    finally:
+        await source.close()
+        await target.close()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Globex Security storage migration")
+    parser.add_argument("--from", dest="source", required=True, choices=["mongo", "sqlite"])
+    parser.add_argument("--to", dest="target", required=True, choices=["mongo", "sqlite"])
+    parser.add_argument("--source-url", help="MongoDB-URL der Quelle (Standard: MONGO_URL)")
+    parser.add_argument("--target-url", help="MongoDB-URL des Ziels (Standard: MONGO_URL)")
+    parser.add_argument("--source-path", help="SQLite-Datei der Quelle (Standard: GLOBEX_SQLITE_PATH)")
+    parser.add_argument("--target-path", help="SQLite-Datei des Ziels (Standard: GLOBEX_SQLITE_PATH)")
+    parser.add_argument("--batch", type=int, default=500, help="Dokumente pro Schreib-Batch")
+    parser.add_argument("--skip-events", action="store_true", help="Security-Events nicht kopieren")
+    asyncio.run(_main(parser.parse_args()))
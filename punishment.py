@@ -0,0 +1,98 @@
+import asyncio
+import bisect
+import os
+import time
+
+# --- PUNISHMENT ENGINE ---
+# Bestrafungen laufen nicht mehr inline im Event-Handler: offene Aktionen werden pro
+# (guild, member) dedupliziert und über einen begrenzten Worker-Pool parallel ausgeführt.
+# Pro Server laufen höchstens PER_GUILD Aktionen gleichzeitig, damit die per-Guild
+# Routen (kick/ban/timeout) nicht in 429er laufen; den Rest des Rate-Limit-Handlings
+# übernimmt der HTTP-Client von discord.py.
+# Kommt für ein Mitglied mit offener Aktion eine schwerere nach (z.B. raid_mode-Ban auf
+# einen noch laufenden Kick), ersetzt sie die wartende Aktion bzw. läuft direkt danach.
+
+WORKERS = int(os.getenv("GLOBEX_PUNISH_WORKERS", "16"))
+PER_GUILD = int(os.getenv("GLOBEX_PUNISH_PER_GUILD", "3"))
+# Histogramm-Grenzen in Sekunden (Event empfangen -> Aktion ausgeführt)
+LATENCY_BUCKETS = (0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+
+class PunishmentEngine:
+    def __init__(self, execute, workers=WORKERS, per_guild=PER_GUILD, severity=None):
+        # execute(member, module_prefix, guild_id, profile) führt die eigentliche Strafe aus,
+        # severity(module_prefix, profile) gibt den Rang der Strafe zurück (höher = schwerer)
+        self.execute = execute
+        self.severity = severity or (lambda module_prefix, profile: 0)
+        self.per_guild = per_guild
+        self._workers = asyncio.Semaphore(workers)
+        self._guild_slots = {}
+        self._pending = {}
+        self.histogram = [0] * (len(LATENCY_BUCKETS) + 1)
+        self.stats = {"submitted": 0, "deduplicated": 0, "escalated": 0, "executed": 0, "failed": 0,
+                      "latency_sum": 0.0}
+
+    def submit(self, member, module_prefix, guild_id, profile=None, received_at=None):
+        """Plant eine Bestrafung ein. Gibt False zurück, wenn schon eine gleich schwere offen ist."""
+        key = (guild_id, member.id)
+        self.stats["submitted"] += 1
+        rank = self.severity(module_prefix, profile)
+        received_at = received_at or time.monotonic()
+        pending = self._pending.get(key)
+        if pending is not None:
+            if rank <= pending["rank"]:
+                self.stats["deduplicated"] += 1
+                return False
+            # Schwerere Aktion übernimmt den Eintrag; _run führt sie aus, sobald es dran ist
+            pending.update(member=member, module=module_prefix, profile=profile, rank=rank,
+                           received_at=received_at)
+            self.stats["escalated"] += 1
+            return True
+        pending = self._pending[key] = {"member": member, "module": module_prefix, "profile": profile,
+                                        "rank": rank, "received_at": received_at}
+        pending["task"] = asyncio.get_running_loop().create_task(self._run(key, pending, guild_id))
+        return True
+
+    def is_pending(self, guild_id, member_id):
+        return (guild_id, member_id) in self._pending
+
+    async def _run(self, key, pending, guild_id):
+        # {guild_id: [Semaphore, offene Aktionen]}
+        guild_slot = self._guild_slots.get(guild_id)
+        if guild_slot is None:
+            guild_slot = self._guild_slots[guild_id] = [asyncio.Semaphore(self.per_guild), 0]
+        guild_slot[1] += 1
+        try:
+            # Erst den Server-Slot, dann den Worker: sonst blockieren wartende Aufgaben eines
+            # Servers im Raid alle Worker und andere Server kommen nicht mehr dran
+            async with guild_slot[0], self._workers:
+                done = None
+                # Wurde während der Ausführung eskaliert, läuft die schwerere Aktion gleich hinterher
+                while done is None or pending["rank"] > done:
+                    done, module_prefix = pending["rank"], pending["module"]
+                    try:
+                        await self.execute(pending["member"], module_prefix, guild_id, pending["profile"])
+                        self.stats["executed"] += 1
+                        self._observe(time.monotonic() - pending["received_at"])
+                    except Exception as e:
+                        self.stats["failed"] += 1
+                        print(f"Punishment Error in {guild_id}: {e}")
+        finally:
+            del self._pending[key]
+            guild_slot[1] -= 1
+            if guild_slot[1] == 0:
+                del self._guild_slots[guild_id]
+
+    def _observe(self, seconds):
+        self.histogram[bisect.bisect_left(LATENCY_BUCKETS, seconds)] += 1
+        self.stats["latency_sum"] += seconds
+
+    async def join(self):
+        """Wartet, bis alle offenen Bestrafungen abgearbeitet sind."""
+        while self._pending:
+            await asyncio.gather(*[p["task"] for p in self._pending.values()], return_exceptions=True)
+
+    def metrics(self):
+        buckets = {f"le_{b}": c for b, c in zip(LATENCY_BUCKETS, self.histogram)}
+        buckets["le_inf"] = self.histogram[-1]
+        return {**self.stats, "pending": len(self._pending), "latency_histogram": buckets}
@@ -0,0 +1,94 @@
+import asyncio
+import math
+import os
+import time
+
+# --- RAID MODE CIRCUIT BREAKER ---
+# Alle Anti-Nuke-/Anti-Spam-Handler melden Aktionen hierher. Pro (Server, Akteur) wird ein
+# exponentiell abklingender Score geführt; überschreitet er die Schwelle, geht der Server in
+# den Raid-Modus und der Akteur wird ab sofort ohne weitere Modul-Prüfungen bestraft.
+
+# Gewichte pro Aktion: zerstörerische Aktionen zählen mehr
+ACTION_WEIGHTS = {
+    "channel_delete": 3, "role_delete": 3, "bot_add": 3, "webhook": 2,
+    "channel_create": 1, "role_create": 1, "invite": 1, "ping": 1, "flood": 1,
+}
+DEFAULT_THRESHOLD = 10
+DEFAULT_WINDOW = 30
+RAID_DURATION = int(os.getenv("GLOBEX_RAID_DURATION", "300"))
+# Akteure ohne Aktivität werden danach vergessen (Score ist dann längst abgeklungen)
+IDLE_HORIZON = 3600
+
+
+class _ActorScore:
+    __slots__ = ("score", "updated", "raider_until")
+
+    def __init__(self):
+        self.score = 0.0
+        self.updated = time.monotonic()
+        self.raider_until = 0.0
+
+
+class RaidGuard:
+    def __init__(self, raid_duration=RAID_DURATION):
+        self.raid_duration = raid_duration
+        self._actors = {}   # (guild_id, actor_id) -> _ActorScore
+        self._raids = {}    # guild_id -> Raid-Modus aktiv bis
+        self.stats = {"events": 0, "trips": 0, "short_circuits": 0, "shed": 0}
+
+    def record(self, profile, actor_id, action):
+        """Verbucht eine Aktion. Gibt True zurück, wenn der Akteur als Raider gilt
+        (Schwelle gerade überschritten oder bereits im Raid-Modus markiert)."""
+        if profile.settings.get("raid_mode_status") != 1:
+            return False
+        self.stats["events"] += 1
+        now = time.monotonic()
+        guild_id = profile.guild_id
+        key = (guild_id, actor_id)
+        actor = self._actors.get(key)
+        if actor is None:
+            actor = self._actors[key] = _ActorScore()
+        if actor.raider_until > now:
+            self.stats["short_circuits"] += 1
+            return True
+
+        window = profile.limits.get("raid_window") or DEFAULT_WINDOW
+        threshold = profile.limits.get("raid_score") or DEFAULT_THRESHOLD
+        actor.score = actor.score * math.exp(-(now - actor.updated) / window) + ACTION_WEIGHTS.get(action, 1)
+        actor.updated = now
+        if actor.score >= threshold:
+            actor.raider_until = self._raids[guild_id] = now + self.raid_duration
+            self.stats["trips"] += 1
+            return True
+        return False
+
+    def in_raid(self, guild_id):
+        until = self._raids.get(str(guild_id))
+        if until is None:
+            return False
+        if until <= time.monotonic():
+            del self._raids[str(guild_id)]
+            return False
+        return True
+
+    def should_shed(self, guild_id):
+        """Niedrig priorisierte Arbeit (Log-Embeds, ADM-Logs, Menü-Ansichten) während eines Raids auslassen."""
+        if self.in_raid(guild_id):
+            self.stats["shed"] += 1
+            return True
+        return False
+
+    def sweep(self):
+        now = time.monotonic()
+        for key in [k for k, a in self._actors.items()
+                    if a.raider_until <= now and now - a.updated > IDLE_HORIZON]:
+            del self._actors[key]
+
+    async def run_sweeper(self, interval=60):
+        while True:
+            await asyncio.sleep(interval)
+            self.sweep()
+
+    def metrics(self):
+        return {**self.stats, "tracked_actors": len(self._actors),
+                "guilds_in_raid": sum(1 for g in list(self._raids) if self.in_raid(g))}
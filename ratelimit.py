@@ -0,0 +1,168 @@
+import asyncio
+import itertools
+import os
+import sys
+import time
+from array import array
+from collections import OrderedDict
+
+# --- SLIDING WINDOW RATE LIMITER ---
+# Ersetzt den verschachtelten violation_tracker: pro Schlüssel (guild, user, module)
+# ein Ringpuffer fester Größe (= Limit) mit den letzten Zeitstempeln.
+
+MAX_IDLE = int(os.getenv("GLOBEX_LIMITER_MAX_IDLE", "86400"))
+MAX_BYTES = int(os.getenv("GLOBEX_LIMITER_MAX_BYTES", str(32 * 1024 * 1024)))
+SWEEP_INTERVAL = int(os.getenv("GLOBEX_LIMITER_SWEEP_INTERVAL", "60"))
+
+
+class _Window:
+    """Ringpuffer der letzten `limit` Zeitstempel eines Schlüssels."""
+    __slots__ = ("stamps", "head", "count", "window", "last_seen")
+
+    def __init__(self, limit, window):
+        self.stamps = array("d", bytes(8 * limit))
+        self.head = 0
+        self.count = 0
+        self.window = window
+        self.last_seen = 0.0
+
+    def resize(self, limit):
+        # Limit wurde im Menü geändert: die neuesten Zeitstempel übernehmen
+        recent = [self.stamps[(self.head - 1 - i) % len(self.stamps)] for i in range(self.count)]
+        recent = recent[:limit][::-1]
+        self.stamps = array("d", bytes(8 * limit))
+        for i, stamp in enumerate(recent):
+            self.stamps[i] = stamp
+        self.count = len(recent)
+        self.head = self.count % limit
+
+    def hit(self, now):
+        size = len(self.stamps)
+        self.stamps[self.head] = now
+        self.head = (self.head + 1) % size
+        if self.count < size:
+            self.count += 1
+        self.last_seen = now
+        # Der Puffer ist voll und der älteste Eintrag liegt noch im Zeitfenster
+        return self.count == size and now - self.stamps[self.head % size] < self.window
+
+    def nbytes(self):
+        return sys.getsizeof(self) + sys.getsizeof(self.stamps)
+
+
+class SlidingWindowLimiter:
+    def __init__(self, max_bytes=MAX_BYTES, max_idle=MAX_IDLE):
+        self.max_bytes = max_bytes
+        self.max_idle = max_idle
+        self._windows = OrderedDict()
+        self._bytes = 0
+        self.stats = {"hits": 0, "exceeded": 0, "swept": 0, "evicted": 0}
+
+    def hit(self, key, limit, window):
+        """Zählt ein Ereignis und gibt True zurück, wenn `limit` Ereignisse im Zeitfenster liegen."""
+        if not limit:
+            return False
+        now = time.monotonic()
+        slot = self._windows.get(key)
+        if slot is None:
+            slot = self._windows[key] = _Window(limit, window)
+            self._bytes += slot.nbytes()
+            self._enforce_ceiling()
+        else:
+            self._windows.move_to_end(key)
+            slot.window = window
+            if len(slot.stamps) != limit:
+                self._bytes -= slot.nbytes()
+                slot.resize(limit)
+                self._bytes += slot.nbytes()
+        self.stats["hits"] += 1
+        exceeded = slot.hit(now)
+        if exceeded:
+            self.stats["exceeded"] += 1
+        return exceeded
+
+    def _drop(self, key):
+        slot = self._windows.pop(key)
+        self._bytes -= slot.nbytes()
+
+    def _enforce_ceiling(self):
+        while self._bytes > self.max_bytes and len(self._windows) > 1:
+            self._drop(next(iter(self._windows)))
+            self.stats["evicted"] += 1
+
+    def sweep(self):
+        """Entfernt Schlüssel, deren letztes Ereignis außerhalb des Zeitfensters liegt."""
+        now = time.monotonic()
+        idle = [key for key, slot in self._windows.items()
+                if now - slot.last_seen >= min(slot.window, self.max_idle)]
+        for key in idle:
+            self._drop(key)
+        self.stats["swept"] += len(idle)
+        return len(idle)
+
+    async def run_sweeper(self, interval=SWEEP_INTERVAL):
+        while True:
+            await asyncio.sleep(interval)
+            self.sweep()
+
+    async def check(self, key, limit, window):
+        return self.hit(key, limit, window)
+
+    def metrics(self):
+        return {**self.stats, "active_keys": len(self._windows), "bytes": self._bytes}
+
+
+# --- SHARED BACKEND ---
+# Für den Multi-Prozess-Betrieb: dieselbe Semantik als Redis Sorted Set, damit Limits
+# über alle Shards hinweg gelten. redis ist optional und wird nur hier benötigt.
+
+class RedisLimiter:
+    def __init__(self, url, prefix="globex:rl", max_idle=MAX_IDLE):
+        try:
+            import redis.asyncio as redis
+        except ImportError:
+            raise RuntimeError("GLOBEX_STATE_BACKEND=redis benötigt das Paket 'redis'")
+        self._redis = redis.from_url(url)
+        self.prefix = prefix
+        self.max_idle = max_idle
+        self.stats = {"hits": 0, "exceeded": 0, "errors": 0}
+        self._fallback = SlidingWindowLimiter()
+        self._seq = itertools.count()
+
+    async def check(self, key, limit, window):
+        if not limit:
+            return False
+        self.stats["hits"] += 1
+        name = ":".join([self.prefix, *map(str, key)])
+        now = time.time()
+        try:
+            async with self._redis.pipeline(transaction=True) as pipe:
+                pipe.zremrangebyscore(name, 0, now - window)
+                pipe.zadd(name, {f"{now}:{os.getpid()}:{next(self._seq)}": now})
+                # Nur die letzten `limit` Einträge sind für die Entscheidung relevant
+                pipe.zremrangebyrank(name, 0, -(limit + 1))
+                pipe.zcard(name)
+                pipe.expire(name, max(1, int(min(window, self.max_idle))))
+                count = (await pipe.execute())[3]
+        except Exception:
+            # Redis nicht erreichbar: lokal weiterzählen statt den Schutz auszusetzen
+            self.stats["errors"] += 1
+            return self._fallback.hit(key, limit, window)
+        exceeded = count >= limit
+        if exceeded:
+            self.stats["exceeded"] += 1
+        return exceeded
+
+    async def run_sweeper(self, interval=SWEEP_INTERVAL):
+        # Redis räumt über EXPIRE selbst auf, nur der lokale Fallback braucht den Sweeper
+        await self._fallback.run_sweeper(interval)
+
+    def metrics(self):
+        return {**self.stats, "backend": "redis", "fallback": self._fallback.metrics()}
+
+
+def create_limiter():
+    """Wählt das Backend über GLOBEX_STATE_BACKEND ("local" oder "redis" mit REDIS_URL)."""
+    if os.getenv("GLOBEX_STATE_BACKEND", "local") == "redis":
+        return RedisLimiter(os.getenv("REDIS_URL", "redis://localhost:6379/0"))
+    return SlidingWindowLimiter()
@@ -0,0 +1,113 @@
+import asyncio
+import datetime
+import heapq
+import itertools
+import time
+from zoneinfo import ZoneInfo
+import database as db
+
+# --- ADM TIMER SCHEDULER ---
+# Min-Heap der nächsten Umschaltzeitpunkte (give/remove für Rolle 1 und 2),
+# nur für Server mit adm_status == 1. Ohne aktive Timer schläft der Loop komplett.
+
+TZ_BERLIN = ZoneInfo("Europe/Berlin")
+# Kleiner Puffer, damit die Minute beim Auslösen sicher erreicht ist
+FIRE_DELAY = 1.0
+
+
+def is_valid_time(value):
+    return ":" in str(value) and str(value).replace(":", "", 1).isdigit()
+
+
+def next_occurrence(hhmm, now=None):
+    """Nächster Zeitpunkt (Unix-Timestamp) für eine Berliner Uhrzeit HH:MM."""
+    now = now or datetime.datetime.now(TZ_BERLIN)
+    hour, minute = (int(x) for x in str(hhmm).split(":"))
+    due = now.replace(hour=hour, minute=minute, second=0, microsecond=0)
+    if due <= now:
+        due = (due + datetime.timedelta(days=1)).replace(hour=hour, minute=minute)
+    return due.timestamp() + FIRE_DELAY
+
+
+class AdmScheduler:
+    def __init__(self, apply, owns_guild=None):
+        # apply(guild_id, data, index) setzt die Rolle auf den aktuell gültigen Zustand
+        self.apply = apply
+        self.owns_guild = owns_guild or (lambda guild_id: True)
+        self._heap = []
+        self._timers = {}  # guild_id -> (version, data)
+        self._seq = itertools.count()
+        # Versionen zählen global weiter, auch wenn ein Timer zwischendurch aus war
+        self._versions = itertools.count(1)
+        self._wakeup = asyncio.Event()
+        self.stats = {"transitions": 0, "reschedules": 0}
+
+    def _push(self, guild_id, version, data, index, kind):
+        hhmm = data.get(f"{kind}_time_{index}")
+        heapq.heappush(self._heap, (next_occurrence(hhmm), next(self._seq), guild_id, version, index, kind))
+
+    def _is_active(self, data, index):
+        r_id = data.get(f"role_id_{index}")
+        return (r_id and str(r_id).isdigit()
+                and is_valid_time(data.get(f"give_time_{index}"))
+                and is_valid_time(data.get(f"remove_time_{index}")))
+
+    async def set_timer(self, guild_id, data):
+        """Plant die Übergänge eines Servers neu; alte Heap-Einträge verfallen über die Version."""
+        guild_id = str(guild_id)
+        version = next(self._versions)
+        self.stats["reschedules"] += 1
+        if not data or data.get("adm_status", 0) == 0 or not self.owns_guild(guild_id):
+            self._timers.pop(guild_id, None)
+            return
+        self._timers[guild_id] = (version, data)
+        for index in (1, 2):
+            if self._is_active(data, index):
+                # Sofort den aktuellen Sollzustand herstellen, danach nur noch zu den Übergängen
+                await self.apply(guild_id, data, index)
+                self._push(guild_id, version, data, index, "give")
+                self._push(guild_id, version, data, index, "remove")
+        self._wakeup.set()
+
+    async def reschedule(self, guild_id):
+        await self.set_timer(guild_id, await db.get_data("adm_timer", guild_id))
+
+    def notify(self, category, guild_id):
+        """Listener für database.subscribe: eine Konfig-Änderung plant den Server neu."""
+        asyncio.get_running_loop().create_task(self.reschedule(guild_id))
+
+    async def load(self):
+        """Baut den Heap aus allen aktiven Timern auf (eine Abfrage statt einer pro Server)."""
+        self._heap.clear()
+        self._timers.clear()
+        for data in await db.get_active_adm_timers():
+            await self.set_timer(data["_id"], data)
+        self._wakeup.set()
+
+    async def run(self):
+        while True:
+            if not self._heap:
+                await self._wakeup.wait()
+                self._wakeup.clear()
+                continue
+            delay = self._heap[0][0] - time.time()
+            if delay > 0:
+                try:
+                    await asyncio.wait_for(self._wakeup.wait(), timeout=delay)
+                    self._wakeup.clear()
+                except asyncio.TimeoutError:
+                    pass
+                continue
+            _, _, guild_id, version, index, kind = heapq.heappop(self._heap)
+            current = self._timers.get(guild_id)
+            if current is None or current[0] != version:
+                continue
+            self.stats["transitions"] += 1
+            try:
+                await self.apply(guild_id, current[1], index)
+            except Exception as e:
+                print(f"ADM-Scheduler Fehler ({guild_id}): {e}")
+            self._push(guild_id, version, current[1], index, kind)
+
+    def metrics(self):
+        return {**self.stats, "active_guilds": len(self._timers), "pending": len(self._heap)}
@@ -0,0 +1,217 @@
+import asyncio
+import os
+import discord
+import database as db
+from metrics import swallowed
+
+# --- GUILD SNAPSHOTS & RESTORE ---
+# Pro geschütztem Server eine kompakte Kopie von Rollen, Kategorien, Kanälen und Overwrites.
+# Gateway-Events halten sie aktuell; von Nukern gelöschte Objekte bleiben als "deleted"
+# markiert und können gesammelt wiederhergestellt werden.
+# Format (Mongo-kompatibel, nur String-Keys):
+#   roles:    {role_id: {name, permissions, color, hoist, mentionable, position, deleted_by?}}
+#   channels: {channel_id: {name, type, category, position, topic, nsfw, slowmode,
+#                           bitrate, user_limit, overwrites: [[target_id, is_member, allow, deny]], deleted_by?}}
+
+FLUSH_INTERVAL = int(os.getenv("GLOBEX_SNAPSHOT_FLUSH_INTERVAL", "60"))
+RESTORE_CONCURRENCY = int(os.getenv("GLOBEX_RESTORE_CONCURRENCY", "4"))
+PROTECTION_FLAGS = ("channel_delete_status", "role_delete_status", "raid_mode_status")
+
+
+def is_protected(settings):
+    return any(settings.get(flag) == 1 for flag in PROTECTION_FLAGS)
+
+
+def role_state(role):
+    return {"name": role.name, "permissions": role.permissions.value, "color": role.color.value,
+            "hoist": role.hoist, "mentionable": role.mentionable, "position": role.position}
+
+
+def _is_member_target(target):
+    # Nicht gecachte Ziele (Lean-Modus: fast alle Mitglieder) liefert discord.py als
+    # discord.Object mit type=Member bzw. type=Role
+    if isinstance(target, discord.Object): return target.type is discord.Member
+    return not isinstance(target, discord.Role)
+
+
+def channel_state(channel):
+    overwrites = []
+    for target, overwrite in channel.overwrites.items():
+        allow, deny = overwrite.pair()
+        overwrites.append([str(target.id), _is_member_target(target), allow.value, deny.value])
+    return {
+        "name": channel.name,
+        "type": channel.type.value,
+        "category": str(channel.category_id) if getattr(channel, "category_id", None) else None,
+        "position": channel.position,
+        "topic": getattr(channel, "topic", None),
+        "nsfw": getattr(channel, "nsfw", False),
+        "slowmode": getattr(channel, "slowmode_delay", 0),
+        "bitrate": getattr(channel, "bitrate", None),
+        "user_limit": getattr(channel, "user_limit", None),
+        "overwrites": overwrites,
+    }
+
+
+class SnapshotStore:
+    def __init__(self):
+        self._guilds = {}   # guild_id -> {"roles": {...}, "channels": {...}}
+        self._dirty = set()
+        self.stats = {"updates": 0, "flushes": 0, "restored": 0, "restore_errors": 0}
+
+    # --- Aufbau & Persistenz ---
+    async def load(self, guild):
+        """Baut den Snapshot aus dem Live-Zustand und übernimmt gespeicherte, noch nicht
+        wiederhergestellte Löschungen aus der Datenbank."""
+        gid = str(guild.id)
+        stored = await db.load_snapshot(gid)
+        snap = {
+            "roles": {str(r.id): role_state(r) for r in guild.roles if not r.is_default() and not r.managed},
+            "channels": {str(c.id): channel_state(c) for c in guild.channels},
+        }
+        for kind in ("roles", "channels"):
+            for oid, state in stored.get(kind, {}).items():
+                if state.get("deleted_by") is not None and oid not in snap[kind]:
+                    snap[kind][oid] = state
+        self._guilds[gid] = snap
+        self._dirty.add(gid)
+
+    def has(self, guild_id):
+        return str(guild_id) in self._guilds
+
+    def drop(self, guild_id):
+        self._guilds.pop(str(guild_id), None)
+
+    async def flush(self):
+        dirty, self._dirty = self._dirty, set()
+        for gid in dirty:
+            if gid in self._guilds:
+                await db.save_snapshot(gid, self._guilds[gid])
+                self.stats["flushes"] += 1
+
+    async def run_flusher(self, interval=FLUSH_INTERVAL):
+        while True:
+            await asyncio.sleep(interval)
+            try:
+                await self.flush()
+            except Exception as e:
+                print(f"Snapshot flush failed: {e}")
+
+    # --- Inkrementelle Updates aus Gateway-Events ---
+    def _update(self, guild_id, kind, object_id, state):
+        snap = self._guilds.get(str(guild_id))
+        if snap is None:
+            return
+        if state is None:
+            snap[kind].pop(str(object_id), None)
+        else:
+            snap[kind][str(object_id)] = state
+        self._dirty.add(str(guild_id))
+        self.stats["updates"] += 1
+
+    def track_role(self, role):
+        # Ungeschützte Server kosten nur den Dict-Lookup
+        if self.has(role.guild.id) and not role.is_default() and not role.managed:
+            self._update(role.guild.id, "roles", role.id, role_state(role))
+
+    def track_channel(self, channel):
+        if self.has(channel.guild.id):
+            self._update(channel.guild.id, "channels", channel.id, channel_state(channel))
+
+    def mark_deleted(self, guild_id, kind, object_id, actor_id):
+        snap = self._guilds.get(str(guild_id))
+        state = snap and snap[kind].get(str(object_id))
+        if state is not None:
+            state["deleted_by"] = str(actor_id) if actor_id else "unknown"
+            self._dirty.add(str(guild_id))
+
+    def forget(self, guild_id, kind, object_id):
+        self._update(guild_id, kind, object_id, None)
+
+    def pending(self, guild_id):
+        snap = self._guilds.get(str(guild_id))
+        if snap is None:
+            return {"roles": 0, "channels": 0}
+        return {kind: sum(1 for s in snap[kind].values() if s.get("deleted_by")) for kind in ("roles", "channels")}
+
+    # --- Restore ---
+    async def restore(self, guild, progress=None):
+        """Stellt alle als gelöscht markierten Objekte wieder her: erst Rollen, dann Kategorien,
+        dann Kanäle mit Overwrites. Innerhalb einer Stufe parallel, begrenzt durch
+        RESTORE_CONCURRENCY; 429er behandelt der HTTP-Client von discord.py."""
+        gid = str(guild.id)
+        snap = self._guilds.get(gid)
+        if snap is None:
+            return {"roles": 0, "channels": 0, "errors": 0}
+        slots = asyncio.Semaphore(RESTORE_CONCURRENCY)
+        id_map = {}
+        errors = 0
+        reason = "Globex Security: Restore after nuke"
+
+        async def run(kind, oid, factory):
+            nonlocal errors
+            async with slots:
+                try:
+                    created = await factory()
+                except discord.HTTPException as e:
+                    errors += 1
+                    self.stats["restore_errors"] += 1
+                    print(f"Restore failed for {kind} {oid} in {guild.name}: {e}")
+                    return
+            id_map[oid] = created
+            # Das neue Objekt kommt über das Create-Event in den Snapshot, der alte Eintrag entfällt
+            self.forget(gid, kind, oid)
+            self.stats["restored"] += 1
+
+        # 1) Rollen
+        roles = {oid: s for oid, s in snap["roles"].items() if s.get("deleted_by")}
+        await asyncio.gather(*(run("roles", oid, lambda s=s: guild.create_role(
+            name=s["name"], permissions=discord.Permissions(s["permissions"]), colour=discord.Colour(s["color"]),
+            hoist=s["hoist"], mentionable=s["mentionable"], reason=reason)) for oid, s in roles.items()))
+        positions = {id_map[oid]: min(s["position"], guild.me.top_role.position - 1)
+                     for oid, s in roles.items() if oid in id_map}
+        if positions:
+            try: await guild.edit_role_positions(positions, reason=reason)
+            except discord.HTTPException as e: swallowed("restore.role_positions", e)
+        if progress: await progress(f"Roles restored: {len(positions)}/{len(roles)}")
+
+        def overwrites_for(state):
+            result = {}
+            for target_id, is_member, allow, deny in state["overwrites"]:
+                # Member-Overwrites brauchen kein gecachtes Member-Objekt (Lean-Modus)
+                target = (discord.Object(int(target_id), type=discord.Member) if is_member
+                          else id_map.get(target_id) or guild.get_role(int(target_id)))
+                if target is not None:
+                    result[target] = discord.PermissionOverwrite.from_pair(
+                        discord.Permissions(allow), discord.Permissions(deny))
+            return result
+
+        def create_channel(state):
+            kind = discord.ChannelType(state["type"])
+            category = None
+            if state.get("category"):
+                category = id_map.get(state["category"]) or guild.get_channel(int(state["category"]))
+            kwargs = {"name": state["name"], "overwrites": overwrites_for(state), "position": state["position"], "reason": reason}
+            if kind == discord.ChannelType.category:
+                return guild.create_category(**kwargs)
+            kwargs["category"] = category
+            if kind in (discord.ChannelType.voice, discord.ChannelType.stage_voice):
+                if state.get("bitrate"): kwargs["bitrate"] = min(state["bitrate"], int(guild.bitrate_limit))
+                if state.get("user_limit"): kwargs["user_limit"] = state["user_limit"]
+                factory = guild.create_stage_channel if kind == discord.ChannelType.stage_voice else guild.create_voice_channel
+                return factory(**kwargs)
+            kwargs.update(topic=state.get("topic"), nsfw=state.get("nsfw", False), slowmode_delay=state.get("slowmode") or 0)
+            if kind == discord.ChannelType.forum:
+                return guild.create_forum(**kwargs)
+            return guild.create_text_channel(news=kind == discord.ChannelType.news, **kwargs)
+
+        # 2) Kategorien, 3) Kanäle (brauchen die neuen Kategorie- und Rollen-IDs)
+        channels = {oid: s for oid, s in snap["channels"].items() if s.get("deleted_by")}
+        categories = {oid: s for oid, s in channels.items() if s["type"] == discord.ChannelType.category.value}
+        children = {oid: s for oid, s in channels.items() if oid not in categories}
+        for stage in (categories, children):
+            await asyncio.gather(*(run("channels", oid, lambda s=s: create_channel(s)) for oid, s in stage.items()))
+            if progress: await progress(f"Channels restored: {sum(1 for o in channels if o in id_map)}/{len(channels)}")
+
+        self._dirty.add(gid)
+        return {"roles": len(positions), "channels": sum(1 for o in channels if o in id_map), "errors": errors}
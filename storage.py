@@ -0,0 +1,573 @@
+import asyncio
+import copy
+import datetime
+import itertools
+import json
+import os
+import sqlite3
+import time
+from concurrent.futures import ThreadPoolExecutor
+try:
+    import motor.motor_asyncio
+    from pymongo import ReturnDocument, ReadPreference, UpdateOne, ReplaceOne
+    from pymongo.errors import PyMongoError, CollectionInvalid, ConnectionFailure, BulkWriteError
+except ImportError:  # nur für GLOBEX_STORAGE=mongo nötig
+    motor = None
+
+# --- STORAGE BACKENDS ---
+# database.py spricht nur über diese Schnittstelle mit dem Speicher; Cache, Deadlines und
+# Write-Behind bleiben dort. Dokumente sehen überall aus wie in Mongo: {"_id": guild_id, ...},
+# Listen (whitelist/trusted/blacklist) als "users"-Array mit IDs als Strings.
+#   GLOBEX_STORAGE=mongo   MongoDB über Motor (MONGO_URL), Standard
+#   GLOBEX_STORAGE=sqlite  lokale Datei (GLOBEX_SQLITE_PATH) im WAL-Modus, Zugriffe auf einem eigenen Thread
+#   GLOBEX_STORAGE=memory  nur im Prozess, für Tests und bench.py (im Cluster-Modus pro Prozess getrennt!)
+STORAGE = os.getenv("GLOBEX_STORAGE", "mongo")
+MONGO_URL = os.getenv("MONGO_URL")
+SQLITE_PATH = os.getenv("GLOBEX_SQLITE_PATH", "globex.db")
+CONFIG_READ_PREFERENCE = os.getenv("GLOBEX_MONGO_READ_PREFERENCE", "primaryPreferred")
+READ_PREFERENCES = {
+    "primary": "PRIMARY", "primaryPreferred": "PRIMARY_PREFERRED",
+    "secondary": "SECONDARY", "secondaryPreferred": "SECONDARY_PREFERRED", "nearest": "NEAREST",
+}
+# Konfig-Collections pro Server (im Bot gecacht, von migrate.py kopiert)
+CACHED_CATEGORIES = ("settings", "limits", "adm_timer", "whitelist", "trusted", "blacklist")
+EVENT_COLLECTION = "events"
+
+_EPOCH = datetime.datetime(1970, 1, 1)
+
+
+def apply_op(doc, op, arg):
+    """Wendet eine Schreib-Operation wie Mongo an: "set" ($set), "add" ($addToSet), "pull" ($pull)."""
+    if op == "set":
+        doc.update(arg)
+    else:
+        users = doc.setdefault("users", [])
+        if op == "add" and arg not in users: users.append(arg)
+        elif op == "pull" and arg in users: users.remove(arg)
+    return doc
+
+
+def _utc_naive(ts):
+    # Mongo liefert Datumswerte als naive UTC-Zeit; die anderen Backends verhalten sich gleich
+    return ts.astimezone(datetime.timezone.utc).replace(tzinfo=None) if ts.tzinfo else ts
+
+
+# --- MONGO ---
+def create_client(url=MONGO_URL):
+    """Erstellt den Motor-Client mit den Pool-, Timeout- und Retry-Einstellungen aus der Umgebung.
+    Ohne Server-Selection-Timeout würde ein Failover jeden Handler unbegrenzt blockieren."""
+    return motor.motor_asyncio.AsyncIOMotorClient(
+        url,
+        appname="globex-security",
+        maxPoolSize=int(os.getenv("GLOBEX_MONGO_MAX_POOL", "100")),
+        minPoolSize=int(os.getenv("GLOBEX_MONGO_MIN_POOL", "5")),
+        maxIdleTimeMS=int(os.getenv("GLOBEX_MONGO_MAX_IDLE_MS", "300000")),
+        connectTimeoutMS=int(os.getenv("GLOBEX_MONGO_CONNECT_TIMEOUT_MS", "5000")),
+        socketTimeoutMS=int(os.getenv("GLOBEX_MONGO_SOCKET_TIMEOUT_MS", "10000")),
+        serverSelectionTimeoutMS=int(os.getenv("GLOBEX_MONGO_SELECTION_TIMEOUT_MS", "5000")),
+        retryReads=os.getenv("GLOBEX_MONGO_RETRY_READS", "1") == "1",
+        retryWrites=os.getenv("GLOBEX_MONGO_RETRY_WRITES", "1") == "1",
+    )
+
+
+class MongoBackend:
+    name = "mongo"
+
+    def __init__(self, url=MONGO_URL):
+        if motor is None:
+            raise RuntimeError("GLOBEX_STORAGE=mongo needs the motor and pymongo packages")
+        self.errors, self.transient = (PyMongoError,), (ConnectionFailure,)
+        self.client = create_client(url)
+        # Wir definieren die Datenbank "GlobexData"
+        self.db = self.client["GlobexData"]
+        # Konfig-Lesezugriffe mit eigener Read Preference (Schreibzugriffe gehen immer an den Primary)
+        self.config_db = self.db.with_options(
+            read_preference=getattr(ReadPreference, READ_PREFERENCES[CONFIG_READ_PREFERENCE]))
+
+    async def ping(self):
+        await self.client.admin.command("ping")
+
+    async def close(self):
+        self.client.close()
+
+    # --- Dokumente ---
+    async def get(self, category, gid, primary=False):
+        return await (self.db if primary else self.config_db)[category].find_one({"_id": gid})
+
+    async def get_many(self, category, gids):
+        return {doc["_id"]: doc async for doc in self.config_db[category].find({"_id": {"$in": gids}})}
+
+    async def get_profile_docs(self, gid, categories):
+        # Alle fehlenden Collections eines Servers in einer Aggregation
+        pipeline = [{"$documents": [{"_id": gid}]}]
+        pipeline += [
+            {"$lookup": {"from": category, "localField": "_id", "foreignField": "_id", "as": category}}
+            for category in categories
+        ]
+        rows = await self.config_db.aggregate(pipeline).to_list(length=1)
+        row = rows[0] if rows else {}
+        return {category: (row.get(category) or [{}])[0] for category in categories}
+
+    async def find(self, category, field, value):
+        return await self.db[category].find({field: value}).to_list(length=None)
+
+    async def set_fields(self, category, gid, fields):
+        return await self.db[category].find_one_and_update(
+            {"_id": gid}, {"$set": fields}, upsert=True, return_document=ReturnDocument.AFTER)
+
+    async def toggle(self, category, gid, key, off, on):
+        current = {"$ifNull": [f"${key}", off]}
+        return await self.db[category].find_one_and_update(
+            {"_id": gid},
+            [{"$set": {key: {"$cond": [{"$eq": [current, off]}, on, off]}}}],
+            upsert=True,
+            return_document=ReturnDocument.AFTER
+        )
+
+    async def add_to_set(self, category, gid, value):
+        await self.db[category].update_one({"_id": gid}, {"$addToSet": {"users": value}}, upsert=True)
+
+    async def pull(self, category, gid, value):
+        await self.db[category].update_one({"_id": gid}, {"$pull": {"users": value}})
+
+    async def replace(self, category, gid, doc):
+        await self.db[category].replace_one({"_id": gid}, {**doc, "_id": gid}, upsert=True)
+
+    async def bulk(self, category, ops):
+        """Geordnete Batch aus (guild_id, op, arg) in einem bulk_write."""
+        requests = []
+        for gid, op, arg in ops:
+            if op == "set": requests.append(UpdateOne({"_id": gid}, {"$set": arg}, upsert=True))
+            elif op == "add": requests.append(UpdateOne({"_id": gid}, {"$addToSet": {"users": arg}}, upsert=True))
+            else: requests.append(UpdateOne({"_id": gid}, {"$pull": {"users": arg}}))
+        await self.db[category].bulk_write(requests, ordered=True)
+
+    # --- Listen-Seiten ---
+    async def list_page(self, category, gid, skip, limit):
+        users = {"$ifNull": ["$users", []]}
+        pipeline = [{"$match": {"_id": gid}},
+                    {"$project": {"_id": 0, "total": {"$size": users},
+                                  "users": {"$slice": [users, skip, limit]}}}]
+        found = await self.config_db[category].aggregate(pipeline).to_list(length=1)
+        return (found[0]["users"], found[0]["total"]) if found else ([], 0)
+
+    async def list_index(self, category, gid, value):
+        pipeline = [{"$match": {"_id": gid}},
+                    {"$project": {"_id": 0, "pos": {"$indexOfArray": [{"$ifNull": ["$users", []]}, value]}}}]
+        found = await self.config_db[category].aggregate(pipeline).to_list(length=1)
+        return found[0]["pos"] if found and found[0]["pos"] >= 0 else None
+
+    # --- Events ---
+    async def ensure_event_store(self, mode, retention, capped_mb):
+        if not await self.db.list_collection_names(filter={"name": EVENT_COLLECTION}):
+            try:
+                if mode == "timeseries":
+                    await self.db.create_collection(EVENT_COLLECTION, expireAfterSeconds=retention,
+                        timeseries={"timeField": "ts", "metaField": "guild_id", "granularity": "seconds"})
+                elif mode == "capped":
+                    await self.db.create_collection(EVENT_COLLECTION, capped=True, size=capped_mb * 1024 * 1024)
+            except CollectionInvalid:
+                pass  # ein anderer Cluster war schneller
+        events = self.db[EVENT_COLLECTION]
+        await events.create_index([("guild_id", 1), ("ts", -1)])
+        await events.create_index([("guild_id", 1), ("actor_id", 1), ("ts", -1)])
+        if mode == "standard":
+            await events.create_index("ts", expireAfterSeconds=retention)
+
+    async def insert_events(self, events):
+        try:
+            await self.db[EVENT_COLLECTION].insert_many(events, ordered=False)
+        except BulkWriteError as e:
+            # insert_many trägt die _id in jedes Dict ein; bei einem erneut gesendeten Batch sind
+            # Duplicate-Key-Fehler (11000) also schon geschriebene Events und kein Fehler
+            details = e.details or {}
+            if details.get("writeConcernErrors") or any(w.get("code") != 11000 for w in details.get("writeErrors", [])):
+                raise
+
+    async def query_events(self, guild_id, actor_id, before, limit):
+        query = {"guild_id": guild_id}
+        if actor_id: query["actor_id"] = actor_id
+        if before:
+            ts, last_id = before
+            query["$or"] = [{"ts": {"$lt": ts}}, {"ts": ts, "_id": {"$lt": last_id}}]
+        cursor = self.db[EVENT_COLLECTION].find(query).sort([("ts", -1), ("_id", -1)]).limit(limit)
+        return await cursor.to_list(length=limit)
+
+    # --- Change Stream ---
+    async def watch(self, categories, on_change, on_gap):
+        """Ruft on_change(collection, guild_id) für jede Änderung auf. Ohne Replica Set gibt es
+        keinen Change Stream, dann kehrt watch zurück und der Cache nutzt nur die TTL."""
+        pipeline = [{"$match": {"ns.coll": {"$in": list(categories)}}}]
+        resume_token = None
+        while True:
+            try:
+                async with self.db.watch(pipeline=pipeline, resume_after=resume_token) as stream:
+                    async for change in stream:
+                        resume_token = stream.resume_token
+                        key = change.get("documentKey", {}).get("_id")
+                        if key is not None:
+                            on_change(change["ns"]["coll"], key)
+            except asyncio.CancelledError:
+                raise
+            except PyMongoError as e:
+                if getattr(e, "code", None) in (40573, 40324):
+                    print(f"⚠️ Change Streams nicht verfügbar, Cache nutzt nur TTL: {e}")
+                    return
+                print(f"⚠️ Change Stream unterbrochen, verbinde neu: {e}")
+                on_gap()
+                await asyncio.sleep(5)
+
+    # --- Migration ---
+    async def export(self, category, batch_size):
+        order = [("ts", 1), ("_id", 1)] if category == EVENT_COLLECTION else [("_id", 1)]
+        batch = []
+        async for doc in self.db[category].find({}).sort(order):
+            batch.append(doc)
+            if len(batch) == batch_size:
+                yield batch
+                batch = []
+        if batch:
+            yield batch
+
+    async def import_docs(self, category, docs):
+        if category == EVENT_COLLECTION:
+            await self.insert_events([{k: v for k, v in d.items() if k != "_id"} for d in docs])
+        else:
+            await self.db[category].bulk_write(
+                [ReplaceOne({"_id": d["_id"]}, d, upsert=True) for d in docs], ordered=False)
+
+
+# --- IN-MEMORY ---
+class MemoryBackend:
+    """Alles in Dicts; gibt Kopien heraus, damit der Cache in database.py nichts im Speicher verändert."""
+    name = "memory"
+    errors = transient = ()
+
+    def __init__(self):
+        self.collections = {}   # category -> {guild_id: doc}
+        self.events = []        # nach Einfügereihenfolge
+        self._event_ids = itertools.count(1)
+        self.retention = None
+
+    def _col(self, category):
+        return self.collections.setdefault(category, {})
+
+    async def ping(self):
+        pass
+
+    async def close(self):
+        pass
+
+    async def get(self, category, gid, primary=False):
+        return copy.deepcopy(self._col(category).get(gid))
+
+    async def get_many(self, category, gids):
+        col = self._col(category)
+        return {gid: copy.deepcopy(col[gid]) for gid in gids if gid in col}
+
+    async def get_profile_docs(self, gid, categories):
+        return {category: copy.deepcopy(self._col(category).get(gid) or {}) for category in categories}
+
+    async def find(self, category, field, value):
+        return [copy.deepcopy(doc) for doc in self._col(category).values() if doc.get(field) == value]
+
+    def _apply(self, category, gid, op, arg):
+        col = self._col(category)
+        doc = col.get(gid)
+        if doc is None:
+            if op == "pull": return None  # $pull ohne upsert legt nichts an
+            doc = col[gid] = {"_id": gid}
+        return apply_op(doc, op, arg)
+
+    async def set_fields(self, category, gid, fields):
+        return copy.deepcopy(self._apply(category, gid, "set", copy.deepcopy(fields)))
+
+    async def toggle(self, category, gid, key, off, on):
+        doc = self._col(category).get(gid) or {}
+        return await self.set_fields(category, gid, {key: on if doc.get(key, off) == off else off})
+
+    async def add_to_set(self, category, gid, value):
+        self._apply(category, gid, "add", value)
+
+    async def pull(self, category, gid, value):
+        self._apply(category, gid, "pull", value)
+
+    async def replace(self, category, gid, doc):
+        self._col(category)[gid] = {**copy.deepcopy(doc), "_id": gid}
+
+    async def bulk(self, category, ops):
+        for gid, op, arg in ops:
+            self._apply(category, gid, op, copy.deepcopy(arg))
+
+    async def list_page(self, category, gid, skip, limit):
+        users = (self._col(category).get(gid) or {}).get("users", [])
+        return users[skip:skip + limit], len(users)
+
+    async def list_index(self, category, gid, value):
+        users = (self._col(category).get(gid) or {}).get("users", [])
+        return users.index(value) if value in users else None
+
+    async def ensure_event_store(self, mode, retention, capped_mb):
+        self.retention = datetime.timedelta(seconds=retention)
+
+    async def insert_events(self, events):
+        for event in events:
+            self.events.append({**event, "_id": next(self._event_ids), "ts": _utc_naive(event["ts"])})
+        if self.retention:
+            cutoff = datetime.datetime.now(datetime.timezone.utc).replace(tzinfo=None) - self.retention
+            while self.events and self.events[0]["ts"] < cutoff:
+                self.events.pop(0)
+
+    async def query_events(self, guild_id, actor_id, before, limit):
+        found = [e for e in self.events if e["guild_id"] == guild_id and (not actor_id or e.get("actor_id") == actor_id)
+                 and (not before or (e["ts"], e["_id"]) < before)]
+        found.sort(key=lambda e: (e["ts"], e["_id"]), reverse=True)
+        return [dict(e) for e in found[:limit]]
+
+    async def watch(self, categories, on_change, on_gap):
+        return  # ein Prozess, alle Writes laufen durch den Cache
+
+    async def export(self, category, batch_size):
+        docs = list(self.events) if category == EVENT_COLLECTION else [self._col(category)[k] for k in sorted(self._col(category))]
+        for i in range(0, len(docs), batch_size):
+            yield copy.deepcopy(docs[i:i + batch_size])
+
+    async def import_docs(self, category, docs):
+        if category == EVENT_COLLECTION:
+            await self.insert_events([{k: v for k, v in d.items() if k != "_id"} for d in docs])
+        else:
+            for doc in docs:
+                await self.replace(category, doc["_id"], doc)
+
+
+# --- SQLITE ---
+class SQLiteBackend:
+    """Eine Datei, WAL-Modus (Leser blockieren den Schreiber nicht, mehrere Cluster-Prozesse
+    können sich die Datei teilen). sqlite3 blockiert, deshalb laufen alle Zugriffe nacheinander
+    auf einem eigenen Thread; damit ist jede Operation auch ohne weitere Locks atomar."""
+    name = "sqlite"
+    errors, transient = (sqlite3.Error,), (sqlite3.OperationalError,)
+    PRUNE_INTERVAL = 3600
+
+    def __init__(self, path=SQLITE_PATH):
+        self.path = path
+        self._conn = None
+        self._thread = ThreadPoolExecutor(max_workers=1, thread_name_prefix="globex-sqlite")
+        self.retention = None
+        self._last_prune = 0.0
+
+    def _connect(self):
+        conn = sqlite3.connect(self.path, timeout=5, check_same_thread=False)
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        with conn:
+            conn.execute("CREATE TABLE IF NOT EXISTS docs (collection TEXT NOT NULL, id TEXT NOT NULL, "
+                         "doc TEXT NOT NULL, PRIMARY KEY (collection, id)) WITHOUT ROWID")
+            conn.execute("CREATE TABLE IF NOT EXISTS events (id INTEGER PRIMARY KEY AUTOINCREMENT, "
+                         "guild_id TEXT NOT NULL, ts INTEGER NOT NULL, kind TEXT, actor_id TEXT, target_id TEXT, detail TEXT)")
+            conn.execute("CREATE INDEX IF NOT EXISTS events_guild_ts ON events (guild_id, ts, id)")
+            conn.execute("CREATE INDEX IF NOT EXISTS events_guild_actor_ts ON events (guild_id, actor_id, ts, id)")
+            conn.execute("CREATE INDEX IF NOT EXISTS events_ts ON events (ts)")
+        return conn
+
+    def _call(self, fn, args):
+        if self._conn is None:
+            self._conn = self._connect()
+        return fn(self._conn, *args)
+
+    async def _run(self, fn, *args):
+        return await asyncio.get_running_loop().run_in_executor(self._thread, self._call, fn, args)
+
+    @staticmethod
+    def _load(conn, category, gid):
+        row = conn.execute("SELECT doc FROM docs WHERE collection = ? AND id = ?", (category, gid)).fetchone()
+        return json.loads(row[0]) if row else None
+
+    @staticmethod
+    def _store(conn, category, gid, doc):
+        conn.execute("INSERT OR REPLACE INTO docs (collection, id, doc) VALUES (?, ?, ?)",
+                     (category, gid, json.dumps(doc, separators=(",", ":"))))
+
+    def _apply(self, conn, category, gid, op, arg):
+        doc = self._load(conn, category, gid)
+        if doc is None:
+            if op == "pull": return None
+            doc = {"_id": gid}
+        self._store(conn, category, gid, apply_op(doc, op, arg))
+        return doc
+
+    def _write(self, conn, category, ops):
+        with conn:
+            return [self._apply(conn, category, gid, op, arg) for gid, op, arg in ops]
+
+    async def ping(self):
+        await self._run(lambda conn: conn.execute("SELECT 1").fetchone())
+
+    async def close(self):
+        def close(conn):
+            conn.close()
+            self._conn = None
+        if self._conn is not None:
+            await self._run(close)
+        self._thread.shutdown(wait=True)
+
+    # --- Dokumente ---
+    async def get(self, category, gid, primary=False):
+        return await self._run(self._load, category, gid)
+
+    async def get_many(self, category, gids):
+        def get_many(conn):
+            marks = ",".join("?" * len(gids))
+            rows = conn.execute(f"SELECT id, doc FROM docs WHERE collection = ? AND id IN ({marks})", (category, *gids))
+            return {gid: json.loads(doc) for gid, doc in rows}
+        return await self._run(get_many) if gids else {}
+
+    async def get_profile_docs(self, gid, categories):
+        def load(conn):
+            marks = ",".join("?" * len(categories))
+            rows = conn.execute(f"SELECT collection, doc FROM docs WHERE id = ? AND collection IN ({marks})", (gid, *categories))
+            found = {category: json.loads(doc) for category, doc in rows}
+            return {category: found.get(category, {}) for category in categories}
+        return await self._run(load)
+
+    async def find(self, category, field, value):
+        def find(conn):
+            rows = conn.execute("SELECT doc FROM docs WHERE collection = ? AND json_extract(doc, ?) = ?",
+                                (category, f"$.{field}", value))
+            return [json.loads(doc) for doc, in rows]
+        return await self._run(find)
+
+    async def set_fields(self, category, gid, fields):
+        return (await self._run(self._write, category, [(gid, "set", fields)]))[0]
+
+    async def toggle(self, category, gid, key, off, on):
+        def toggle(conn):
+            with conn:
+                doc = self._load(conn, category, gid) or {}
+                return self._apply(conn, category, gid, "set", {key: on if doc.get(key, off) == off else off})
+        return await self._run(toggle)
+
+    async def add_to_set(self, category, gid, value):
+        await self._run(self._write, category, [(gid, "add", value)])
+
+    async def pull(self, category, gid, value):
+        await self._run(self._write, category, [(gid, "pull", value)])
+
+    async def replace(self, category, gid, doc):
+        def replace(conn):
+            with conn:
+                self._store(conn, category, gid, {**doc, "_id": gid})
+        await self._run(replace)
+
+    async def bulk(self, category, ops):
+        await self._run(self._write, category, ops)
+
+    # --- Listen-Seiten (json_each: nur die Seite verlässt SQLite) ---
+    async def list_page(self, category, gid, skip, limit):
+        def page(conn):
+            row = conn.execute("SELECT json_array_length(doc, '$.users') FROM docs WHERE collection = ? AND id = ?",
+                               (category, gid)).fetchone()
+            if not row or not row[0]:
+                return [], 0
+            rows = conn.execute("SELECT value FROM docs, json_each(docs.doc, '$.users') WHERE docs.collection = ? AND docs.id = ? "
+                                "ORDER BY key LIMIT ? OFFSET ?", (category, gid, limit, skip))
+            return [value for value, in rows], row[0]
+        return await self._run(page)
+
+    async def list_index(self, category, gid, value):
+        def index(conn):
+            row = conn.execute("SELECT key FROM docs, json_each(docs.doc, '$.users') WHERE docs.collection = ? AND docs.id = ? "
+                               "AND value = ? LIMIT 1", (category, gid, value)).fetchone()
+            return row[0] if row else None
+        return await self._run(index)
+
+    # --- Events (ts als Mikrosekunden seit 1970, damit der Keyset-Vergleich exakt ist) ---
+    @staticmethod
+    def _micros(ts):
+        return (_utc_naive(ts) - _EPOCH) // datetime.timedelta(microseconds=1)
+
+    def _prune(self, conn):
+        # Ersatz für den TTL-Index; "capped" und "timeseries" verhalten sich hier wie "standard"
+        self._last_prune = time.monotonic()
+        cutoff = self._micros(datetime.datetime.now(datetime.timezone.utc).replace(tzinfo=None) - self.retention)
+        with conn:
+            conn.execute("DELETE FROM events WHERE ts < ?", (cutoff,))
+
+    async def ensure_event_store(self, mode, retention, capped_mb):
+        self.retention = datetime.timedelta(seconds=retention)
+        await self._run(self._prune)
+
+    async def insert_events(self, events):
+        rows = [(e["guild_id"], self._micros(e["ts"]), e.get("kind"), e.get("actor_id"), e.get("target_id"), e.get("detail"))
+                for e in events]
+
+        def insert(conn):
+            with conn:
+                conn.executemany("INSERT INTO events (guild_id, ts, kind, actor_id, target_id, detail) "
+                                 "VALUES (?, ?, ?, ?, ?, ?)", rows)
+            if self.retention and time.monotonic() - self._last_prune > self.PRUNE_INTERVAL:
+                self._prune(conn)
+        await self._run(insert)
+
+    async def query_events(self, guild_id, actor_id, before, limit):
+        sql, args = "SELECT id, guild_id, ts, kind, actor_id, target_id, detail FROM events WHERE guild_id = ?", [guild_id]
+        if actor_id:
+            sql += " AND actor_id = ?"
+            args.append(actor_id)
+        if before:
+            ts, last_id = self._micros(before[0]), before[1]
+            sql += " AND (ts < ? OR (ts = ? AND id < ?))"
+            args += [ts, ts, last_id]
+        sql += " ORDER BY ts DESC, id DESC LIMIT ?"
+        args.append(limit)
+
+        def query(conn):
+            return [{"_id": i, "guild_id": g, "ts": _EPOCH + datetime.timedelta(microseconds=ts), "kind": k,
+                     "actor_id": a, "target_id": t, "detail": d}
+                    for i, g, ts, k, a, t, d in conn.execute(sql, args)]
+        return await self._run(query)
+
+    async def watch(self, categories, on_change, on_gap):
+        return  # kein Change-Feed; andere Prozesse an derselben Datei sieht der Cache nach der TTL
+
+    # --- Migration ---
+    async def export(self, category, batch_size):
+        last = None
+        while True:
+            if category == EVENT_COLLECTION:
+                def page(conn, last=last):
+                    rows = conn.execute("SELECT id, guild_id, ts, kind, actor_id, target_id, detail FROM events "
+                                        "WHERE id > ? ORDER BY id LIMIT ?", (last or 0, batch_size))
+                    return [{"_id": i, "guild_id": g, "ts": _EPOCH + datetime.timedelta(microseconds=ts), "kind": k,
+                             "actor_id": a, "target_id": t, "detail": d} for i, g, ts, k, a, t, d in rows]
+            else:
+                def page(conn, last=last):
+                    rows = conn.execute("SELECT doc FROM docs WHERE collection = ? AND id > ? ORDER BY id LIMIT ?",
+                                        (category, last or "", batch_size))
+                    return [json.loads(doc) for doc, in rows]
+            batch = await self._run(page)
+            if not batch:
+                return
+            yield batch
+            last = batch[-1]["_id"]
+
+    async def import_docs(self, category, docs):
+        if category == EVENT_COLLECTION:
+            await self.insert_events(docs)
+            return
+
+        def store(conn):
+            with conn:
+                for doc in docs:
+                    self._store(conn, category, doc["_id"], doc)
+        await self._run(store)
+
+
+BACKENDS = {"mongo": MongoBackend, "sqlite": SQLiteBackend, "memory": MemoryBackend}
+
+
+def create_backend(kind=STORAGE, **options):
+    """Backend nach Name; options gehen an den Konstruktor (url= für Mongo, path= für SQLite)."""
+    if kind not in BACKENDS:
+        raise ValueError(f"Unknown storage backend {kind!r} (expected one of: {', '.join(BACKENDS)})")
+    return BACKENDS[kind](**options)